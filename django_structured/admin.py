@@ -0,0 +1,212 @@
+import logging
+from typing import Dict, Iterable
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.widgets import ForeignKeyRawIdWidget, ManyToManyRawIdWidget
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections, router
+from django.utils.functional import cached_property
+
+log = logging.getLogger(__name__)
+
+_large_tables = {}
+
+
+def admin_settings() -> Dict:
+    options = {
+        # Unfiltered changelists of tables estimated to be larger than this use
+        # the estimate instead of COUNT(*)
+        "ESTIMATE_COUNT_THRESHOLD": 100_000,
+        # Foreign keys to tables with more rows than this use raw id widgets
+        "RAW_ID_THRESHOLD": 1_000,
+    }
+    options.update(getattr(settings, "STRUCTURED_ADMIN", {}))
+    return options
+
+
+def estimated_row_count(model, using: str | None = None) -> int | None:
+    """
+    Return the number of rows of the model's table according to the database
+    statistics (which may be stale), or None if the database keeps no such
+    statistics. This is a single catalog lookup, however large the table.
+
+    PostgreSQL and MySQL are supported. SQLite only has statistics after
+    ANALYZE has been run.
+    """
+    using = using or router.db_for_read(model)
+    connection = connections[using]
+    table = model._meta.db_table
+
+    if connection.vendor == "postgresql":
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)"
+        params = [connection.ops.quote_name(table)]
+    elif connection.vendor == "mysql":
+        sql = (
+            "SELECT table_rows FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = %s"
+        )
+        params = [table]
+    elif connection.vendor == "sqlite":
+        sql = "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1"
+        params = [table]
+    else:
+        return None
+
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+    except DatabaseError:
+        # e.g. sqlite_stat1 doesn't exist until ANALYZE has been run
+        return None
+
+    if row is None or row[0] is None:
+        return None
+    value = row[0]
+    if isinstance(value, str):
+        # sqlite_stat1.stat starts with the number of rows
+        value = value.split()[0]
+    estimate = int(value)
+    # PostgreSQL reports -1 for tables that were never analyzed
+    return estimate if estimate >= 0 else None
+
+
+def has_more_rows_than(model, threshold: int, using: str | None = None) -> bool:
+    """
+    Return whether the model's table has more than `threshold` rows, using the
+    database statistics if available, or else a COUNT(*) bounded by LIMIT.
+    """
+    estimate = estimated_row_count(model, using)
+    if estimate is not None:
+        return estimate > threshold
+    queryset = model._default_manager.using(using) if using else model._default_manager
+    return queryset.order_by()[: threshold + 1].count() > threshold
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator using the database statistics instead of COUNT(*) for the total
+    of unfiltered querysets on large tables, which would otherwise scan the
+    whole table on every page load.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        query = getattr(queryset, "query", None)
+        if query is not None and not query.where and not query.combinator:
+            threshold = admin_settings()["ESTIMATE_COUNT_THRESHOLD"]
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > threshold:
+                return estimate
+        return super().count
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    """
+    ModelAdmin with defaults that keep working on tables with millions of
+    rows:
+
+    * Only the foreign keys shown in list_display are joined (instead of
+      following every non-null foreign key)
+    * The unfiltered total isn't counted, and totals of large tables come from
+      the database statistics (see EstimatedCountPaginator)
+    * Foreign keys and many-to-many fields to large tables use raw id widgets
+      instead of loading every related row into a <select>
+    """
+
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    def get_list_select_related(self, request):
+        if self.list_select_related is not False:
+            return self.list_select_related
+
+        related = []
+        for name in self.get_list_display(request):
+            if not isinstance(name, str):
+                continue
+            try:
+                field = self.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.many_to_one or field.one_to_one:
+                related.append(name)
+        return related
+
+    def uses_raw_id_widget(self, db_field, using) -> bool:
+        # Checked once per process and related table
+        key = (db_field.related_model, using)
+        if key not in _large_tables:
+            threshold = admin_settings()["RAW_ID_THRESHOLD"]
+            _large_tables[key] = has_more_rows_than(
+                db_field.related_model, threshold, using
+            )
+        return _large_tables[key]
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        using = kwargs.get("using")
+        if (
+            "widget" not in kwargs
+            and db_field.name not in self.get_autocomplete_fields(request)
+            and db_field.name not in self.radio_fields
+            and self.uses_raw_id_widget(db_field, using)
+        ):
+            kwargs["widget"] = ForeignKeyRawIdWidget(
+                db_field.remote_field, self.admin_site, using=using
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        using = kwargs.get("using")
+        if (
+            "widget" not in kwargs
+            and db_field.remote_field.through._meta.auto_created
+            and db_field.name not in self.get_autocomplete_fields(request)
+            and db_field.name not in self.filter_vertical
+            and db_field.name not in self.filter_horizontal
+            and self.uses_raw_id_widget(db_field, using)
+        ):
+            kwargs["widget"] = ManyToManyRawIdWidget(
+                db_field.remote_field, self.admin_site, using=using
+            )
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
+
+
+def autoregister(
+    models: Iterable,
+    *,
+    app_label: str | None = None,
+    site: admin.AdminSite | None = None,
+    admin_class=ScalableModelAdmin,
+) -> list:
+    """
+    Register the given models with admin_class (ScalableModelAdmin by
+    default), skipping abstract, swapped and already registered models. If
+    app_label is given, models of other apps are skipped too.
+
+    Returns the models registered.
+
+    Usage (in an app's admin package, after custom ModelAdmins are loaded):
+        from .. import models
+        autoregister(
+            (getattr(models, name) for name in models.__all__),
+            app_label="myapp",
+        )
+    """
+    site = site or admin.site
+    registered = []
+    for model in models:
+        meta = model._meta
+        if meta.abstract or meta.swapped:
+            continue
+        if app_label is not None and meta.app_label != app_label:
+            continue
+        if site.is_registered(model):
+            continue
+        log.debug(f"Registering {model!r} with {admin_class.__name__}")
+        site.register(model, admin_class)
+        registered.append(model)
+    return registered
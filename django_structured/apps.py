@@ -0,0 +1,16 @@
+from django.apps import AppConfig
+
+from .project_utils import registry
+
+
+class StructuredConfig(AppConfig):
+    name = "django_structured"
+    verbose_name = "Structured"
+    # Classes of modules imported with load_modules(registry=registry), for
+    # ready() hooks: apps.get_app_config("django_structured").registry
+    registry = registry
+
+    def ready(self):
+        from . import sentry
+
+        sentry.init_from_settings()
@@ -0,0 +1,490 @@
+"""
+In-process load testing: drive the project's WSGI or ASGI application with
+scripted requests from a pool of threads (and optionally processes), without
+any network, and report throughput, latency percentiles and SQL queries per
+URL pattern, plus memory growth.
+
+Run with `structured bench`, or `python scripts/bench.py` in generated
+projects, from the project's root directory:
+
+    structured bench --path /items/ --path /items/1/ --threads 8 --duration 10
+    structured bench --scenario scenario.json --output bench.json
+    structured bench --scenario scenario.json --compare bench.json
+    structured bench --scenario scenario.json --capture-queries queries.json
+
+A scenario is a JSON list of requests, replayed in order by every worker:
+
+    [
+        {"path": "/items/"},
+        {"method": "POST", "path": "/items/", "json": {"name": "Item"}},
+        {"path": "/items/", "headers": {"Accept-Language": "fr"}}
+    ]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+from .process import rss
+
+
+@dataclass
+class BenchRequest:
+    path: str
+    method: str = "GET"
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "BenchRequest":
+        headers = dict(data.get("headers", {}))
+        body = data.get("body", "").encode()
+        if "json" in data:
+            body = json.dumps(data["json"]).encode()
+            headers.setdefault("Content-Type", "application/json")
+        return cls(data["path"], data.get("method", "GET").upper(), headers, body)
+
+
+@dataclass
+class Sample:
+    route: str
+    duration: float
+    queries: int
+    status: int
+
+
+@dataclass
+class BenchConfig:
+    requests: List[BenchRequest]
+    app: str | None = None
+    interface: str = "wsgi"
+    threads: int = 4
+    iterations: int | None = None
+    duration: float | None = 10.0
+    warmup: int = 1
+    host: str = "localhost"
+    # Keep the queries executed, for manage.py suggestindexes
+    capture_queries: bool = False
+
+
+def load_application(config: BenchConfig):
+    import django
+    from django.conf import settings
+    from django.utils.module_loading import import_string
+
+    django.setup(set_prefix=False)
+    path = config.app
+    if path is None:
+        # settings.WSGI_APPLICATION is project.wsgi.application, asgi.py sits
+        # next to it
+        path = settings.WSGI_APPLICATION
+        if config.interface == "asgi":
+            path = getattr(settings, "ASGI_APPLICATION", None) or path.replace(
+                ".wsgi.", ".asgi."
+            )
+    return import_string(path.replace(":", "."))
+
+
+def route(path: str) -> str:
+    from django.urls import Resolver404, resolve
+
+    path = urlsplit(path).path
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return "<not found>"
+    return f"/{match.route}" if match.route is not None else path
+
+
+def wsgi_call(application, request: BenchRequest, host: str) -> int:
+    from wsgiref.util import setup_testing_defaults
+
+    url = urlsplit(request.path)
+    environ = {
+        "REQUEST_METHOD": request.method,
+        "PATH_INFO": url.path,
+        "QUERY_STRING": url.query,
+        "HTTP_HOST": host,
+        "SERVER_NAME": host,
+        "CONTENT_LENGTH": str(len(request.body)),
+        "wsgi.input": BytesIO(request.body),
+    }
+    for name, value in request.headers.items():
+        key = name.upper().replace("-", "_")
+        if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            key = f"HTTP_{key}"
+        environ[key] = value
+    setup_testing_defaults(environ)
+
+    status = []
+    response = application(environ, lambda code, headers, *args: status.append(code))
+    try:
+        for _ in response:
+            pass
+    finally:
+        if hasattr(response, "close"):
+            response.close()
+    return int(status[0].split()[0])
+
+
+async def asgi_call(application, request: BenchRequest, host: str) -> int:
+    url = urlsplit(request.path)
+    headers = [(b"host", host.encode())]
+    headers.extend(
+        (name.lower().encode(), value.encode())
+        for name, value in request.headers.items()
+    )
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": request.method,
+        "scheme": "http",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "root_path": "",
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": (host, 80),
+    }
+    sent = False
+    status = []
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            # Wait forever, like a client keeping the connection open
+            await asyncio.Event().wait()
+        sent = True
+        return {"type": "http.request", "body": request.body, "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await application(scope, receive, send)
+    return status[0]
+
+
+class Worker:
+    """
+    Replay the scenario from one thread, collecting samples.
+    """
+
+    def __init__(
+        self, application, config: BenchConfig, deadline: float | None, log=None
+    ):
+        self.application = application
+        self.config = config
+        self.deadline = deadline
+        self.log = log
+        self.samples: List[Sample] = []
+        self.errors: List[str] = []
+
+    def call(self, request: BenchRequest) -> int:
+        if self.config.interface == "asgi":
+            from asgiref.sync import async_to_sync
+
+            # Sync views run back in this thread, where queries are collected
+            return async_to_sync(asgi_call)(self.application, request, self.config.host)
+        return wsgi_call(self.application, request, self.config.host)
+
+    def run(self, iterations: int | None, record: bool = True) -> None:
+        from .queries import QueryCollector
+
+        iteration = 0
+        while True:
+            if iterations is not None and iteration >= iterations:
+                return
+            for request in self.config.requests:
+                if self.deadline is not None and time.perf_counter() >= self.deadline:
+                    return
+                keep_params = self.log is not None
+                with QueryCollector(keep_params=keep_params) as queries:
+                    start = time.perf_counter()
+                    try:
+                        status = self.call(request)
+                    except Exception as exc:
+                        self.errors.append(f"{request.method} {request.path}: {exc!r}")
+                        continue
+                    duration = time.perf_counter() - start
+                if record:
+                    self.samples.append(
+                        Sample(route(request.path), duration, len(queries), status)
+                    )
+                    if self.log is not None:
+                        self.log.extend(queries)
+            iteration += 1
+
+
+def run_process(config: BenchConfig) -> Dict:
+    """
+    Run the benchmark in this process, returning its samples, errors and
+    memory use.
+    """
+    from .indexes import QueryLog
+
+    application = load_application(config)
+    log = QueryLog() if config.capture_queries else None
+
+    warmup = Worker(application, config, None)
+    warmup.run(config.warmup, record=False)
+    rss_start = rss()
+
+    start = time.perf_counter()
+    deadline = start + config.duration if config.duration else None
+    workers = [
+        Worker(application, config, deadline, log) for _ in range(config.threads)
+    ]
+    threads = [
+        threading.Thread(target=worker.run, args=(config.iterations,))
+        for worker in workers
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "elapsed": time.perf_counter() - start,
+        "samples": [asdict(sample) for worker in workers for sample in worker.samples],
+        "errors": [error for worker in workers for error in worker.errors],
+        "rss_start": rss_start,
+        "rss_end": rss(),
+        "queries": log.as_list() if log is not None else [],
+    }
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(int(round(pct / 100 * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+
+def summarize(samples: List[Dict], elapsed: float) -> Dict:
+    durations = [sample["duration"] for sample in samples]
+    queries = [sample["queries"] for sample in samples]
+    return {
+        "requests": len(samples),
+        "failures": sum(1 for sample in samples if sample["status"] >= 500),
+        "throughput": len(samples) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(durations, 50) * 1000,
+        "p95_ms": percentile(durations, 95) * 1000,
+        "p99_ms": percentile(durations, 99) * 1000,
+        "queries_per_request": sum(queries) / len(queries) if queries else 0.0,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(config: BenchConfig, processes: int = 1) -> Dict:
+    """
+    Run the benchmark in the given number of processes and return the results.
+    """
+    if processes > 1:
+        with ProcessPoolExecutor(processes) as executor:
+            runs = list(executor.map(run_process, [config] * processes))
+    else:
+        runs = [run_process(config)]
+
+    elapsed = max(result["elapsed"] for result in runs)
+    queries = [query for result in runs for query in result["queries"]]
+    by_route = defaultdict(list)
+    for result in runs:
+        for sample in result["samples"]:
+            by_route[sample["route"]].append(sample)
+
+    return {
+        "commit": git_commit(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "config": {
+            "interface": config.interface,
+            "processes": processes,
+            "threads": config.threads,
+            "iterations": config.iterations,
+            "duration": config.duration,
+        },
+        "total": summarize(
+            [sample for samples in by_route.values() for sample in samples], elapsed
+        ),
+        "routes": {
+            name: summarize(samples, elapsed)
+            for name, samples in sorted(by_route.items())
+        },
+        "memory": {
+            "rss_start_mb": sum(result["rss_start"] for result in runs) / 2**20,
+            "rss_growth_mb": sum(
+                result["rss_end"] - result["rss_start"] for result in runs
+            )
+            / 2**20,
+        },
+        "errors": [error for result in runs for error in result["errors"]][:20],
+        "queries": queries,
+    }
+
+
+def format_results(results: Dict) -> str:
+    lines = [
+        f"{'route':<40} {'req':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'queries':>8}"
+    ]
+    for name, stats in [*results["routes"].items(), ("total", results["total"])]:
+        lines.append(
+            f"{name[:40]:<40} {stats['requests']:>7} {stats['throughput']:>9.1f} "
+            f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} "
+            f"{stats['queries_per_request']:>8.1f}"
+        )
+    memory = results["memory"]
+    lines.append(
+        f"memory: {memory['rss_start_mb']:.1f} MiB after warmup, "
+        f"{memory['rss_growth_mb']:+.1f} MiB during the run"
+    )
+    lines.extend(f"error: {error}" for error in results["errors"])
+    return "\n".join(lines)
+
+
+def compare(results: Dict, baseline: Dict, max_regression: float) -> List[str]:
+    """
+    Return the routes whose p95 latency or queries per request regressed by
+    more than max_regression percent from the baseline, as messages.
+    """
+    regressions = []
+    routes = {**results["routes"], "total": results["total"]}
+    baseline_routes = {**baseline["routes"], "total": baseline["total"]}
+    for name, stats in routes.items():
+        before = baseline_routes.get(name)
+        if before is None:
+            continue
+        for key in ("p95_ms", "queries_per_request"):
+            if not before[key]:
+                continue
+            change = (stats[key] - before[key]) / before[key] * 100
+            if change > max_regression:
+                regressions.append(
+                    f"{name}: {key} {before[key]:.2f} -> {stats[key]:.2f} "
+                    f"({change:+.0f}%)"
+                )
+    return regressions
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="structured bench",
+        description="Load test the project's application in-process.",
+    )
+    parser.add_argument(
+        "--settings", help="Settings module. Default: DJANGO_SETTINGS_MODULE."
+    )
+    parser.add_argument(
+        "--app",
+        help="Dotted path to the application. Default: from WSGI_APPLICATION.",
+    )
+    parser.add_argument("--interface", choices=["wsgi", "asgi"], default="wsgi")
+    parser.add_argument("--scenario", help="JSON file of requests to replay.")
+    parser.add_argument(
+        "--path", action="append", default=[], help="Path to GET, may be repeated."
+    )
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--iterations", type=int, help="Scenario replays per thread.")
+    parser.add_argument(
+        "--duration", type=float, help="Seconds to run for. Default: 10."
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=1, help="Untimed scenario replays first."
+    )
+    parser.add_argument("--output", help="Save the results to this JSON file.")
+    parser.add_argument("--compare", help="JSON results to compare against.")
+    parser.add_argument(
+        "--capture-queries",
+        metavar="PATH",
+        help="Save the queries executed to PATH, for manage.py suggestindexes.",
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=10.0,
+        help="Percent of p95 or query regression failing --compare.",
+    )
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argument_parser()
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.getcwd())
+    if args.settings:
+        os.environ["DJANGO_SETTINGS_MODULE"] = args.settings
+    if "DJANGO_SETTINGS_MODULE" not in os.environ:
+        parser.error("set DJANGO_SETTINGS_MODULE or pass --settings")
+
+    requests = [BenchRequest(path) for path in args.path]
+    if args.scenario:
+        with open(args.scenario) as scenario:
+            requests.extend(
+                BenchRequest.from_dict(data) for data in json.load(scenario)
+            )
+    if not requests:
+        parser.error("give requests to make with --path or --scenario")
+
+    duration = args.duration
+    if duration is None and args.iterations is None:
+        duration = 10.0
+    config = BenchConfig(
+        requests=requests,
+        app=args.app,
+        interface=args.interface,
+        threads=args.threads,
+        iterations=args.iterations,
+        duration=duration,
+        warmup=args.warmup,
+        capture_queries=args.capture_queries is not None,
+    )
+    results = run(config, args.processes)
+    print(format_results(results))
+
+    queries = results.pop("queries")
+    if args.capture_queries:
+        from .indexes import CapturedQuery, QueryLog
+
+        QueryLog(CapturedQuery(**query) for query in queries).save(args.capture_queries)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            regressions = compare(results, json.load(baseline), args.max_regression)
+        if regressions:
+            print(f"\nRegressions against {args.compare}:")
+            print("\n".join(regressions))
+            return 1
+        print(f"\nNo regressions against {args.compare}")
+    return 0
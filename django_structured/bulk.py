@@ -0,0 +1,324 @@
+"""
+Bulk data helpers with bounded memory use:
+
+* streaming_export() streams a queryset as CSV or JSON through a
+  StreamingHttpResponse, reading rows with QuerySet.iterator() (or
+  aiterator() under ASGI), so memory use doesn't grow with the number of
+  rows.
+* bulk_upsert() inserts or updates rows in batches with
+  bulk_create(update_conflicts=True), or bulk_create and bulk_update where
+  the database or Django version doesn't support it, reporting progress as it
+  goes.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import logging
+import time
+from itertools import islice
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Sequence
+
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.http import StreamingHttpResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 2000
+DEFAULT_BATCH_SIZE = 1000
+
+
+def export_rows(
+    queryset, fields: Sequence[str], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[tuple]:
+    """
+    Yield the given fields (which may span relations, e.g. "author__name") of
+    every row of the queryset as tuples, fetching chunk_size rows at a time
+    without caching them on the queryset.
+    """
+    return queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def row_chunks(
+    queryset, fields: Sequence[str], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[List[tuple]]:
+    """
+    Yield the exported rows of the queryset in lists of chunk_size rows, the
+    last one shorter (possibly empty).
+    """
+    rows = export_rows(queryset, fields, chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+
+
+async def arow_chunks(
+    queryset, fields: Sequence[str], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> AsyncIterator[List[tuple]]:
+    """
+    Async version of row_chunks(), reading rows with QuerySet.aiterator().
+    """
+    chunk = []
+    # values(), as values_list().aiterator() runs its query in the event loop
+    rows = queryset.values(*fields).aiterator(chunk_size=chunk_size)
+    async for row in rows:
+        chunk.append(tuple(row[field] for field in fields))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    yield chunk
+
+
+class CSVEncoder:
+    """
+    Encode chunks of rows as CSV, the first one after a header row.
+    """
+
+    def __init__(self, header: Sequence[str]):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.writer.writerow(header)
+
+    def encode(self, chunk: List[tuple], last: bool) -> bytes:
+        self.writer.writerows(chunk)
+        data = self.buffer.getvalue().encode()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+def _dumps(rows: list) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(
+            rows, default=DjangoJSONEncoder().default, option=orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(rows, cls=DjangoJSONEncoder).encode()
+
+
+class JSONEncoder:
+    """
+    Encode chunks of rows as one JSON array of objects keyed by field.
+    """
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = fields
+        self.separator = b"["
+
+    def encode(self, chunk: List[tuple], last: bool) -> bytes:
+        data = b""
+        if chunk:
+            # Strip the brackets of each chunk's array to splice them together
+            rows = [dict(zip(self.fields, row)) for row in chunk]
+            data = self.separator + _dumps(rows)[1:-1]
+            self.separator = b","
+        if last:
+            data += b"[]" if self.separator == b"[" else b"]"
+        return data
+
+
+def csv_stream(
+    queryset,
+    fields: Sequence[str],
+    header: Sequence[str] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Yield the rows of the queryset as CSV, one chunk of rows at a time.
+    """
+    encoder = CSVEncoder(header or fields)
+    for chunk in row_chunks(queryset, fields, chunk_size):
+        yield encoder.encode(chunk, len(chunk) < chunk_size)
+
+
+async def acsv_stream(
+    queryset,
+    fields: Sequence[str],
+    header: Sequence[str] | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Async version of csv_stream().
+    """
+    encoder = CSVEncoder(header or fields)
+    async for chunk in arow_chunks(queryset, fields, chunk_size):
+        yield encoder.encode(chunk, len(chunk) < chunk_size)
+
+
+def json_stream(
+    queryset,
+    fields: Sequence[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Yield the rows of the queryset as a JSON array of objects keyed by field,
+    one chunk of rows at a time.
+    """
+    encoder = JSONEncoder(fields)
+    for chunk in row_chunks(queryset, fields, chunk_size):
+        yield encoder.encode(chunk, len(chunk) < chunk_size)
+
+
+async def ajson_stream(
+    queryset,
+    fields: Sequence[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """
+    Async version of json_stream().
+    """
+    encoder = JSONEncoder(fields)
+    async for chunk in arow_chunks(queryset, fields, chunk_size):
+        yield encoder.encode(chunk, len(chunk) < chunk_size)
+
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", csv_stream, acsv_stream),
+    "json": ("application/json", json_stream, ajson_stream),
+}
+
+
+def streaming_export(
+    queryset,
+    fields: Sequence[str],
+    format: str = "csv",
+    filename: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    *,
+    request=None,
+) -> StreamingHttpResponse:
+    """
+    Return a response streaming the given fields of the queryset's rows as
+    "csv" or "json", as an attachment if filename is given.
+
+    Under ASGI (when called from an async view, or given an ASGIRequest), rows
+    are read with QuerySet.aiterator() by an async generator: Django would
+    read a synchronous iterator to its end before sending anything.
+
+        def export_books(request):
+            return streaming_export(
+                Book.objects.order_by("pk"),
+                ["id", "title", "author__name"],
+                filename="books.csv",
+                request=request,
+            )
+    """
+    content_type, stream, astream = EXPORT_FORMATS[format]
+    if isinstance(request, ASGIRequest) or _in_event_loop():
+        stream = astream
+    response = StreamingHttpResponse(
+        stream(queryset, fields, chunk_size=chunk_size), content_type=content_type
+    )
+    if filename:
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def supports_upsert(model, using: str) -> bool:
+    features = connections[using].features
+    # Django < 4.1 has no update_conflicts
+    return getattr(features, "supports_update_conflicts_with_target", False)
+
+
+def _upsert_batch(model, objs, unique_fields, update_fields, using) -> None:
+    manager = model._base_manager.db_manager(using)
+    if supports_upsert(model, using):
+        manager.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields,
+        )
+        return
+
+    # Split the batch into rows to update and rows to create
+    def key(obj):
+        return tuple(getattr(obj, field) for field in unique_fields)
+
+    lookup = {}
+    for field in unique_fields:
+        lookup[f"{field}__in"] = {getattr(obj, field) for obj in objs}
+    existing = {key(obj): obj.pk for obj in manager.filter(**lookup)}
+    to_update, to_create = [], []
+    for obj in objs:
+        pk = existing.get(key(obj))
+        if pk is None:
+            to_create.append(obj)
+        else:
+            obj.pk = pk
+            to_update.append(obj)
+    if to_update and update_fields:
+        manager.bulk_update(to_update, update_fields)
+    if to_create:
+        manager.bulk_create(to_create)
+
+
+def bulk_upsert(
+    model,
+    rows: Iterable[Dict | object],
+    unique_fields: Sequence[str],
+    update_fields: Sequence[str] | None = None,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    using: str = "default",
+    progress: Callable[[int, float], None] | None = None,
+) -> int:
+    """
+    Insert or update rows of model (dictionaries of field values or model
+    instances), matching existing rows by unique_fields. update_fields default
+    to all other concrete fields. Rows are consumed batch_size at a time, each
+    batch in its own transaction, so an iterator of any length may be passed.
+
+    progress, if given, is called after each batch with the number of rows
+    processed so far and the seconds elapsed. Progress is logged at debug
+    level otherwise.
+
+    Returns the number of rows processed.
+    """
+    if update_fields is None:
+        update_fields = [
+            field.name
+            for field in model._meta.concrete_fields
+            if not field.primary_key and field.name not in unique_fields
+        ]
+
+    rows = iter(rows)
+    processed = 0
+    start = time.perf_counter()
+    while True:
+        batch = [
+            row if isinstance(row, model) else model(**row)
+            for row in islice(rows, batch_size)
+        ]
+        if not batch:
+            break
+        with transaction.atomic(using=using):
+            _upsert_batch(model, batch, unique_fields, update_fields, using)
+
+        processed += len(batch)
+        elapsed = time.perf_counter() - start
+        if progress is not None:
+            progress(processed, elapsed)
+        else:
+            log.debug(
+                f"{model._meta.label}: {processed} rows upserted "
+                f"({processed / elapsed:,.0f} rows/s)"
+            )
+    return processed
@@ -0,0 +1,531 @@
+"""
+Package the project and its dependencies into a single executable zipapp,
+with precompiled bytecode, for fast container and serverless cold starts:
+imports are read from one archive instead of stat-ing and opening thousands
+of small files across sys.path.
+
+Run with `structured bundle` from the project's root directory:
+
+    structured bundle -r requirements.txt --output project.pyz
+    structured bundle --site-packages .venv/lib/python3.12/site-packages
+    python project.pyz migrate
+    python project.pyz check --deploy
+
+Modules are compiled to unchecked-hash .pyc files next to their sources, the
+layout zipimport loads bytecode from (it ignores __pycache__), so they're
+never compiled or checked against their source at startup. Use --no-source
+to leave the sources out.
+
+Native extensions can't be imported from an archive, nor can Django read
+templates, translations and static files, or list management commands in
+one. Packages with native extensions, data files and management commands are
+extracted on first run to a cache directory per build
+($STRUCTURED_BUNDLE_CACHE, default ~/.cache/structured-bundle).
+Run the bundle once while building container images to extract them ahead
+of time.
+
+With --measure, the startup time (and system calls, when strace is
+installed) of a management command is compared with running it from the
+project directory and site-packages.
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import importlib.machinery
+import os
+import py_compile
+import re
+import shlex
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Set
+
+DEFAULT_EXCLUDES = ("__pycache__", "*.pyc", "*.pyo", "*.po", "*.pth")
+# Installers and the like, never imported at runtime
+DEFAULT_EXCLUDED_DISTRIBUTIONS = ("pip", "setuptools", "wheel", "_distutils_hack")
+NATIVE_SUFFIXES = tuple(importlib.machinery.EXTENSION_SUFFIXES) + (
+    ".so",
+    ".pyd",
+    ".dylib",
+)
+PYTHON_SUFFIXES = (".py", ".pyc", ".pyi")
+# Where native packages are stored in the archive, out of sight of zipimport
+NATIVE_DIR = "_native"
+EXTRACT_LIST = "_bundle/extract"
+# System calls of imports looking for and reading modules
+FILE_SYSCALLS = {
+    "access",
+    "fstat",
+    "getdents64",
+    "lstat",
+    "newfstatat",
+    "open",
+    "openat",
+    "readlink",
+    "stat",
+    "statx",
+}
+
+BOOTSTRAP = '''\
+# Generated by `structured bundle`
+import os
+import sys
+
+BUNDLE_ID = {bundle_id!r}
+EXTRACT = {extract!r}
+MODULE, FUNCTION = {module!r}, {function!r}
+
+
+def extract(archive, target):
+    """
+    Extract native extensions and data files, once per build.
+    """
+    import shutil
+    import tempfile
+    import zipfile
+
+    parent = os.path.dirname(target)
+    os.makedirs(parent, exist_ok=True)
+    temporary = tempfile.mkdtemp(dir=parent)
+    with zipfile.ZipFile(archive) as bundle:
+        for name in bundle.read({extract_list!r}).decode().splitlines():
+            bundle.extract(name, temporary)
+    try:
+        os.rename(temporary, target)
+    except OSError:
+        # Extracted by another process in the meantime
+        shutil.rmtree(temporary)
+
+
+def find_app_data(archive, target):
+    """
+    Look for apps' templates, translations and static files in the extracted
+    data files, as Django reads them from the filesystem.
+    """
+    from django.apps.config import AppConfig
+
+    path_from_module = AppConfig._path_from_module
+
+    def _path_from_module(self, module):
+        path = path_from_module(self, module)
+        relative = os.path.relpath(os.path.abspath(path), archive)
+        extracted = os.path.join(target, relative)
+        if not relative.startswith(os.pardir) and os.path.isdir(extracted):
+            return extracted
+        return path
+
+    AppConfig._path_from_module = _path_from_module
+
+
+archive = os.path.dirname(os.path.abspath(__file__))
+if EXTRACT:
+    cache = os.environ.get("STRUCTURED_BUNDLE_CACHE") or os.path.join(
+        os.path.expanduser("~"), ".cache", "structured-bundle"
+    )
+    target = os.path.join(cache, BUNDLE_ID)
+    if not os.path.isdir(target):
+        extract(archive, target)
+    sys.path.insert(1, os.path.join(target, {native_dir!r}))
+    try:
+        find_app_data(archive, target)
+    except ImportError:
+        pass
+
+module = __import__(MODULE, fromlist=[FUNCTION])
+sys.exit(getattr(module, FUNCTION)())
+'''
+
+
+def excluded(name: str, excludes: Iterable[str]) -> bool:
+    return any(fnmatch.fnmatch(name, pattern) for pattern in excludes)
+
+
+def copy_tree(source: Path, destination: Path, excludes: Iterable[str]) -> None:
+    shutil.copytree(
+        source,
+        destination,
+        ignore=lambda directory, names: [
+            name for name in names if excluded(name, excludes)
+        ],
+        dirs_exist_ok=True,
+    )
+
+
+def collect_project(project: Path, staging: Path, excludes: Iterable[str]) -> None:
+    """
+    Copy the project's packages and top-level modules.
+    """
+    for path in sorted(project.iterdir()):
+        if excluded(path.name, excludes) or path.resolve() == staging.resolve():
+            continue
+        if path.is_dir() and (path / "__init__.py").is_file():
+            copy_tree(path, staging / path.name, excludes)
+        elif path.is_file() and path.suffix == ".py":
+            shutil.copy2(path, staging / path.name)
+
+
+def collect_site_packages(
+    site_packages: Path, staging: Path, excludes: Iterable[str]
+) -> None:
+    for path in sorted(site_packages.iterdir()):
+        distribution = re.split(r"[-.]", path.name)[0]
+        if excluded(path.name, excludes) or distribution in (
+            DEFAULT_EXCLUDED_DISTRIBUTIONS
+        ):
+            continue
+        if path.is_dir():
+            copy_tree(path, staging / path.name, excludes)
+        else:
+            shutil.copy2(path, staging / path.name)
+
+
+def install_requirements(requirements: str, staging: Path) -> None:
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "pip",
+            "install",
+            "--quiet",
+            "--disable-pip-version-check",
+            "--no-compile",
+            "--target",
+            str(staging),
+            "--requirement",
+            requirements,
+        ],
+        check=True,
+    )
+
+
+def is_native(path: Path) -> bool:
+    if path.is_dir():
+        return path.name.endswith((".libs", ".dylibs")) or any(
+            file.name.endswith(NATIVE_SUFFIXES) for file in path.rglob("*")
+        )
+    return path.name.endswith(NATIVE_SUFFIXES)
+
+
+def native_entries(root: Path) -> Set[str]:
+    """
+    Top-level packages and modules of root that include native code.
+    """
+    return {path.name for path in root.iterdir() if is_native(path)}
+
+
+def is_data(relative: str) -> bool:
+    """
+    Whether a file is package data, rather than code or metadata.
+    """
+    top = relative.split("/", 1)[0]
+    return (
+        "/" in relative
+        and not relative.endswith(PYTHON_SUFFIXES)
+        and not top.endswith((".dist-info", ".egg-info"))
+        and not relative.endswith("/py.typed")
+    )
+
+
+def is_listed(relative: str) -> bool:
+    """
+    Whether a module is found by listing a directory, as Django does for
+    management commands.
+    """
+    return "/management/commands/" in relative and relative.endswith(".pyc")
+
+
+def compile_tree(
+    root: Path, optimize: int = -1, keep_source: bool = True, skip: Set[str] = set()
+) -> List[str]:
+    """
+    Compile every module under root to an unchecked-hash .pyc file next to
+    it, where zipimport looks for bytecode. Returns the modules that failed to
+    compile, which are left as sources.
+    """
+    failed = []
+    for path in sorted(root.rglob("*.py")):
+        relative = path.relative_to(root)
+        if relative.parts[0] in skip:
+            continue
+        try:
+            py_compile.compile(
+                str(path),
+                cfile=f"{path}c",
+                dfile=str(relative),
+                doraise=True,
+                optimize=optimize,
+                invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+            )
+        except py_compile.PyCompileError:
+            failed.append(str(relative))
+            continue
+        if not keep_source:
+            path.unlink()
+    return failed
+
+
+def files(root: Path) -> Iterator[Path]:
+    for path in sorted(root.rglob("*")):
+        if path.is_file():
+            yield path
+
+
+def bundle_id(root: Path) -> str:
+    digest = hashlib.sha256()
+    for path in files(root):
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def write_archive(
+    root: Path,
+    output: Path,
+    main: str | None = None,
+    interpreter: str | None = None,
+    compress: bool = False,
+) -> Dict:
+    """
+    Write the contents of root to a zip archive, with native packages moved
+    out of the way of zipimport and, given main as "module:function", a
+    __main__ module extracting what needs to be and calling main.
+    """
+    native = native_entries(root)
+    extract = []
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    temporary = output.with_name(f".{output.name}.tmp")
+    with temporary.open("wb") as archive_file:
+        if interpreter:
+            archive_file.write(f"#!{interpreter}\n".encode())
+        with zipfile.ZipFile(archive_file, "w", compression) as archive:
+            for path in files(root):
+                relative = path.relative_to(root).as_posix()
+                if relative.split("/", 1)[0] in native:
+                    relative = f"{NATIVE_DIR}/{relative}"
+                    extract.append(relative)
+                elif is_data(relative) or is_listed(relative):
+                    extract.append(relative)
+                archive.write(path, relative)
+
+            if extract:
+                archive.writestr(EXTRACT_LIST, "\n".join(extract))
+            if main is not None:
+                module, _, function = main.partition(":")
+                bootstrap = BOOTSTRAP.format(
+                    bundle_id=bundle_id(root),
+                    extract=bool(extract),
+                    extract_list=EXTRACT_LIST,
+                    native_dir=NATIVE_DIR,
+                    module=module,
+                    function=function or "main",
+                )
+                archive.writestr("__main__.py", bootstrap)
+                archive.writestr(
+                    "__main__.pyc", _compile_source(bootstrap, "__main__.py")
+                )
+    os.replace(temporary, output)
+    if interpreter:
+        executable = stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH
+        output.chmod(output.stat().st_mode | executable)
+    return {"native": sorted(native), "extract": len(extract)}
+
+
+def _compile_source(source: str, filename: str) -> bytes:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory, filename)
+        path.write_text(source)
+        py_compile.compile(
+            str(path),
+            cfile=f"{path}c",
+            dfile=filename,
+            doraise=True,
+            invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+        )
+        return Path(f"{path}c").read_bytes()
+
+
+def build(
+    project: Path | str,
+    output: Path | str,
+    main: str = "manage:main",
+    requirements: Iterable[str] = (),
+    site_packages: Iterable[Path | str] = (),
+    interpreter: str | None = "/usr/bin/env python3",
+    keep_source: bool = True,
+    optimize: int = -1,
+    compress: bool = False,
+    excludes: Iterable[str] = DEFAULT_EXCLUDES,
+) -> Dict:
+    project, output = Path(project), Path(output)
+    excludes = list(excludes)
+    with tempfile.TemporaryDirectory() as staging:
+        staging = Path(staging)
+        for path in site_packages:
+            collect_site_packages(Path(path), staging, excludes)
+        for path in requirements:
+            install_requirements(path, staging)
+        collect_project(project, staging, excludes)
+
+        failed = compile_tree(
+            staging, optimize, keep_source, skip=native_entries(staging)
+        )
+        results = write_archive(staging, output, main, interpreter, compress)
+    results.update(
+        {"output": str(output), "size": output.stat().st_size, "failed": failed}
+    )
+    return results
+
+
+def count_syscalls(summary: str) -> Dict[str, int]:
+    """
+    Parse the summary of `strace -c`, returning the total number of system
+    calls and those looking for and reading files.
+    """
+    total = file_calls = 0
+    for line in summary.splitlines():
+        fields = line.split()
+        if len(fields) < 5 or not fields[3].isdigit():
+            continue
+        calls, name = int(fields[3]), fields[-1]
+        if name == "total":
+            total = calls
+        elif name in FILE_SYSCALLS:
+            file_calls += calls
+    return {"syscalls": total, "file_syscalls": file_calls}
+
+
+def measure_startup(command: List[str], cwd: Path, repeat: int = 5) -> Dict:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, check=True, capture_output=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    results = {"seconds": best, "syscalls": None, "file_syscalls": None}
+
+    strace = shutil.which("strace")
+    if strace is not None:
+        with tempfile.NamedTemporaryFile("r") as summary:
+            subprocess.run(
+                [strace, "-f", "-c", "-o", summary.name, *command],
+                cwd=cwd,
+                check=True,
+                capture_output=True,
+            )
+            results.update(count_syscalls(summary.read()))
+    return results
+
+
+def format_measurements(measurements: Dict[str, Dict]) -> str:
+    lines = [f"{'':<16} {'startup':>10} {'syscalls':>10} {'file syscalls':>14}"]
+    for label, results in measurements.items():
+        syscalls = results["syscalls"]
+        file_syscalls = results["file_syscalls"]
+        lines.append(
+            f"{label:<16} {results['seconds'] * 1000:>7.1f} ms "
+            f"{'n/a' if syscalls is None else syscalls:>10} "
+            f"{'n/a' if file_syscalls is None else file_syscalls:>14}"
+        )
+    if any(results["syscalls"] is None for results in measurements.values()):
+        lines.append("(install strace to count system calls)")
+    return "\n".join(lines)
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="structured bundle",
+        description="Package the project and its dependencies into a zipapp.",
+    )
+    parser.add_argument("--output", default="project.pyz")
+    parser.add_argument(
+        "--main", default="manage:main", help="Function to run, as module:function."
+    )
+    parser.add_argument(
+        "-r",
+        "--requirements",
+        action="append",
+        default=[],
+        help="Requirements file to install into the bundle, may be repeated.",
+    )
+    parser.add_argument(
+        "--site-packages",
+        action="append",
+        default=[],
+        help="Directory of installed packages to bundle, may be repeated.",
+    )
+    parser.add_argument(
+        "--python", default="/usr/bin/env python3", help="Interpreter of the shebang."
+    )
+    parser.add_argument(
+        "--no-source", action="store_true", help="Only include compiled modules."
+    )
+    parser.add_argument(
+        "--optimize", type=int, default=-1, help="Optimization level, as python -O."
+    )
+    parser.add_argument(
+        "--compress", action="store_true", help="Deflate files (slower imports)."
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        help="Glob of file or directory names to leave out, may be repeated.",
+    )
+    parser.add_argument(
+        "--measure",
+        metavar="COMMAND",
+        help='Management command to time with and without the bundle, e.g. "check".',
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argument_parser()
+    args = parser.parse_args(argv)
+
+    project = Path.cwd()
+    module = args.main.partition(":")[0]
+    script = project.joinpath(*module.split(".")).with_suffix(".py")
+    if not script.is_file():
+        parser.error(f"no module {module} in {project}")
+
+    results = build(
+        project,
+        args.output,
+        main=args.main,
+        requirements=args.requirements,
+        site_packages=args.site_packages,
+        interpreter=args.python,
+        keep_source=not args.no_source,
+        optimize=args.optimize,
+        compress=args.compress,
+        excludes=[*DEFAULT_EXCLUDES, *args.exclude],
+    )
+    print(f"Wrote {results['output']} ({results['size'] / 1024 / 1024:.1f} MB)")
+    if results["native"]:
+        print(f"Extracted on first run: {', '.join(results['native'])}")
+    if results["failed"]:
+        print(f"Left uncompiled: {', '.join(results['failed'])}")
+
+    if args.measure:
+        command = shlex.split(args.measure)
+        output = str(Path(args.output).resolve())
+        measurements = {
+            "site-packages": measure_startup(
+                [sys.executable, str(script), *command], project, args.repeat
+            ),
+            "bundle": measure_startup(
+                [sys.executable, output, *command], project, args.repeat
+            ),
+        }
+        print()
+        print(format_measurements(measurements))
+    return 0
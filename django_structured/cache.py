@@ -0,0 +1,364 @@
+"""
+Caching of computed values, views and template fragments with stampede
+protection:
+
+* Early probabilistic recomputation (XFetch): each read may decide to
+  recompute a value shortly before it expires, with a probability growing as
+  expiry nears and with the time the value took to compute. Under load, one
+  request refreshes the value while others keep being served from cache.
+* A per-key lock (cache.add) so only one process recomputes a missing value;
+  the others serve the previous value, or wait for the new one. The lock
+  holds a token, so a process whose lock expired doesn't release the lock
+  another process took since.
+
+Hits, misses and recompute time are reported to the request's profile (see
+django_structured.profiling), as the cache-hit, cache-miss and
+cache-recompute metrics.
+
+Configure with the STRUCTURED_CACHE setting, see cache_settings().
+"""
+
+import asyncio
+import hashlib
+import math
+import random
+import time
+import uuid
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, NamedTuple
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+
+from . import profiling
+
+
+def cache_settings() -> Dict:
+    options = {
+        # Cache alias used unless given explicitly
+        "CACHE": "default",
+        # Eagerness of early recomputation: >1 recomputes earlier, 0 never
+        "BETA": 1.0,
+        # Seconds a recomputation may hold its key's lock
+        "LOCK_TIMEOUT": 10,
+        # Seconds to wait for another process to compute a missing value
+        # before computing it anyway
+        "LOCK_WAIT": 2.0,
+        "KEY_PREFIX": "structured",
+    }
+    options.update(getattr(settings, "STRUCTURED_CACHE", {}))
+    return options
+
+
+class Entry(NamedTuple):
+    value: Any
+    # Seconds the value took to compute
+    delta: float
+    # time.time() at which the value expires
+    expiry: float
+
+
+def make_key(*parts: Any, prefix: str | None = None) -> str:
+    """
+    Return a cache key for the given parts, safe for every cache backend
+    whatever the parts contain.
+    """
+    if prefix is None:
+        prefix = cache_settings()["KEY_PREFIX"]
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:40]
+    return f"{prefix}:{digest}"
+
+
+def should_recompute(entry: Entry, beta: float, now: float | None = None) -> bool:
+    """
+    Return whether to recompute a cached value before it expires (XFetch):
+    the closer to expiry and the slower the value was to compute, the likelier.
+    """
+    if now is None:
+        now = time.time()
+    # -log(u) for u in (0, 1] is exponentially distributed, mean 1
+    return now - entry.delta * beta * math.log(1 - random.random()) >= entry.expiry
+
+
+class CachedValue:
+    """
+    Get-or-compute of a single key, shared by the sync and async paths.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        *,
+        timeout: float,
+        cache: str | None = None,
+        version: int | None = None,
+        beta: float | None = None,
+        cacheable: Callable[[Any], bool] | None = None,
+        name: str | None = None,
+    ):
+        options = cache_settings()
+        self.key = key
+        self.lock_key = f"{key}:lock"
+        self.timeout = timeout
+        self.cache = caches[cache or options["CACHE"]]
+        self.version = version
+        self.beta = options["BETA"] if beta is None else beta
+        self.lock_timeout = options["LOCK_TIMEOUT"]
+        self.lock_wait = options["LOCK_WAIT"]
+        self.cacheable = cacheable
+        self.name = name or key
+
+    def fresh(self, entry: Entry | None) -> bool:
+        if entry is None:
+            profiling.record("cache-miss")
+            return False
+        if self.beta and should_recompute(entry, self.beta):
+            return False
+        profiling.record("cache-hit")
+        return True
+
+    def entry(self, value: Any, delta: float) -> Entry | None:
+        profiling.record("cache-recompute", delta, self.name)
+        if self.cacheable is not None and not self.cacheable(value):
+            return None
+        return Entry(value, delta, time.time() + self.timeout)
+
+    def get(self, compute: Callable[[], Any]) -> Any:
+        entry = self.cache.get(self.key, version=self.version)
+        if self.fresh(entry):
+            return entry.value
+
+        token = uuid.uuid4().hex
+        if not self.cache.add(
+            self.lock_key, token, self.lock_timeout, version=self.version
+        ):
+            # Someone else is recomputing: serve the current value if there is
+            # one, else give them a chance to finish
+            if entry is not None:
+                return entry.value
+            deadline = time.monotonic() + self.lock_wait
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                entry = self.cache.get(self.key, version=self.version)
+                if entry is not None:
+                    return entry.value
+            return compute()
+
+        try:
+            start = time.perf_counter()
+            value = compute()
+            entry = self.entry(value, time.perf_counter() - start)
+            if entry is not None:
+                self.cache.set(self.key, entry, self.timeout, version=self.version)
+            return value
+        finally:
+            if self.cache.get(self.lock_key, version=self.version) == token:
+                self.cache.delete(self.lock_key, version=self.version)
+
+    async def aget(self, compute: Callable[[], Any]) -> Any:
+        entry = await self.cache.aget(self.key, version=self.version)
+        if self.fresh(entry):
+            return entry.value
+
+        token = uuid.uuid4().hex
+        if not await self.cache.aadd(
+            self.lock_key, token, self.lock_timeout, version=self.version
+        ):
+            if entry is not None:
+                return entry.value
+            deadline = time.monotonic() + self.lock_wait
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                entry = await self.cache.aget(self.key, version=self.version)
+                if entry is not None:
+                    return entry.value
+            return await compute()
+
+        try:
+            start = time.perf_counter()
+            value = await compute()
+            entry = self.entry(value, time.perf_counter() - start)
+            if entry is not None:
+                await self.cache.aset(
+                    self.key, entry, self.timeout, version=self.version
+                )
+            return value
+        finally:
+            if await self.cache.aget(self.lock_key, version=self.version) == token:
+                await self.cache.adelete(self.lock_key, version=self.version)
+
+
+def get_or_compute(key: str, compute: Callable[[], Any], timeout: float, **options):
+    """
+    Return the value cached under key, computing and caching it with
+    compute() if needed. Options are those of CachedValue: cache, version,
+    beta, cacheable and name.
+    """
+    return CachedValue(key, timeout=timeout, **options).get(compute)
+
+
+def cached(timeout: float, *, key: Callable[..., Iterable] | None = None, **options):
+    """
+    Decorator caching a function's results by its arguments (or by the parts
+    returned by key(*args, **kwargs)), e.g. to cache fragments of HTML built
+    in Python. Arguments must have a stable repr().
+    """
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        def parts(args, kwargs):
+            if key is not None:
+                return tuple(key(*args, **kwargs))
+            return args, sorted(kwargs.items())
+
+        if iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cached_value = CachedValue(
+                    make_key(name, parts(args, kwargs)),
+                    timeout=timeout,
+                    name=name,
+                    **options,
+                )
+                return await cached_value.aget(lambda: func(*args, **kwargs))
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_compute(
+                make_key(name, parts(args, kwargs)),
+                lambda: func(*args, **kwargs),
+                timeout,
+                name=name,
+                **options,
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def cacheable_response(
+    response, request=None, vary_on_headers: Iterable[str] = ()
+) -> bool:
+    """
+    Return whether a view's response may be served to every request with the
+    same cache key: a successful, complete response setting no cookie, not
+    private or no-store, and only varying on the given request headers.
+    Responses rendering the client's CSRF token or, unless they vary on
+    Cookie, reading its session are specific to the client too.
+    """
+    cache_control = response.get("Cache-Control", "").lower()
+    if (
+        response.status_code != 200
+        or response.streaming
+        or response.cookies
+        or "private" in cache_control
+        or "no-store" in cache_control
+    ):
+        return False
+    allowed = {header.lower() for header in vary_on_headers}
+    vary = {
+        header.strip().lower()
+        for header in response.get("Vary", "").split(",")
+        if header.strip()
+    }
+    if not vary <= allowed:
+        return False
+    if request is not None:
+        # Set by get_token(), CsrfViewMiddleware then sets the cookie
+        if request.META.get("CSRF_COOKIE_NEEDS_UPDATE"):
+            return False
+        # SessionMiddleware then adds Vary: Cookie
+        session = getattr(request, "session", None)
+        if session is not None and session.accessed and "cookie" not in allowed:
+            return False
+    return True
+
+
+def cache_view(
+    timeout: float,
+    *,
+    vary_on_headers: Iterable[str] = (),
+    vary_on_user: bool = False,
+    version: int | Callable | None = None,
+    **options,
+):
+    """
+    Decorator caching a view's successful GET and HEAD responses, by full
+    path, the given request headers and optionally the user. Responses that
+    are specific to a client (see cacheable_response) aren't cached: setting
+    cookies, marked private or no-store, varying on other headers, rendering
+    a CSRF token, or reading the session unless vary_on_user.
+
+    version may be a callable taking the request, e.g. to return a number
+    bumped whenever the underlying data changes. Other options are those of
+    CachedValue: cache, beta and name.
+
+        @cache_view(60, vary_on_headers=["Accept-Language"])
+        def article_list(request):
+            ...
+    """
+    vary_on_headers = tuple(vary_on_headers)
+    vary_headers = vary_on_headers + (("Cookie",) if vary_on_user else ())
+
+    def decorator(view):
+        name = f"{view.__module__}.{view.__qualname__}"
+
+        def cached_value(request):
+            parts = [name, request.get_full_path()]
+            parts.extend(request.headers.get(header) for header in vary_on_headers)
+            if vary_on_user:
+                parts.append(request.user.pk)
+            return CachedValue(
+                make_key(*parts),
+                timeout=timeout,
+                version=version(request) if callable(version) else version,
+                cacheable=lambda response: cacheable_response(
+                    response, request, vary_headers
+                ),
+                name=name,
+                **options,
+            )
+
+        def vary(response):
+            patch_vary_headers(response, vary_headers)
+            return response
+
+        def render(response):
+            if hasattr(response, "render") and not response.is_rendered:
+                response.render()
+            return response
+
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return await view(request, *args, **kwargs)
+
+                async def compute():
+                    return render(await view(request, *args, **kwargs))
+
+                return vary(await cached_value(request).aget(compute))
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            return vary(
+                cached_value(request).get(
+                    lambda: render(view(request, *args, **kwargs))
+                )
+            )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,175 @@
+"""
+Performance checks run by `manage.py check --deploy`, for settings that are
+fine in development but slow in deployed environments.
+
+Every finding carries an estimated impact ("high", "medium" or "low"), as its
+`impact` attribute and at the end of its hint. Projects add their own rules
+with the performance_rule decorator:
+
+    from django_structured.checks import performance_rule
+
+    @performance_rule("myproject.W001", impact="low", hint="Use Redis.")
+    def check_session_engine(settings):
+        if settings.SESSION_ENGINE == "django.contrib.sessions.backends.db":
+            return "Sessions are stored in the database."
+
+A rule is given django.conf.settings and returns a message, a list of
+messages, or None when it finds nothing.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List
+
+from django.conf import settings
+from django.core import checks
+
+IMPACTS = ("high", "medium", "low")
+
+
+@dataclass
+class Rule:
+    id: str
+    func: Callable
+    impact: str
+    level: int = checks.WARNING
+    hint: str | None = None
+
+    def run(self) -> List[checks.CheckMessage]:
+        messages = self.func(settings)
+        if messages is None:
+            return []
+        if isinstance(messages, str):
+            messages = [messages]
+        hint = f"{self.hint} " if self.hint else ""
+        results = []
+        for message in messages:
+            result = checks.CheckMessage(
+                self.level,
+                message,
+                hint=f"{hint}Estimated impact: {self.impact}.",
+                id=self.id,
+            )
+            result.impact = self.impact
+            results.append(result)
+        return results
+
+
+# Every performance rule, by id
+rules: Dict[str, Rule] = {}
+
+
+def performance_rule(
+    id: str, impact: str, level: int = checks.WARNING, hint: str | None = None
+):
+    """
+    Decorator registering a performance rule, run by the performance check.
+    Registering a rule with an existing id replaces it.
+    """
+    if impact not in IMPACTS:
+        raise ValueError(f"impact must be one of {IMPACTS}, not {impact!r}")
+
+    def decorator(func):
+        rules[id] = Rule(id, func, impact, level, hint)
+        return func
+
+    return decorator
+
+
+@performance_rule(
+    "structured.E001",
+    impact="high",
+    level=checks.ERROR,
+    hint="Set DEBUG = False in the environment's settings.",
+)
+def check_debug(settings):
+    if settings.DEBUG:
+        return (
+            "DEBUG is True: every SQL query is kept in connection.queries, "
+            "growing memory without bound, and error pages expose internals."
+        )
+
+
+@performance_rule(
+    "structured.W001",
+    impact="medium",
+    hint="Use a shared cache, e.g. django.core.cache.backends.redis.RedisCache.",
+)
+def check_locmem_cache(settings):
+    return [
+        f"Cache {alias!r} is a per-process LocMemCache: each worker has its own "
+        "copy, so hit rates drop as workers are added and invalidations don't "
+        "reach other processes."
+        for alias, options in settings.CACHES.items()
+        if options.get("BACKEND", "").endswith("locmem.LocMemCache")
+    ]
+
+
+@performance_rule(
+    "structured.W002",
+    impact="medium",
+    hint='Set "CONN_MAX_AGE" (e.g. 60) and "CONN_HEALTH_CHECKS": True.',
+)
+def check_conn_max_age(settings):
+    return [
+        f"Database {alias!r} opens a new connection for every request."
+        for alias, options in settings.DATABASES.items()
+        # SQLite connections are local and cheap
+        if not options.get("ENGINE", "").endswith("sqlite3")
+        and not options.get("CONN_MAX_AGE")
+    ]
+
+
+def _loader_names(loaders: Iterable) -> Iterable[str]:
+    for loader in loaders:
+        yield loader[0] if isinstance(loader, (list, tuple)) else loader
+
+
+@performance_rule(
+    "structured.W003",
+    impact="medium",
+    hint="Wrap the loaders in django.template.loaders.cached.Loader.",
+)
+def check_cached_template_loader(settings):
+    messages = []
+    for index, engine in enumerate(settings.TEMPLATES):
+        if not engine["BACKEND"].endswith("DjangoTemplates"):
+            continue
+        loaders = engine.get("OPTIONS", {}).get("loaders")
+        if loaders is None:
+            # Django caches its default loaders unless in debug mode
+            continue
+        if "django.template.loaders.cached.Loader" not in _loader_names(loaders):
+            messages.append(
+                f"Template engine {engine.get('NAME', index)!r} parses every "
+                "template on every render: its loaders aren't cached."
+            )
+    return messages
+
+
+@performance_rule(
+    "structured.W004",
+    impact="low",
+    hint='Lower STRUCTURED_PROFILING["SAMPLE_RATE"], e.g. to 0.05.',
+)
+def check_profiling_sample_rate(settings):
+    profiling = getattr(settings, "STRUCTURED_PROFILING", None)
+    middleware = "django_structured.profiling.ProfilingMiddleware"
+    if profiling is None or middleware not in settings.MIDDLEWARE:
+        return None
+    sample_rate = profiling.get("SAMPLE_RATE", 1.0)
+    if sample_rate > 0.1:
+        return f"{sample_rate:.0%} of requests are profiled."
+
+
+def check_performance(app_configs=None, **kwargs) -> List[checks.CheckMessage]:
+    """
+    Run every performance rule.
+    """
+    return [message for rule in rules.values() for message in rule.run()]
+
+
+def register() -> None:
+    """
+    Register the performance check, run with `manage.py check --deploy`.
+    """
+    checks.register(check_performance, "performance", deploy=True)
@@ -20,3 +20,45 @@ def startproject(**options):
 def startapp(**options):
     options = AppOptions(**options)
     breakpoint()
+
+
+@structured.command(
+    context_settings={"ignore_unknown_options": True, "help_option_names": []},
+    add_help_option=False,
+)
+@click.argument("args", nargs=-1, type=click.UNPROCESSED)
+def bench(args):
+    """
+    Load test the project's application in-process (--help for options).
+    """
+    from .bench import main
+
+    raise SystemExit(main(list(args)))
+
+
+@structured.command(
+    context_settings={"ignore_unknown_options": True, "help_option_names": []},
+    add_help_option=False,
+)
+@click.argument("args", nargs=-1, type=click.UNPROCESSED)
+def imports(args):
+    """
+    Analyze the project's startup imports (--help for options).
+    """
+    from .imports import main
+
+    raise SystemExit(main(list(args)))
+
+
+@structured.command(
+    context_settings={"ignore_unknown_options": True, "help_option_names": []},
+    add_help_option=False,
+)
+@click.argument("args", nargs=-1, type=click.UNPROCESSED)
+def bundle(args):
+    """
+    Package the project into a single-file zipapp (--help for options).
+    """
+    from .bundle import main
+
+    raise SystemExit(main(list(args)))
@@ -0,0 +1,279 @@
+"""
+Fixture loading with bulk inserts. Objects of each model are inserted with
+bulk_create, models in dependency order, instead of one save() per object
+as loaddata does. Like loaddata, objects whose primary key is already in the
+database update their row, and replace its many-to-many relations.
+
+Used by the bulkloaddata management command and the bulk_fixtures fixture of
+django_structured.pytest_plugin.
+"""
+
+from collections import defaultdict
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, List, Set
+
+from django.apps import apps
+from django.conf import settings
+from django.core import serializers
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.db.models.signals import post_save, pre_save
+
+from .bulk import supports_upsert
+
+# Primary keys per query looking up existing rows
+LOOKUP_BATCH_SIZE = 500
+
+
+def fixture_dirs() -> List[Path]:
+    """
+    Return the directories searched for fixtures: each app's fixtures
+    directory, then FIXTURE_DIRS.
+    """
+    dirs = [Path(app.path) / "fixtures" for app in apps.get_app_configs()]
+    dirs.extend(Path(directory) for directory in settings.FIXTURE_DIRS)
+    return [directory for directory in dirs if directory.is_dir()]
+
+
+def find_fixtures(label: str) -> List[Path]:
+    """
+    Return the fixture files for the given label: a file path, a directory
+    path (for all the fixtures it contains), or a file name with or without
+    its serialization format extension, found in the fixture dirs.
+    """
+    path = Path(label)
+    if path.is_file():
+        return [path]
+    if path.is_dir():
+        return sorted(
+            child
+            for child in path.iterdir()
+            if child.is_file() and child.suffix[1:] in fixture_formats()
+        )
+
+    names = [label] if path.suffix[1:] in fixture_formats() else []
+    names.extend(f"{label}.{format}" for format in fixture_formats())
+    for directory in fixture_dirs():
+        for name in names:
+            if (directory / name).is_file():
+                return [directory / name]
+    raise FileNotFoundError(f"No fixture named {label!r} found")
+
+
+def fixture_formats() -> List[str]:
+    formats = serializers.get_public_serializer_formats()
+    if "yaml" in formats:
+        formats.append("yml")
+    return formats
+
+
+def fixture_format(path: Path) -> str:
+    format = path.suffix[1:]
+    if format == "yml":
+        return "yaml"
+    if format not in fixture_formats():
+        raise ValueError(f"Unknown serialization format for fixture {path}")
+    return format
+
+
+def dependencies(model, models: Set[type]) -> Set[type]:
+    """
+    Models among the given ones which rows of model refer to: the targets of
+    its foreign keys and one-to-one fields, multi-table inheritance parents
+    included.
+    """
+    related = set(model._meta.parents)
+    for field in model._meta.concrete_fields:
+        if field.is_relation and field.related_model is not None:
+            related.add(field.related_model._meta.concrete_model)
+    related.discard(model)
+    return related & models
+
+
+def sort_models(models: Iterable[type]) -> List[type]:
+    """
+    Return the given models sorted so that models come after the models they
+    have foreign keys to, as far as cycles allow.
+    """
+    # Ties are broken by the app registry's order, which follows the order
+    # apps and their models modules (see load_modules) define models in
+    registry_order = {model: index for index, model in enumerate(apps.get_models())}
+    remaining = sorted(
+        dict.fromkeys(models), key=lambda model: registry_order.get(model, 0)
+    )
+    pending = {model: dependencies(model, set(remaining)) for model in remaining}
+    ordered = []
+    while remaining:
+        # The first model whose dependencies are all sorted, or on a cycle,
+        # the first one left
+        model = next((model for model in remaining if not pending[model]), None)
+        model = model or remaining[0]
+        remaining.remove(model)
+        ordered.append(model)
+        for unsorted in pending.values():
+            unsorted.discard(model)
+    return ordered
+
+
+def deserialize(paths: Iterable[Path], using: str) -> Dict[type, list]:
+    """
+    Return the deserialized objects of the given fixture files, by model.
+    """
+    objects = defaultdict(list)
+    for path in paths:
+        with open(path, encoding="utf-8") as stream:
+            for obj in serializers.deserialize(
+                fixture_format(path),
+                stream,
+                using=using,
+                handle_forward_references=True,
+            ):
+                objects[type(obj.object)].append(obj)
+    return objects
+
+
+def existing_pks(model, pks: Iterable, using: str) -> Set:
+    """
+    Return which of the given primary keys have a row in the database.
+    """
+    manager = model._base_manager.using(using)
+    pks = iter(pks)
+    existing = set()
+    while batch := list(islice(pks, LOOKUP_BATCH_SIZE)):
+        existing.update(manager.filter(pk__in=batch).values_list("pk", flat=True))
+    return existing
+
+
+def insert_m2m(deserialized: list, using: str, existing: Set = frozenset()) -> None:
+    """
+    Bulk insert the many-to-many relations of the given objects, for fields
+    with an auto-created through model (others have their own fixtures),
+    replacing those of the objects whose primary key is in existing.
+    """
+    if not deserialized:
+        return
+    model = type(deserialized[0].object)
+    for field in model._meta.many_to_many:
+        through = field.remote_field.through
+        if not through._meta.auto_created:
+            continue
+        source = field.m2m_column_name()
+        target = field.m2m_reverse_name()
+        manager = through._base_manager.using(using)
+        replaced = iter(existing)
+        while batch := list(islice(replaced, LOOKUP_BATCH_SIZE)):
+            manager.filter(**{f"{source}__in": batch}).delete()
+        manager.bulk_create(
+            through(**{source: obj.object.pk, target: related_pk})
+            for obj in deserialized
+            for related_pk in (obj.m2m_data or {}).get(field.name, ())
+        )
+
+
+def save_objects(model, objs: list, existing: Set, using: str, batch_size) -> None:
+    """
+    Insert the given objects, updating the rows of those whose primary key is
+    in existing.
+    """
+    manager = model._base_manager.using(using)
+    update_fields = [
+        field.name for field in model._meta.concrete_fields if not field.primary_key
+    ]
+    if not existing:
+        manager.bulk_create(objs, batch_size=batch_size)
+    elif not update_fields:
+        manager.bulk_create(objs, batch_size=batch_size, ignore_conflicts=True)
+    elif supports_upsert(model, using):
+        manager.bulk_create(
+            objs,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=[model._meta.pk.name],
+            update_fields=update_fields,
+        )
+    else:
+        manager.bulk_create(
+            [obj for obj in objs if obj.pk not in existing], batch_size=batch_size
+        )
+        manager.bulk_update(
+            [obj for obj in objs if obj.pk in existing],
+            update_fields,
+            batch_size=batch_size,
+        )
+
+
+def load_fixtures(
+    *labels: str,
+    using: str = "default",
+    batch_size: int | None = None,
+    signals: bool = True,
+) -> int:
+    """
+    Load the given fixtures (see find_fixtures()) into the database with bulk
+    inserts, in a single transaction. Returns the number of objects loaded.
+
+    With signals, pre_save and post_save are sent for every object with
+    raw=True, like loaddata does. Without, receivers aren't called at all.
+    """
+    paths = [path for label in labels for path in find_fixtures(label)]
+    connection = connections[using]
+    objects = deserialize(paths, using)
+    models = sort_models(objects)
+
+    with transaction.atomic(using=using):
+        with connection.constraint_checks_disabled():
+            load_models(models, objects, using, batch_size, signals)
+
+        # Foreign keys were unchecked while loading, check them all at once
+        table_names = [model._meta.db_table for model in models]
+        connection.check_constraints(table_names=table_names)
+
+        sequence_sql = connection.ops.sequence_reset_sql(no_style(), models)
+        if sequence_sql:
+            with connection.cursor() as cursor:
+                for line in sequence_sql:
+                    cursor.execute(line)
+
+    return sum(len(batch) for batch in objects.values())
+
+
+def load_models(models, objects, using, batch_size, signals) -> None:
+    deferred = []
+    for model in models:
+        batch = objects[model]
+        deferred.extend(obj for obj in batch if obj.deferred_fields)
+        if model._meta.parents:
+            # bulk_create can't insert multi-table inheritance children, save
+            # them like loaddata does (which always sends signals)
+            for obj in batch:
+                obj.save(using=using)
+            continue
+
+        existing = existing_pks(
+            model, [obj.object.pk for obj in batch if obj.object.pk is not None], using
+        )
+        if signals:
+            for obj in batch:
+                pre_save.send(
+                    sender=model,
+                    instance=obj.object,
+                    raw=True,
+                    using=using,
+                    update_fields=None,
+                )
+        save_objects(model, [obj.object for obj in batch], existing, using, batch_size)
+        insert_m2m(batch, using, existing)
+        if signals:
+            for obj in batch:
+                post_save.send(
+                    sender=model,
+                    instance=obj.object,
+                    created=obj.object.pk not in existing,
+                    raw=True,
+                    using=using,
+                    update_fields=None,
+                )
+
+    for obj in deferred:
+        obj.save_deferred_fields(using=using)
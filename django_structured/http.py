@@ -0,0 +1,285 @@
+"""
+Response efficiency: compressing dynamic responses and setting default
+Cache-Control headers, for Django's ConditionalGetMiddleware to answer
+revalidations with 304 Not Modified.
+
+    MIDDLEWARE = [
+        "django.middleware.security.SecurityMiddleware",
+        "django_structured.http.CompressionMiddleware",
+        "django.middleware.http.ConditionalGetMiddleware",
+        "django_structured.http.CacheControlMiddleware",
+        "django.contrib.sessions.middleware.SessionMiddleware",
+        ...
+    ]
+
+ConditionalGetMiddleware gives responses without one an ETag of their
+uncompressed content, and compares it, or the Last-Modified header views may
+set, to the request's If-None-Match and If-Modified-Since. Compressed
+responses keep it as a weak ETag, which still matches.
+"""
+
+import secrets
+import struct
+import zlib
+from typing import Dict, Iterable
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from .staticfiles import parse_accept_encoding
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Compressible types, besides text/* and +json and +xml suffixes
+COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/xml",
+    "image/svg+xml",
+}
+
+# Cache backends shared by every worker, which can hold sessions
+SHARED_CACHES = (
+    "RedisCache",
+    "PyMemcacheCache",
+    "PyLibMCCache",
+    "MemcachedCache",
+)
+
+
+def http_settings() -> Dict:
+    options = {
+        "ENCODINGS": ["br", "gzip"],
+        # Responses smaller than this (in bytes) are sent as they are: the
+        # compression headers would outweigh the savings
+        "MIN_SIZE": 512,
+        # Fast levels: dynamic responses are compressed on every request
+        "GZIP_LEVEL": 6,
+        "BROTLI_QUALITY": 4,
+        # Up to this many random bytes are added to gzip headers, so that
+        # compressed lengths don't reveal secrets (Heal the BREACH), 0 for none
+        "GZIP_RANDOM_BYTES": 100,
+        # Cache-Control of responses that don't set one: caches may store
+        # them, but must revalidate them every time
+        "CACHE_CONTROL": {"private": True, "no_cache": True},
+        # Cache-Control by view name, e.g. {"app50:item-list": {"max_age": 60}}
+        "VIEW_CACHE_CONTROL": {},
+    }
+    options.update(getattr(settings, "STRUCTURED_HTTP", {}))
+    if brotli is None and "br" in options["ENCODINGS"]:
+        options["ENCODINGS"] = [e for e in options["ENCODINGS"] if e != "br"]
+    return options
+
+
+def session_engine(caches: Dict, alias: str = "default") -> str:
+    """
+    SESSION_ENGINE suited to a CACHES setting: sessions are read from the
+    cache when it's shared by all workers, and from the database otherwise, as
+    a per-process cache would serve sessions deleted by other workers.
+    """
+    backend = caches.get(alias, {}).get("BACKEND", "")
+    if backend.endswith(SHARED_CACHES):
+        return "django.contrib.sessions.backends.cached_db"
+    return "django.contrib.sessions.backends.db"
+
+
+def compressible(content_type: str) -> bool:
+    mime = content_type.partition(";")[0].strip().lower()
+    # Buffering would delay events until enough of them are sent
+    if mime == "text/event-stream":
+        return False
+    return (
+        mime.startswith("text/")
+        or mime.endswith(("+json", "+xml"))
+        or mime in COMPRESSIBLE_TYPES
+    )
+
+
+def gzip_header(random_bytes: int) -> bytes:
+    """
+    Header of a gzip member with no modification time and, if random_bytes,
+    a file name of random length below it, like Django's GZipMiddleware.
+    """
+    if not random_bytes:
+        return b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+    # FNAME flag, then the zero-terminated name after the fixed fields
+    name = b"a" * secrets.randbelow(random_bytes) + b"\x00"
+    return b"\x1f\x8b\x08\x08\x00\x00\x00\x00\x00\xff" + name
+
+
+def compress(content: bytes, encoding: str, options: Dict) -> bytes:
+    if encoding == "br":
+        return brotli.compress(content, quality=options["BROTLI_QUALITY"])
+    compressor = StreamCompressor(encoding, options)
+    return compressor.compress(content) + compressor.finish()
+
+
+class StreamCompressor:
+    """
+    Incremental compression, flushing output once MIN_SIZE bytes of content
+    were compressed since the last flush, so that streamed content reaches
+    clients soon without sending a flush for every small chunk.
+    """
+
+    def __init__(self, encoding: str, options: Dict):
+        self.encoding = encoding
+        self.flush_size = options["MIN_SIZE"]
+        self.pending = 0
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=options["BROTLI_QUALITY"])
+        else:
+            # Raw deflate, within a gzip header and trailer of our own
+            self.compressor = zlib.compressobj(
+                options["GZIP_LEVEL"], zlib.DEFLATED, -zlib.MAX_WBITS
+            )
+            self.header = gzip_header(options["GZIP_RANDOM_BYTES"])
+            self.crc = 0
+            self.size = 0
+
+    def compress(self, chunk: bytes) -> bytes:
+        self.pending += len(chunk)
+        flush = self.pending >= self.flush_size
+        if flush:
+            self.pending = 0
+        if self.encoding == "br":
+            compressed = self.compressor.process(chunk)
+            return compressed + self.compressor.flush() if flush else compressed
+        self.crc = zlib.crc32(chunk, self.crc)
+        self.size += len(chunk)
+        compressed = self.header + self.compressor.compress(chunk)
+        self.header = b""
+        if flush:
+            compressed += self.compressor.flush(zlib.Z_SYNC_FLUSH)
+        return compressed
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self.compressor.finish()
+        trailer = struct.pack("<II", self.crc, self.size & 0xFFFFFFFF)
+        return self.header + self.compressor.flush() + trailer
+
+    def stream(self, chunks: Iterable[bytes]) -> Iterable[bytes]:
+        for chunk in chunks:
+            compressed = self.compress(chunk)
+            if compressed:
+                yield compressed
+        yield self.finish()
+
+    async def astream(self, chunks):
+        async for chunk in chunks:
+            compressed = self.compress(chunk)
+            if compressed:
+                yield compressed
+        yield self.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with brotli or gzip, whichever the client prefers of
+    the configured ENCODINGS. Streaming responses are compressed as they're
+    sent, except server-sent events.
+
+    Like Django's GZipMiddleware, gzip headers get a file name of random
+    length, which makes BREACH attacks on responses mixing secrets and user
+    input much slower. Django also masks CSRF tokens on every request, other
+    secrets in pages are for views to protect.
+
+    Configure with the STRUCTURED_HTTP setting:
+        ENCODINGS: Encodings to use, from "br" (requires the brotli package)
+            and "gzip". Default: both.
+        MIN_SIZE: Responses smaller than this (in bytes) are not compressed.
+            Default: 512.
+        GZIP_LEVEL: Default: 6.
+        GZIP_RANDOM_BYTES: Maximum length of the random gzip file name, 0
+            for none. Default: 100.
+        BROTLI_QUALITY: Default: 4.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.options = http_settings()
+
+    def process_response(self, request, response):
+        if (
+            response.has_header("Content-Encoding")
+            or not compressible(response.get("Content-Type", ""))
+            or "no-transform" in response.get("Cache-Control", "")
+        ):
+            return response
+        if response.streaming:
+            # File responses know their size
+            length = response.get("Content-Length")
+            if length is not None and int(length) < self.options["MIN_SIZE"]:
+                return response
+        elif len(response.content) < self.options["MIN_SIZE"]:
+            return response
+
+        patch_vary_headers(response, ["Accept-Encoding"])
+        accepted = parse_accept_encoding(request.headers.get("Accept-Encoding", ""))
+        for encoding in self.options["ENCODINGS"]:
+            if accepted.get(encoding, 0) > 0:
+                break
+        else:
+            return response
+
+        if response.streaming:
+            compressor = StreamCompressor(encoding, self.options)
+            if response.is_async:
+                response.streaming_content = compressor.astream(
+                    response.streaming_content
+                )
+            else:
+                response.streaming_content = compressor.stream(
+                    response.streaming_content
+                )
+            del response.headers["Content-Length"]
+        else:
+            compressed = compress(response.content, encoding, self.options)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # The ETag is of the uncompressed content, which is only equivalent
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = f"W/{etag}"
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+
+class CacheControlMiddleware(MiddlewareMixin):
+    """
+    Add a Cache-Control header to GET and HEAD responses that don't have one
+    (as set by the cache_control and never_cache decorators), by view name or
+    the default.
+
+    Configure with the STRUCTURED_HTTP setting:
+        CACHE_CONTROL: Arguments of django.utils.cache.patch_cache_control
+            for responses of other views. Default: private, no-cache.
+        VIEW_CACHE_CONTROL: Arguments by view name, including namespaces.
+            Default: none.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        options = http_settings()
+        self.default = options["CACHE_CONTROL"]
+        self.views = options["VIEW_CACHE_CONTROL"]
+
+    def process_response(self, request, response):
+        if request.method not in ("GET", "HEAD") or response.has_header(
+            "Cache-Control"
+        ):
+            return response
+        match = getattr(request, "resolver_match", None)
+        kwargs = self.default
+        if match is not None:
+            kwargs = self.views.get(match.view_name, self.default)
+        if kwargs:
+            patch_cache_control(response, **kwargs)
+        return response
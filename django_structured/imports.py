@@ -0,0 +1,552 @@
+"""
+Startup import analysis: find which modules make the project slow to boot,
+and which of those could be imported later.
+
+Two sources are combined:
+
+- the import graph of the project's own modules, built statically from their
+  source, starting from the settings module, the urlconf and the installed
+  apps. Imports inside functions, and under `if TYPE_CHECKING:`, don't run at
+  boot and are left out; packages calling load_modules import every module
+  they contain.
+- the time spent importing every module while booting the project, measured
+  with `python -X importtime` in a fresh interpreter.
+
+Heavy modules that are only imported for a few views are reported as
+candidates for deferring, by importing them inside those views instead.
+
+Run with `structured imports` from the project's root directory:
+
+    structured imports
+    structured imports --threshold-ms 20 --max-views 2 --output imports.json
+    structured imports --budget-ms 800
+
+With --budget-ms, the command fails when startup imports take longer, to
+catch regressions in CI.
+"""
+
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+# Boots the project like a server process would, then reports what it needs
+# for the analysis on stdout (importtime reports go to stderr)
+MEASURE = """
+import json, django
+django.setup()
+from django.apps import apps
+from django.conf import settings
+from django.urls import URLResolver, get_resolver
+
+def walk(patterns, prefix=""):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from walk(pattern.url_patterns, prefix + str(pattern.pattern))
+            continue
+        callback = getattr(pattern.callback, "view_class", pattern.callback)
+        yield {
+            "route": prefix + str(pattern.pattern),
+            "view": f"{callback.__module__}.{callback.__qualname__}",
+            "module": callback.__module__,
+        }
+
+print(json.dumps({
+    "settings": settings.SETTINGS_MODULE,
+    "urlconf": settings.ROOT_URLCONF,
+    "apps": [config.name for config in apps.get_app_configs()],
+    "views": list(walk(get_resolver().url_patterns)),
+}))
+"""
+
+# Modules Django imports from every installed app
+APP_MODULES = ("apps", "models", "admin")
+
+
+@dataclass
+class Module:
+    name: str
+    path: Path
+    is_package: bool
+    # Absolute names of the modules imported when this module is, and of
+    # those only imported when its functions run
+    imports: Set[str] = field(default_factory=set)
+    deferred: Set[str] = field(default_factory=set)
+
+
+@dataclass
+class ImportTime:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+    # The module whose import first imported this one
+    parent: str | None = None
+
+
+@dataclass
+class View:
+    route: str
+    view: str
+    module: str
+
+
+def _is_type_checking(test: ast.expr) -> bool:
+    return (isinstance(test, ast.Name) and test.id == "TYPE_CHECKING") or (
+        isinstance(test, ast.Attribute) and test.attr == "TYPE_CHECKING"
+    )
+
+
+def _walk(nodes: Iterable[ast.AST], boot: bool) -> Iterator[Tuple[ast.AST, bool]]:
+    """
+    Yield import statements and calls, and whether they run at import time.
+    """
+    for node in nodes:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            yield from _walk(node.decorator_list, boot)
+            yield from _walk(node.body, False)
+        elif isinstance(node, ast.Lambda):
+            yield from _walk([node.body], False)
+        elif isinstance(node, ast.If) and _is_type_checking(node.test):
+            yield from _walk(node.orelse, boot)
+        else:
+            if isinstance(node, (ast.Import, ast.ImportFrom, ast.Call)):
+                yield node, boot
+            yield from _walk(ast.iter_child_nodes(node), boot)
+
+
+def _call_name(node: ast.Call) -> str | None:
+    if isinstance(node.func, ast.Name):
+        return node.func.id
+    if isinstance(node.func, ast.Attribute):
+        return node.func.attr
+    return None
+
+
+class ImportGraph:
+    """
+    Import graph of the modules found under root, parsed as they're reached.
+    Modules from elsewhere (the standard library, third-party packages) appear
+    as imported names only.
+    """
+
+    def __init__(self, root: Path | str):
+        self.root = Path(root)
+        self._modules: Dict[str, Module | None] = {}
+
+    def find(self, name: str) -> Tuple[Path, bool] | None:
+        path = self.root.joinpath(*name.split("."))
+        if (path / "__init__.py").is_file():
+            return path / "__init__.py", True
+        if path.with_suffix(".py").is_file():
+            return path.with_suffix(".py"), False
+        return None
+
+    def is_first_party(self, name: str) -> bool:
+        return self.find(name) is not None
+
+    def module(self, name: str) -> Module | None:
+        if name not in self._modules:
+            found = self.find(name)
+            self._modules[name] = None if found is None else self.parse(name, *found)
+        return self._modules[name]
+
+    def parse(self, name: str, path: Path, is_package: bool) -> Module:
+        module = Module(name, path, is_package)
+        package = name if is_package else name.rpartition(".")[0]
+        tree = ast.parse(path.read_bytes(), str(path))
+        for node, boot in _walk(tree.body, True):
+            names = module.imports if boot else module.deferred
+            names.update(self.imported(node, package))
+        return module
+
+    def imported(self, node: ast.AST, package: str) -> Iterator[str]:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                parts = package.split(".")
+                parts = parts[: len(parts) - node.level + 1]
+                base = ".".join(parts + ([node.module] if node.module else []))
+            for alias in node.names:
+                # `from package import module` imports the module
+                name = f"{base}.{alias.name}"
+                yield name if self.is_first_party(name) else base
+        elif isinstance(node, ast.Call):
+            yield from self.called(node, package)
+
+    def called(self, node: ast.Call, package: str) -> Iterator[str]:
+        func = _call_name(node)
+        if func == "import_module" and node.args:
+            arg = node.args[0]
+            if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                yield arg.value
+        elif func == "load_modules":
+            recursive = any(
+                keyword.arg == "recursive"
+                and isinstance(keyword.value, ast.Constant)
+                and keyword.value.value
+                for keyword in node.keywords
+            )
+            yield from self.submodules(package, recursive)
+
+    def submodules(self, package: str, recursive: bool) -> Iterator[str]:
+        found = self.find(package)
+        if found is None or not found[1]:
+            return
+        for path in sorted(found[0].parent.iterdir()):
+            if path.name.startswith("__"):
+                continue
+            if path.suffix == ".py":
+                yield f"{package}.{path.stem}"
+            elif (path / "__init__.py").is_file():
+                yield f"{package}.{path.name}"
+                if recursive:
+                    yield from self.submodules(f"{package}.{path.name}", True)
+
+    def reachable(self, roots: Iterable[str], barriers: Iterable[str] = ()) -> Set[str]:
+        """
+        Names of every module imported at boot by importing the roots,
+        without going through the barrier modules.
+        """
+        barriers = set(barriers)
+        seen = set()
+        queue = deque(roots)
+        while queue:
+            name = queue.popleft()
+            if name in seen or name in barriers:
+                continue
+            seen.add(name)
+            # Importing a module imports its parent packages first
+            parent = name.rpartition(".")[0]
+            if parent:
+                queue.append(parent)
+            module = self.module(name)
+            if module is not None:
+                queue.extend(module.imports)
+        return seen
+
+
+def parse_importtime(output: str) -> Dict[str, ImportTime]:
+    """
+    Parse the report of `python -X importtime`, where every module follows
+    the modules it imported, indented one level deeper.
+    """
+    timings = {}
+    pending: List[ImportTime] = []
+    for line in output.splitlines():
+        match = IMPORTTIME.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        timing = ImportTime(
+            name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2
+        )
+        while pending and pending[-1].depth > timing.depth:
+            pending.pop().parent = name
+        pending.append(timing)
+        timings[name] = timing
+    return timings
+
+
+def measure(root: Path, settings: str) -> Tuple[Dict[str, ImportTime], Dict]:
+    """
+    Boot the project in a new interpreter, returning the import time of every
+    module and what it found about the project.
+    """
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings)
+    env["PYTHONPATH"] = os.pathsep.join([str(root)] + sys.path)
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", MEASURE],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode:
+        errors = [
+            line for line in process.stderr.splitlines() if not IMPORTTIME.match(line)
+        ]
+        raise RuntimeError("Booting the project failed:\n" + "\n".join(errors))
+    return parse_importtime(process.stderr), json.loads(process.stdout)
+
+
+def best_of(runs: List[Dict[str, ImportTime]]) -> Dict[str, ImportTime]:
+    """
+    Combine the timings of several runs, keeping the fastest time of every
+    module to leave out noise.
+    """
+    timings = {}
+    for run in runs:
+        for name, timing in run.items():
+            best = timings.setdefault(name, timing)
+            best.self_us = min(best.self_us, timing.self_us)
+            best.cumulative_us = min(best.cumulative_us, timing.cumulative_us)
+    return timings
+
+
+def timed(name: str, timings: Dict[str, ImportTime]) -> ImportTime | None:
+    """
+    Timing of the named module, or of its closest parent package when it was
+    imported as part of it.
+    """
+    while name:
+        if name in timings:
+            return timings[name]
+        name = name.rpartition(".")[0]
+    return None
+
+
+def first_party_importer(
+    name: str, timings: Dict[str, ImportTime], graph: ImportGraph
+) -> str | None:
+    """
+    The first-party module whose import caused the named module's, if any.
+    """
+    parent = timings[name].parent
+    while parent is not None:
+        if graph.is_first_party(parent):
+            return parent
+        parent = timings[parent].parent
+    return None
+
+
+def within(name: str, package: str) -> bool:
+    return name == package or name.startswith(f"{package}.")
+
+
+def candidates(
+    graph: ImportGraph,
+    timings: Dict[str, ImportTime],
+    project: Dict,
+    threshold_ms: float,
+    max_views: int,
+) -> List[Dict]:
+    """
+    Modules from outside the project taking at least threshold_ms to import,
+    imported at boot by the project, but only needed by at most max_views
+    views.
+    """
+    views = [View(**view) for view in project["views"]]
+    view_modules = {view.module for view in views if graph.is_first_party(view.module)}
+
+    roots = [project["settings"], project["urlconf"]]
+    for app in project["apps"]:
+        roots.extend(
+            name
+            for name in [app] + [f"{app}.{module}" for module in APP_MODULES]
+            if graph.is_first_party(name)
+        )
+    boot = graph.reachable(roots)
+    # What's imported at boot whichever views the project has
+    core = graph.reachable(roots, barriers=view_modules)
+    used_by = {module: graph.reachable([module]) for module in view_modules}
+
+    found = {}
+    for name in sorted(boot):
+        if graph.is_first_party(name):
+            continue
+        timing = timed(name, timings)
+        if timing is None or timing.name in found:
+            continue
+        if timing.cumulative_us / 1000 < threshold_ms:
+            continue
+        if first_party_importer(timing.name, timings, graph) is None:
+            # Already imported by Django or another dependency
+            continue
+        if any(within(other, timing.name) for other in core):
+            continue
+        modules = {
+            module
+            for module, reached in used_by.items()
+            if any(within(other, timing.name) for other in reached)
+        }
+        users = [view for view in views if view.module in modules]
+        if not users or len(users) > max_views:
+            continue
+        importers = sorted(
+            module
+            for module in set().union(*(used_by[module] for module in modules))
+            if (imported := graph.module(module)) is not None
+            and any(within(other, timing.name) for other in imported.imports)
+        )
+        found[timing.name] = {
+            "module": timing.name,
+            "cumulative_ms": timing.cumulative_us / 1000,
+            "imported_by": importers,
+            "views": [asdict(view) for view in users],
+        }
+    return sorted(found.values(), key=lambda found: -found["cumulative_ms"])
+
+
+def heaviest(
+    timings: Dict[str, ImportTime], graph: ImportGraph, top: int
+) -> Tuple[List[Dict], List[Dict]]:
+    """
+    The top third-party packages by cumulative import time, and the top
+    first-party modules by their own import time.
+    """
+    stdlib = sys.stdlib_module_names
+    packages = [
+        timing
+        for name, timing in timings.items()
+        if "." not in name
+        and name.lstrip("_") not in stdlib
+        and name not in stdlib
+        and not graph.is_first_party(name)
+    ]
+    packages.sort(key=lambda timing: -timing.cumulative_us)
+    first_party = [
+        timing for name, timing in timings.items() if graph.is_first_party(name)
+    ]
+    first_party.sort(key=lambda timing: -timing.self_us)
+    return (
+        [
+            {"module": timing.name, "cumulative_ms": timing.cumulative_us / 1000}
+            for timing in packages[:top]
+        ],
+        [
+            {
+                "module": timing.name,
+                "self_ms": timing.self_us / 1000,
+                "cumulative_ms": timing.cumulative_us / 1000,
+            }
+            for timing in first_party[:top]
+        ],
+    )
+
+
+def analyze(
+    root: Path | str,
+    settings: str,
+    repeat: int = 3,
+    threshold_ms: float = 10.0,
+    max_views: int = 3,
+    top: int = 10,
+) -> Dict:
+    root = Path(root)
+    runs = []
+    for _ in range(repeat):
+        timings, project = measure(root, settings)
+        runs.append(timings)
+    total_us = min(sum(timing.self_us for timing in run.values()) for run in runs)
+    timings = best_of(runs)
+
+    graph = ImportGraph(root)
+    packages, first_party = heaviest(timings, graph, top)
+    return {
+        "settings": settings,
+        "total_ms": total_us / 1000,
+        "modules": len(timings),
+        "repeat": repeat,
+        "packages": packages,
+        "first_party": first_party,
+        "candidates": candidates(graph, timings, project, threshold_ms, max_views),
+    }
+
+
+def format_results(results: Dict) -> str:
+    lines = [
+        f"Startup imports: {results['total_ms']:,.1f} ms for {results['modules']} "
+        f"modules (best of {results['repeat']})",
+        "",
+        "Heaviest third-party packages (cumulative):",
+    ]
+    lines.extend(
+        f"  {package['module']:<40} {package['cumulative_ms']:>9.1f} ms"
+        for package in results["packages"]
+    )
+    lines.extend(["", "Heaviest project modules (self):"])
+    lines.extend(
+        f"  {module['module']:<40} {module['self_ms']:>9.1f} ms"
+        for module in results["first_party"]
+    )
+    lines.extend(["", "Candidates for deferring:"])
+    if not results["candidates"]:
+        lines.append("  None")
+    for candidate in results["candidates"]:
+        lines.append(
+            f"  {candidate['module']:<40} {candidate['cumulative_ms']:>9.1f} ms"
+        )
+        lines.append(f"    imported by {', '.join(candidate['imported_by'])}")
+        lines.extend(
+            f"    used by {view['view']} ({view['route'] or '/'})"
+            for view in candidate["views"]
+        )
+    return "\n".join(lines)
+
+
+def argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="structured imports",
+        description="Analyze the project's startup imports.",
+    )
+    parser.add_argument(
+        "--settings", help="Settings module. Default: DJANGO_SETTINGS_MODULE."
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Boots to measure, the best is kept."
+    )
+    parser.add_argument(
+        "--threshold-ms",
+        type=float,
+        default=10.0,
+        help="Import time from which modules are candidates for deferring.",
+    )
+    parser.add_argument(
+        "--max-views",
+        type=int,
+        default=3,
+        help="Views using a module for it to be a candidate for deferring.",
+    )
+    parser.add_argument("--top", type=int, default=10, help="Heaviest modules shown.")
+    parser.add_argument("--output", help="Save the results to this JSON file.")
+    parser.add_argument(
+        "--budget-ms", type=float, help="Fail when startup imports take longer."
+    )
+    return parser
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argument_parser()
+    args = parser.parse_args(argv)
+
+    settings = args.settings or os.environ.get("DJANGO_SETTINGS_MODULE")
+    if not settings:
+        parser.error("set DJANGO_SETTINGS_MODULE or pass --settings")
+
+    results = analyze(
+        os.getcwd(),
+        settings,
+        repeat=args.repeat,
+        threshold_ms=args.threshold_ms,
+        max_views=args.max_views,
+        top=args.top,
+    )
+    results["budget_ms"] = args.budget_ms
+    print(format_results(results))
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+    if args.budget_ms is not None:
+        if results["total_ms"] > args.budget_ms:
+            print(
+                f"\nStartup imports take {results['total_ms']:,.1f} ms, over the "
+                f"{args.budget_ms:,.1f} ms budget"
+            )
+            return 1
+        print(f"\nWithin the {args.budget_ms:,.1f} ms startup budget")
+    return 0
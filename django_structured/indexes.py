@@ -0,0 +1,324 @@
+"""
+Missing index advisor: captures the SQL queries run by the test suite or a
+bench run, runs EXPLAIN on one execution of each, and suggests Meta.indexes
+for the models whose tables were scanned in full, with the number of queries
+that would use each index.
+
+    pytest --capture-queries queries.json
+    structured bench --scenario scenario.json --capture-queries bench.json
+    python manage.py suggestindexes queries.json bench.json
+
+Only the project's models are considered: those of modules imported with
+load_modules(registry=django_structured.project_utils.registry).
+
+Columns to index are found in the queries themselves: those compared for
+equality first, then a range comparison or the ORDER BY column. Columns
+leading an existing index are left out, as scans of small or empty
+development tables are often preferred to the index.
+"""
+
+import json
+import re
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Tuple
+
+from .queries import Query, normalize_sql
+
+# Statements EXPLAIN can tell something about
+EXPLAINABLE = ("SELECT", "UPDATE", "DELETE", "WITH")
+
+_TABLE = re.compile(
+    r'\b(?:FROM|JOIN|UPDATE)\s+"(\w+)"(?:\s+(?:AS\s+)?"?(\w+)"?)?', re.IGNORECASE
+)
+# Comparisons an index helps with, not LIKE as patterns may start with "%"
+_COMPARISON = re.compile(
+    r'(?:"(\w+)"|\b(\w+))\."(\w+)"\s*(<=|>=|=|<|>|IN\b|IS\b|BETWEEN\b)',
+    re.IGNORECASE,
+)
+_ORDER_BY = re.compile(r"\bORDER BY\s+(.*?)(?:\bLIMIT\b|\bOFFSET\b|\bFOR\b|$)", re.I)
+_COLUMN = re.compile(r'(?:"(\w+)"|\b(\w+))\."(\w+)"')
+_SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+# Keywords following a table name, which aren't an alias
+_KEYWORDS = {"WHERE", "INNER", "LEFT", "RIGHT", "OUTER", "CROSS", "ON", "SET"}
+_KEYWORDS |= {"ORDER", "GROUP", "LIMIT", "OFFSET", "FOR", "UNION", "HAVING"}
+
+
+@dataclass
+class CapturedQuery:
+    alias: str
+    shape: str
+    # One execution of the shape, to EXPLAIN
+    sql: str
+    params: Any
+    count: int = 0
+    duration: float = 0.0
+
+
+class QueryLog:
+    """
+    Queries by database alias and normalized SQL, keeping the SQL and
+    parameters of their first execution.
+    """
+
+    def __init__(self, queries: Iterable[CapturedQuery] = ()):
+        self.lock = threading.Lock()
+        self.queries: Dict[Tuple[str, str], CapturedQuery] = {}
+        for query in queries:
+            self.merge(query)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def __iter__(self):
+        return iter(self.queries.values())
+
+    def add(self, query: Query) -> None:
+        # Bulk inserts and updates, which scan nothing
+        if query.many:
+            return
+        shape = normalize_sql(query.sql)
+        self.merge(
+            CapturedQuery(
+                query.alias, shape, query.sql, query.params, 1, query.duration
+            )
+        )
+
+    def extend(self, queries: Iterable[Query]) -> None:
+        for query in queries:
+            self.add(query)
+
+    def merge(self, query: CapturedQuery) -> None:
+        with self.lock:
+            key = (query.alias, query.shape)
+            captured = self.queries.get(key)
+            if captured is None:
+                self.queries[key] = CapturedQuery(
+                    query.alias, query.shape, query.sql, query.params
+                )
+                captured = self.queries[key]
+            captured.count += query.count
+            captured.duration += query.duration
+
+    def as_list(self) -> List[Dict]:
+        return [asdict(query) for query in self]
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as output:
+            # Parameters such as dates and UUIDs are saved as strings, which
+            # databases accept for EXPLAIN
+            json.dump(self.as_list(), output, indent=1, default=str)
+
+    @classmethod
+    def load(cls, *paths: str) -> "QueryLog":
+        log = cls()
+        for path in paths:
+            with open(path) as file:
+                for data in json.load(file):
+                    log.merge(CapturedQuery(**data))
+        return log
+
+
+@dataclass
+class Suggestion:
+    model: Any
+    fields: List[str]
+    name: str
+    count: int = 0
+    duration: float = 0.0
+    # Query shapes the index is for, by number of executions
+    shapes: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def label(self) -> str:
+        return self.model._meta.label
+
+    def code(self) -> str:
+        fields = ", ".join(f'"{name}"' for name in self.fields)
+        return f'models.Index(fields=[{fields}], name="{self.name}")'
+
+    def as_dict(self) -> Dict:
+        return {
+            "model": self.label,
+            "fields": self.fields,
+            "name": self.name,
+            "index": self.code(),
+            "count": self.count,
+            "duration": self.duration,
+            "shapes": self.shapes,
+        }
+
+
+def table_aliases(sql: str) -> Dict[str, str]:
+    """
+    Tables of a query by the names it refers to them with, aliases included.
+    """
+    aliases = {}
+    for table, alias in _TABLE.findall(sql.replace("`", '"')):
+        aliases[table] = table
+        if alias and alias.upper() not in _KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+
+def scanned_tables(connection, sql: str, params) -> List[str]:
+    """
+    Tables the database scans in full to run a query, according to EXPLAIN.
+    """
+    aliases = table_aliases(sql)
+    scanned = []
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            for row in cursor.fetchall():
+                match = _SQLITE_SCAN.match(row[-1])
+                if match:
+                    scanned.append(match.group(1))
+        elif connection.vendor == "postgresql":
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            nodes = [plan[0]["Plan"]]
+            while nodes:
+                node = nodes.pop()
+                if node["Node Type"] == "Seq Scan":
+                    scanned.append(node.get("Alias") or node["Relation Name"])
+                nodes.extend(node.get("Plans", []))
+        elif connection.vendor == "mysql":
+            cursor.execute(f"EXPLAIN {sql}", params)
+            columns = [column[0].lower() for column in cursor.description]
+            for row in cursor.fetchall():
+                row = dict(zip(columns, row))
+                if row.get("type") == "ALL" and row.get("table"):
+                    scanned.append(row["table"])
+        else:
+            raise NotImplementedError(f"Can't EXPLAIN on {connection.vendor}")
+    return [aliases.get(name, name) for name in scanned]
+
+
+def index_columns(sql: str, table: str) -> List[str]:
+    """
+    Columns of table an index should have for a query: those compared for
+    equality, then the first compared with a range or the first ordered by.
+    """
+    sql = sql.replace("`", '"')
+    names = {name for name, target in table_aliases(sql).items() if target == table}
+    names.add(table)
+    equal = []
+    ranges = []
+    for quoted, bare, column, operator in _COMPARISON.findall(sql):
+        if (quoted or bare) not in names:
+            continue
+        if operator.upper() in ("=", "IN", "IS"):
+            equal.append(column)
+        else:
+            ranges.append(column)
+    columns = list(dict.fromkeys(equal))
+    ordered = []
+    match = _ORDER_BY.search(sql)
+    if match:
+        ordered = [
+            column
+            for quoted, bare, column in _COLUMN.findall(match.group(1))
+            if (quoted or bare) in names
+        ]
+    for column in ranges[:1] or ordered[:1]:
+        if column not in columns:
+            columns.append(column)
+    return columns
+
+
+def indexed_columns(connection, table: str) -> set:
+    """
+    Columns leading an index of table, including unique and primary keys.
+    """
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return {
+        constraint["columns"][0]
+        for constraint in constraints.values()
+        if constraint["columns"]
+        and (constraint["index"] or constraint["unique"] or constraint["primary_key"])
+    }
+
+
+def project_models(all_models: bool = False) -> Dict[str, Any]:
+    """
+    Models by table name: those registered by load_modules, or every
+    installed model.
+    """
+    from django.apps import apps
+    from django.db import models
+
+    from .project_utils import registry
+
+    if all_models:
+        candidates = apps.get_models()
+    else:
+        candidates = registry.subclasses_of(models.Model)
+    return {
+        model._meta.db_table: model
+        for model in candidates
+        if not model._meta.abstract and not model._meta.proxy
+    }
+
+
+def suggest_indexes(
+    log: QueryLog, *, all_models: bool = False, min_count: int = 1
+) -> Tuple[List[Suggestion], List[Tuple[CapturedQuery, Exception]]]:
+    """
+    Indexes for the full table scans of captured queries, by descending
+    number of queries, and the queries EXPLAIN failed for.
+    """
+    from django.db import DatabaseError, connections, models, transaction
+
+    tables = project_models(all_models)
+    suggestions: Dict[Tuple[str, Tuple[str, ...]], Suggestion] = {}
+    indexed: Dict[Tuple[str, str], set] = {}
+    errors = []
+    for query in log:
+        if not query.shape.upper().startswith(EXPLAINABLE):
+            continue
+        alias = query.alias if query.alias in connections else "default"
+        connection = connections[alias]
+        try:
+            # A savepoint, as a failed statement aborts PostgreSQL transactions
+            with transaction.atomic(using=alias):
+                scanned = scanned_tables(connection, query.sql, query.params)
+        except (DatabaseError, TypeError, ValueError) as exc:
+            errors.append((query, exc))
+            continue
+
+        for table in dict.fromkeys(scanned):
+            model = tables.get(table)
+            if model is None:
+                continue
+            if (alias, table) not in indexed:
+                indexed[(alias, table)] = indexed_columns(connection, table)
+            columns = index_columns(query.sql, table)
+            if not columns or columns[0] in indexed[(alias, table)]:
+                continue
+            fields = {field.column: field.name for field in model._meta.local_fields}
+            if any(column not in fields for column in columns):
+                continue
+
+            key = (model._meta.label, tuple(columns))
+            suggestion = suggestions.get(key)
+            if suggestion is None:
+                names = [fields[column] for column in columns]
+                index = models.Index(fields=names)
+                index.set_name_with_model(model)
+                suggestion = Suggestion(model, names, index.name)
+                suggestions[key] = suggestion
+            suggestion.count += query.count
+            suggestion.duration += query.duration
+            suggestion.shapes[query.shape] = query.count
+
+    found = [
+        suggestion
+        for suggestion in suggestions.values()
+        if suggestion.count >= min_count
+    ]
+    found.sort(key=lambda suggestion: suggestion.count, reverse=True)
+    return found, errors
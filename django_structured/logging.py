@@ -0,0 +1,181 @@
+"""
+Non-blocking logging for Structured projects.
+
+QueueHandler hands records over to a background thread through a bounded
+queue, so request threads never wait on slow log I/O. When the queue is full,
+records are dropped and counted rather than blocking, and the count is logged
+once there's room again. Records no target handler would emit are discarded
+before any work is done on them.
+
+JSONFormatter formats records as one JSON object per line. Formatting only
+happens in the background thread.
+
+Configure in LOGGING, naming the handlers to send records to:
+
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "json"},
+        "queue": {
+            "()": "django_structured.logging.QueueHandler",
+            "handlers": ["console"],
+            "maxsize": 10000,
+        },
+    },
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+from typing import Iterable, List
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Attributes of every LogRecord, anything else was passed in `extra`
+RECORD_ATTRIBUTES = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime", "taskName"}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Format records as JSON objects, with the values passed in `extra` as
+    additional keys.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in RECORD_ATTRIBUTES and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exception"] = record.exc_text
+        if record.stack_info:
+            data["stack"] = self.formatStack(record.stack_info)
+
+        if orjson is not None:
+            return orjson.dumps(data, default=str).decode()
+        return json.dumps(data, default=str)
+
+
+class QueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room instead of failing when stopped with a full queue
+        self.queue.put(self._sentinel)
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue records for the handlers with the given names (as configured in
+    LOGGING), emitted from a background thread. At most maxsize records are
+    queued; more are dropped, and counted in `dropped`.
+
+    The background thread is started on first use in each process, so it
+    survives servers forking workers after configuring logging.
+    """
+
+    def __init__(self, handlers: Iterable[str] = (), maxsize: int = 10000):
+        super().__init__(queue.Queue(maxsize))
+        self.handler_names = list(handlers)
+        self.dropped = 0
+        self.reported = 0
+        self.listener = None
+        self.min_level = logging.NOTSET
+        self._pid = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def targets(self) -> List[logging.Handler]:
+        # Named handlers are configured by dictConfig, in no particular order,
+        # so they are only looked up once logging is in use. Python < 3.12 has
+        # no getHandlerByName.
+        get_handler = getattr(logging, "getHandlerByName", logging._handlers.get)
+        targets = []
+        for name in self.handler_names:
+            handler = get_handler(name)
+            if handler is None:
+                raise ValueError(f"No logging handler named {name!r}")
+            targets.append(handler)
+        return targets
+
+    def start(self) -> None:
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            targets = self.targets()
+            self.min_level = min(
+                (handler.level for handler in targets), default=logging.NOTSET
+            )
+            self.listener = QueueListener(
+                self.queue, *targets, respect_handler_level=True
+            )
+            self.listener.start()
+            self._pid = os.getpid()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._pid != os.getpid():
+            self.start()
+        if record.levelno < self.min_level:
+            return
+        try:
+            self.enqueue(self.prepare(record))
+        except Exception:
+            self.handleError(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike the standard QueueHandler, leave formatting to the target
+        # handlers, in the background thread. Only resolve what may change or
+        # go away once this returns: the message arguments and the traceback.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            dropped = self.dropped
+            if dropped > self.reported:
+                self.queue.put_nowait(self.dropped_record(dropped - self.reported))
+                self.reported = dropped
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def dropped_record(self, count: int) -> logging.LogRecord:
+        return logging.LogRecord(
+            __name__,
+            logging.WARNING,
+            __file__,
+            0,
+            f"Logging queue full, dropped {count} record(s)",
+            None,
+            None,
+        )
+
+    def close(self) -> None:
+        """
+        Stop the background thread once it has emitted every queued record.
+        """
+        with self._lock:
+            if self.listener is not None and self._pid == os.getpid():
+                self.listener.stop()
+            self.listener = None
+            self._pid = None
+        super().close()
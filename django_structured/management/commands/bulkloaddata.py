@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from django_structured.fixtures import load_fixtures
+
+
+class Command(BaseCommand):
+    help = (
+        "Load fixtures like loaddata, but with one bulk insert per model "
+        "instead of one save per object. Fixtures may be file names looked up "
+        "in the fixture dirs, file paths or directories of fixtures."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("fixtures", nargs="+", metavar="fixture")
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database to load the fixtures into.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            help="Objects per INSERT statement. Default: as many as possible.",
+        )
+        parser.add_argument(
+            "--no-signals",
+            action="store_false",
+            dest="signals",
+            help="Don't send pre_save and post_save signals for loaded objects.",
+        )
+
+    def handle(
+        self, *args, fixtures, database, batch_size, signals, verbosity, **options
+    ):
+        start = time.perf_counter()
+        try:
+            count = load_fixtures(
+                *fixtures, using=database, batch_size=batch_size, signals=signals
+            )
+        except (FileNotFoundError, ValueError) as exc:
+            raise CommandError(exc)
+
+        if verbosity >= 1:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Installed {count} object(s) from {len(fixtures)} fixture(s) "
+                    f"in {time.perf_counter() - start:.2f}s"
+                )
+            )
@@ -0,0 +1,110 @@
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, Tuple
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+
+
+def template_dirs(engine) -> Iterator[Path]:
+    """
+    Yield every directory searched by the given DjangoTemplates engine's
+    loaders, in lookup order.
+    """
+    seen = set()
+    for loader in engine.engine.template_loaders:
+        if not hasattr(loader, "get_dirs"):
+            continue
+        for directory in loader.get_dirs():
+            directory = Path(directory)
+            if directory in seen or not directory.is_dir():
+                continue
+            seen.add(directory)
+            yield directory
+
+
+def template_names(directory: Path) -> Iterator[str]:
+    """
+    Yield the names of all templates in a directory, relative to it. Hidden
+    files and directories are skipped.
+    """
+    for root, dirnames, filenames in os.walk(directory):
+        dirnames[:] = sorted(name for name in dirnames if not name.startswith("."))
+        for filename in sorted(filenames):
+            if filename.startswith("."):
+                continue
+            yield (Path(root) / filename).relative_to(directory).as_posix()
+
+
+def engine_templates(engine) -> Iterable[str]:
+    """
+    Return the names of all templates the given engine can load.
+    """
+    if isinstance(engine, DjangoTemplates):
+        names = {}
+        for directory in template_dirs(engine):
+            for name in template_names(directory):
+                names.setdefault(name, None)
+        return list(names)
+
+    env = getattr(engine, "env", None)
+    if env is not None and hasattr(env, "list_templates"):
+        return env.list_templates()
+
+    return []
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile every template of every configured template engine. With the "
+        "cached template loader, this also warms the template cache of the "
+        "current process."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-going",
+            action="store_true",
+            help="Report all syntax errors instead of stopping at the first one.",
+        )
+
+    def handle(self, *args, keep_going=False, verbosity=1, **options):
+        self.verbosity = verbosity
+        compiled = 0
+        errors = []
+
+        for engine in engines.all():
+            for name, error in self.compile(engine):
+                if error is None:
+                    compiled += 1
+                    continue
+
+                message = f"{engine.name}: {name}: {error}"
+                if not keep_going:
+                    raise CommandError(message)
+                errors.append(message)
+                self.stderr.write(message)
+
+        if errors:
+            raise CommandError(f"{len(errors)} template(s) failed to compile")
+
+        self.stdout.write(self.style.SUCCESS(f"Compiled {compiled} template(s)"))
+
+    def compile(self, engine) -> Iterator[Tuple[str, Exception | None]]:
+        for name in engine_templates(engine):
+            try:
+                engine.get_template(name)
+            except UnicodeDecodeError:
+                # Binary files living alongside templates
+                self.stderr.write(f"{engine.name}: {name}: skipped (not text)")
+                continue
+            except TemplateDoesNotExist:
+                continue
+            except TemplateSyntaxError as exc:
+                yield name, exc
+                continue
+
+            if self.verbosity >= 2:
+                self.stdout.write(f"{engine.name}: {name}")
+            yield name, None
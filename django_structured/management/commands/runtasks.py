@@ -0,0 +1,246 @@
+import signal
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules, import_string
+
+from django_structured.tasks import get_task, registry, retry_delay, tasks_settings
+
+# Tasks a worker tries to claim before looking for runnable tasks again
+CLAIM_BATCH = 10
+
+
+def claim(queues):
+    """
+    Mark the next runnable QueuedTask of the given queues as running and
+    return it, or None when there is none.
+
+    Tasks are claimed with a conditional UPDATE, which only one worker can
+    make, rather than by locking rows: SQLite can't upgrade a read
+    transaction to a write one while other workers write, and would fail with
+    "database is locked". Workers losing the race try the next tasks.
+    """
+    from django_structured.tasks.models import QueuedTask
+
+    while True:
+        now = timezone.now()
+        candidates = list(
+            QueuedTask.objects.filter(
+                status=QueuedTask.QUEUED, queue__in=queues, run_after__lte=now
+            )
+            .order_by("run_after", "id")
+            .values_list("pk", flat=True)[:CLAIM_BATCH]
+        )
+        if not candidates:
+            return None
+        for pk in candidates:
+            claimed = QueuedTask.objects.filter(pk=pk, status=QueuedTask.QUEUED).update(
+                status=QueuedTask.RUNNING, attempts=F("attempts") + 1, claimed=now
+            )
+            if claimed:
+                return QueuedTask.objects.get(pk=pk)
+
+
+def requeue_lost(queues, timeout: float) -> int:
+    """
+    Queue again the tasks of the given queues claimed more than timeout
+    seconds ago, whose worker presumably died while running them, or mark
+    them failed if they have no attempts left. Returns the number of tasks
+    requeued or failed.
+    """
+    from django_structured.tasks.models import QueuedTask
+
+    now = timezone.now()
+    lost = QueuedTask.objects.filter(
+        status=QueuedTask.RUNNING,
+        queue__in=queues,
+        claimed__lt=now - timedelta(seconds=timeout),
+    )
+    failed = lost.filter(attempts__gte=F("max_attempts")).update(
+        status=QueuedTask.FAILED,
+        finished=now,
+        last_error=f"Not finished {timeout:g}s after it was claimed",
+    )
+    return failed + lost.update(status=QueuedTask.QUEUED, run_after=now)
+
+
+def run(queued, delay: float) -> bool:
+    """
+    Run a claimed QueuedTask, scheduling a retry if it fails and has attempts
+    left. Returns whether the task succeeded.
+    """
+    from django_structured.tasks.models import QueuedTask
+
+    try:
+        get_task(queued.name).func(*queued.args, **queued.kwargs)
+    except Exception:
+        queued.last_error = traceback.format_exc()
+        if queued.attempts < queued.max_attempts:
+            queued.status = QueuedTask.QUEUED
+            queued.run_after = timezone.now() + retry_delay(delay, queued.attempts)
+        else:
+            queued.status = QueuedTask.FAILED
+            queued.finished = timezone.now()
+        queued.save(update_fields=["status", "run_after", "finished", "last_error"])
+        return False
+
+    queued.status = QueuedTask.DONE
+    queued.finished = timezone.now()
+    queued.save(update_fields=["status", "finished"])
+    return True
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a background task worker for the configured STRUCTURED_TASKS "
+        "backend: database, celery or rq."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-Q",
+            "--queue",
+            action="append",
+            dest="queues",
+            help="Queue to process, may be repeated. Default: the QUEUES setting.",
+        )
+        parser.add_argument(
+            "-c",
+            "--concurrency",
+            type=int,
+            help="Number of tasks run at once. Default: the CONCURRENCY setting.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once the queues are empty instead of waiting for tasks.",
+        )
+
+    def handle(
+        self, *args, queues=None, concurrency=None, burst=False, verbosity=1, **options
+    ):
+        self.verbosity = verbosity
+        self.options = tasks_settings()
+        self.queues = queues or self.options["QUEUES"]
+        self.concurrency = concurrency or self.options["CONCURRENCY"]
+        self.burst = burst
+
+        # Import every app's tasks package, so tasks are registered by name
+        autodiscover_modules("tasks")
+
+        backend = self.options["BACKEND"]
+        if backend == "eager":
+            raise CommandError("The eager backend runs tasks when enqueued")
+        getattr(self, f"run_{backend}")()
+
+    def run_database(self):
+        from django.apps import apps
+
+        if not apps.is_installed("django_structured.tasks"):
+            raise CommandError(
+                'The database backend needs "django_structured.tasks" in '
+                "INSTALLED_APPS"
+            )
+
+        self.stopping = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, self.stop)
+
+        if self.verbosity >= 1:
+            self.stdout.write(
+                f"Processing {', '.join(self.queues)} with "
+                f"{self.concurrency} thread(s)"
+            )
+        if self.concurrency == 1:
+            self.work()
+            return
+
+        threads = [
+            threading.Thread(target=self.work, name=f"runtasks-{index}")
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def stop(self, signum, frame):
+        # Let running tasks finish, but claim no new ones
+        self.stopping.set()
+
+    def work(self):
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                try:
+                    busy = self.work_once()
+                except Exception:
+                    # Such as a lost connection or a locked database: the
+                    # task, if any, is queued again once its claim times out
+                    self.stderr.write(f"Worker error:\n{traceback.format_exc()}")
+                    connections.close_all()
+                    self.stopping.wait(self.options["POLL_INTERVAL"])
+                    continue
+                if not busy:
+                    if self.burst:
+                        return
+                    self.stopping.wait(self.options["POLL_INTERVAL"])
+        finally:
+            connections.close_all()
+
+    def work_once(self) -> bool:
+        """
+        Run the next runnable task, or requeue lost tasks when there is none.
+        Returns whether there was anything to do.
+        """
+        queued = claim(self.queues)
+        if queued is None:
+            requeued = requeue_lost(self.queues, self.options["CLAIM_TIMEOUT"])
+            if requeued and self.verbosity >= 1:
+                self.stdout.write(f"Requeued {requeued} lost task(s)")
+            return requeued > 0
+
+        started = time.perf_counter()
+        succeeded = run(queued, self.options["RETRY_DELAY"])
+        if self.verbosity >= 2 or not succeeded:
+            status = "done" if succeeded else queued.status
+            self.stdout.write(
+                f"{queued.name} #{queued.pk}: {status} in "
+                f"{time.perf_counter() - started:.3f}s"
+            )
+        return True
+
+    def run_celery(self):
+        if not self.options["CELERY_APP"]:
+            raise CommandError('STRUCTURED_TASKS["CELERY_APP"] is not set')
+        if self.burst:
+            raise CommandError("Celery workers have no burst mode")
+        app = import_string(self.options["CELERY_APP"])
+        # Celery workers find tasks by name, register them all before starting
+        for task in registry.values():
+            task.celery_task(self.options)
+        app.worker_main(
+            [
+                "worker",
+                f"--concurrency={self.concurrency}",
+                f"--queues={','.join(self.queues)}",
+            ]
+        )
+
+    def run_rq(self):
+        from rq import Worker
+
+        from django_structured.tasks import rq_queue
+
+        queues = [rq_queue(name, self.options) for name in self.queues]
+        if self.concurrency > 1:
+            self.stderr.write(
+                "RQ workers run one task at a time, start more workers instead"
+            )
+        Worker(queues, connection=queues[0].connection).work(burst=self.burst)
@@ -0,0 +1,79 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from django_structured.indexes import QueryLog, suggest_indexes
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on queries captured with `pytest --capture-queries` or "
+        "`structured bench --capture-queries`, and suggest Meta.indexes for the "
+        "project's models whose tables are scanned in full."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="+", help="JSON files of captured queries.")
+        parser.add_argument(
+            "--min-count",
+            type=int,
+            default=1,
+            help="Only suggest indexes used by at least this many queries.",
+        )
+        parser.add_argument(
+            "--all-models",
+            action="store_true",
+            help="Consider every installed model, not only those registered by "
+            "load_modules.",
+        )
+        parser.add_argument("--format", choices=["text", "json"], default="text")
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Exit with an error when indexes are suggested.",
+        )
+
+    def handle(self, *args, files, min_count, all_models, format, check, **options):
+        try:
+            log = QueryLog.load(*files)
+        except (OSError, ValueError, TypeError) as exc:
+            raise CommandError(f"Can't load captured queries: {exc}")
+        try:
+            suggestions, errors = suggest_indexes(
+                log, all_models=all_models, min_count=min_count
+            )
+        except NotImplementedError as exc:
+            raise CommandError(str(exc))
+
+        if format == "json":
+            data = [suggestion.as_dict() for suggestion in suggestions]
+            self.stdout.write(json.dumps(data, indent=2))
+        else:
+            self.write_suggestions(suggestions, options["verbosity"])
+
+        for query, error in errors:
+            if options["verbosity"] >= 2:
+                self.stderr.write(f"Can't EXPLAIN {query.shape}: {error}")
+        if errors:
+            self.stderr.write(f"{len(errors)} query shape(s) couldn't be explained")
+
+        if check and suggestions:
+            raise CommandError(f"{len(suggestions)} missing index(es)")
+
+    def write_suggestions(self, suggestions, verbosity: int) -> None:
+        if not suggestions:
+            self.stdout.write(self.style.SUCCESS("No missing indexes found"))
+            return
+
+        for suggestion in suggestions:
+            self.stdout.write(
+                f"{suggestion.label}: {suggestion.count} queries, "
+                f"{suggestion.duration * 1000:.1f}ms in full table scans"
+            )
+            self.stdout.write(f"    {suggestion.code()},")
+            if verbosity >= 1:
+                shapes = sorted(
+                    suggestion.shapes.items(), key=lambda item: item[1], reverse=True
+                )
+                for shape, count in shapes[:3]:
+                    self.stdout.write(f"    {count:>6} x {shape}")
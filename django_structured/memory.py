@@ -0,0 +1,339 @@
+"""
+Memory watchdog for long-running worker processes.
+
+MemoryWatchdogMiddleware measures the memory a sample of requests leaves
+behind, by URL pattern, and a background thread samples the worker's RSS,
+and optionally tracemalloc snapshots to find the lines of code holding on to
+new memory. Once RSS has grown past MAX_GROWTH_MB since the worker warmed up,
+the worker is asked to exit gracefully, for the server to replace it. Only
+workers that their server replaces are recycled (see
+django_structured.process.supervised), others only report their growth.
+
+Each worker writes its latest report to REPORT_DIR/memory-<pid>.json, to be
+inspected offline.
+"""
+
+import json
+import logging
+import os
+import random
+import signal
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .process import rss, supervised
+
+log = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Frames of these files are left out of tracemalloc statistics
+IGNORED_FILES = ("<frozen importlib._bootstrap>", "<unknown>", tracemalloc.__file__)
+
+
+def memory_settings() -> Dict:
+    options = {
+        # Fraction of requests whose memory use is measured
+        "SAMPLE_RATE": 0.1,
+        # Seconds between samples of the worker's memory
+        "INTERVAL": 60,
+        # Requests handled before the worker's memory is taken as baseline
+        "WARMUP_REQUESTS": 100,
+        # Growth over the baseline after which the worker is recycled, None
+        # to only report it
+        "MAX_GROWTH_MB": None,
+        # Signal asking the server to replace the worker once it's done with
+        # its current requests. gunicorn, uvicorn and granian workers exit
+        # gracefully on SIGTERM.
+        "RECYCLE_SIGNAL": "SIGTERM",
+        # Whether the worker may be recycled, None when the server replaces
+        # it: signaling a lone uvicorn or granian process would stop the
+        # server
+        "RECYCLE": None,
+        # Frames of traceback tracemalloc keeps, 0 to leave it off
+        "TRACEMALLOC": 0,
+        "TOP": 10,
+        "HISTORY": 60,
+        "REPORT_DIR": os.path.join(tempfile.gettempdir(), "structured-memory"),
+    }
+    options.update(getattr(settings, "STRUCTURED_MEMORY", {}))
+    return options
+
+
+@dataclass
+class RouteMemory:
+    requests: int = 0
+    # Sum of the memory left allocated by requests that grew it, and of the
+    # changes of all measured requests
+    growth: int = 0
+    net: int = 0
+
+    def as_dict(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "growth_mb": round(self.growth / MB, 3),
+            "net_mb": round(self.net / MB, 3),
+            "mean_kb": round(self.net / self.requests / 1024, 3),
+        }
+
+
+class MemoryWatchdog:
+    """
+    Memory measurements of a worker process.
+
+    Requests are measured with tracemalloc's traced memory when it's on, and
+    with RSS otherwise. Concurrent requests of threaded workers are counted in
+    each other's measurements: growth is only meaningful over many requests.
+    """
+
+    def __init__(self, options: Dict | None = None):
+        self.options = options or memory_settings()
+        self.lock = threading.Lock()
+        self.routes: Dict[str, RouteMemory] = {}
+        self.requests = 0
+        self.started = time.time()
+        self.baseline: int | None = None
+        self.baseline_snapshot = None
+        self.peak = 0
+        self.history = deque(maxlen=self.options["HISTORY"])
+        self.recycling = False
+        # Whether growth past the limit was logged, for unsupervised workers
+        self.over_limit_logged = False
+        self.stopped = threading.Event()
+        self.thread = None
+        self._pid = None
+
+    def start(self) -> None:
+        """
+        Start sampling in a background thread, once per process so that it
+        runs in every forked worker.
+        """
+        with self.lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self.started = time.time()
+            frames = self.options["TRACEMALLOC"]
+            if frames and not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self.thread = threading.Thread(
+                target=self.run, name="memory-watchdog", daemon=True
+            )
+            self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.options["INTERVAL"]):
+            try:
+                self.sample()
+            except Exception:
+                log.exception("Sampling memory failed")
+
+    def sampled(self) -> bool:
+        sample_rate = self.options["SAMPLE_RATE"]
+        return sample_rate >= 1 or random.random() < sample_rate
+
+    def current(self) -> int:
+        if tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[0]
+        return rss()
+
+    def record(self, route: str, delta: int) -> None:
+        with self.lock:
+            memory = self.routes.setdefault(route, RouteMemory())
+            memory.requests += 1
+            memory.net += delta
+            if delta > 0:
+                memory.growth += delta
+
+    def snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in IGNORED_FILES]
+        )
+
+    def locations(self) -> List[Dict]:
+        """
+        Lines of code allocating the most memory since the baseline.
+        """
+        if self.baseline_snapshot is None or not tracemalloc.is_tracing():
+            return []
+        stats = self.snapshot().compare_to(self.baseline_snapshot, "lineno")
+        stats = [stat for stat in stats if stat.size_diff > 0]
+        return [
+            {
+                "location": str(stat.traceback[0]),
+                "size_diff_kb": round(stat.size_diff / 1024, 3),
+                "count_diff": stat.count_diff,
+            }
+            for stat in stats[: self.options["TOP"]]
+        ]
+
+    def sample(self) -> Dict:
+        """
+        Measure the process's memory, write a report and recycle the worker
+        when it has grown too much.
+        """
+        current = rss()
+        self.peak = max(self.peak, current)
+        self.history.append({"time": time.time(), "rss_mb": round(current / MB, 3)})
+        warm = self.requests >= self.options["WARMUP_REQUESTS"]
+        if self.baseline is None and warm:
+            self.baseline = current
+            if tracemalloc.is_tracing():
+                self.baseline_snapshot = self.snapshot()
+
+        max_growth = self.options["MAX_GROWTH_MB"]
+        report = self.report(current)
+        over_limit = (
+            max_growth is not None
+            and self.baseline is not None
+            and current - self.baseline > max_growth * MB
+        )
+        report["recycled"] = over_limit and self.can_recycle()
+        self.write(report)
+        if report["recycled"]:
+            self.recycle(current - self.baseline)
+        elif over_limit and not self.over_limit_logged:
+            self.over_limit_logged = True
+            log.warning(
+                "Worker %d grew by %.1f MB after %d requests, but no server "
+                "would replace it, not recycling it",
+                os.getpid(),
+                (current - self.baseline) / MB,
+                self.requests,
+            )
+        return report
+
+    def can_recycle(self) -> bool:
+        recycle = self.options["RECYCLE"]
+        return supervised() if recycle is None else recycle
+
+    def report(self, current: int) -> Dict:
+        with self.lock:
+            routes = sorted(
+                self.routes.items(), key=lambda item: item[1].growth, reverse=True
+            )
+            routes = {route: memory.as_dict() for route, memory in routes}
+        baseline = growth = None
+        if self.baseline is not None:
+            baseline = round(self.baseline / MB, 3)
+            growth = round((current - self.baseline) / MB, 3)
+        return {
+            "pid": os.getpid(),
+            "time": time.time(),
+            "uptime": round(time.time() - self.started, 3),
+            "requests": self.requests,
+            "rss_mb": round(current / MB, 3),
+            "baseline_mb": baseline,
+            "growth_mb": growth,
+            "peak_mb": round(self.peak / MB, 3),
+            "history": list(self.history),
+            "routes": routes,
+            "locations": self.locations(),
+        }
+
+    def write(self, report: Dict) -> str:
+        directory = self.options["REPORT_DIR"]
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"memory-{report['pid']}.json")
+        # Write then rename, so readers never see a partial report
+        with open(f"{path}.tmp", "w") as output:
+            json.dump(report, output, indent=2)
+        os.replace(f"{path}.tmp", path)
+        return path
+
+    def recycle(self, growth: int) -> None:
+        if self.recycling:
+            return
+        self.recycling = True
+        log.warning(
+            "Worker %d grew by %.1f MB after %d requests, recycling it",
+            os.getpid(),
+            growth / MB,
+            self.requests,
+        )
+        self.stop()
+        os.kill(os.getpid(), getattr(signal, self.options["RECYCLE_SIGNAL"]))
+
+
+_watchdog: MemoryWatchdog | None = None
+
+
+def get_watchdog() -> MemoryWatchdog:
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = MemoryWatchdog()
+    return _watchdog
+
+
+def _route(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "<unresolved>"
+    return f"/{match.route}" if match.route else match.view_name
+
+
+class MemoryWatchdogMiddleware:
+    """
+    Measure the memory a sample of requests leave allocated, by URL pattern,
+    and start the watchdog's sampling thread. Configure with the
+    STRUCTURED_MEMORY setting:
+        SAMPLE_RATE: Fraction of requests measured. Default: 0.1.
+        INTERVAL: Seconds between samples of the worker. Default: 60.
+        WARMUP_REQUESTS: Requests before measuring growth. Default: 100.
+        MAX_GROWTH_MB: Growth after which the worker is recycled. Default:
+            None, only report.
+        RECYCLE_SIGNAL: Signal recycling the worker. Default: "SIGTERM".
+        RECYCLE: Whether workers may be recycled. Default: None, when the
+            server replaces them.
+        TRACEMALLOC: Frames tracemalloc keeps, to report code locations
+            holding memory. Default: 0, off.
+        TOP: Code locations reported. Default: 10.
+        HISTORY: RSS samples kept in reports. Default: 60.
+        REPORT_DIR: Directory of JSON reports. Default: structured-memory in
+            the temporary directory.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.watchdog = get_watchdog()
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.watchdog.start()
+        self.watchdog.requests += 1
+        if not self.watchdog.sampled():
+            return self.get_response(request)
+
+        before = self.watchdog.current()
+        response = self.get_response(request)
+        self.watchdog.record(_route(request), self.watchdog.current() - before)
+        return response
+
+    async def __acall__(self, request):
+        self.watchdog.start()
+        self.watchdog.requests += 1
+        if not self.watchdog.sampled():
+            return await self.get_response(request)
+
+        before = self.watchdog.current()
+        response = await self.get_response(request)
+        self.watchdog.record(_route(request), self.watchdog.current() - before)
+        return response
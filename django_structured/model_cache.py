@@ -0,0 +1,253 @@
+"""
+Read-through cache of model rows, for hot, rarely changed rows fetched by
+primary key or unique field.
+
+Opt in by giving a model a CachedManager:
+
+    class Country(models.Model):
+        code = models.CharField(max_length=2, unique=True)
+
+        objects = CachedManager()
+
+Country.objects.get(pk=1) and Country.objects.get(code="fr") are then served
+from the cache, and Country.objects.in_bulk([1, 2, 3]) fetches cached rows
+with a single get_many. Any other query goes to the database as usual.
+
+Cached rows are invalidated on post_save, post_delete and m2m_changed; the
+generated models package connects the signal handlers for every model it
+discovers (see connect_invalidation()). Updates bypassing signals, such as
+QuerySet.update() and bulk_update(), must call invalidate() themselves.
+
+Configure with the STRUCTURED_MODEL_CACHE setting, see model_cache_settings().
+Bump its VERSION when deploying changes to cached models' fields, so pickled
+rows of the previous schema aren't loaded.
+"""
+
+import hashlib
+from typing import Any, Dict, Iterable, Set
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from . import profiling
+
+# Models whose rows are invalidated by the signal handlers
+_connected: Set[type] = set()
+
+
+def model_cache_settings() -> Dict:
+    options = {
+        "CACHE": "default",
+        "TIMEOUT": 300,
+        "VERSION": 1,
+        "KEY_PREFIX": "structured:model",
+    }
+    options.update(getattr(settings, "STRUCTURED_MODEL_CACHE", {}))
+    return options
+
+
+def cache_key(model, field_name: str, value: Any) -> str:
+    options = model_cache_settings()
+    # Values may have spaces, non-ASCII characters or any length, which
+    # memcached doesn't accept in keys
+    digest = hashlib.sha256(str(value).encode()).hexdigest()[:40]
+    return (
+        f"{options['KEY_PREFIX']}:{options['VERSION']}:"
+        f"{model._meta.label_lower}:{field_name}:{digest}"
+    )
+
+
+def unique_field(model, lookup: str) -> models.Field | None:
+    """
+    Return the model field the given lookup (e.g. "pk", "id", "code" or
+    "code__exact") fetches a single row by, or None if it doesn't.
+    """
+    name, _, lookup_type = lookup.partition("__")
+    if lookup_type not in ("", "exact"):
+        return None
+    if name == "pk":
+        return model._meta.pk
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    if field.concrete and (field.primary_key or field.unique) and not field.is_relation:
+        return field
+    return None
+
+
+class CachedManager(models.Manager):
+    """
+    Manager serving single-row fetches by primary key or unique field, and
+    in_bulk() by primary key, from the cache. Unique field lookups are cached
+    as pointers to the primary key, so invalidating a row's primary key entry
+    is enough.
+
+    Only the model's own managers use the cache, and only when their queryset
+    isn't filtered: related managers (such as author.book_set) and managers
+    returning a subset of rows query the database, as a cached row may not be
+    one of theirs.
+
+    Rows read inside atomic blocks are served from the cache but not cached:
+    the transaction may roll back the changes they were read after.
+    """
+
+    def __init__(self, timeout: float | None = None):
+        super().__init__()
+        self.timeout = timeout
+
+    @property
+    def cache(self):
+        return caches[model_cache_settings()["CACHE"]]
+
+    def get_timeout(self) -> float:
+        if self.timeout is not None:
+            return self.timeout
+        return model_cache_settings()["TIMEOUT"]
+
+    def can_cache(self) -> bool:
+        # Invalidations of rows changed in the transaction are deferred until
+        # it commits, and so never happen if it rolls back
+        return not transaction.get_connection(self.db).in_atomic_block
+
+    def uses_cache(self) -> bool:
+        return (
+            self._db is None
+            and self.model._meta.managers_map.get(self.name) is self
+            and not self.get_queryset().query.where
+        )
+
+    def get(self, *args, **kwargs):
+        if args or len(kwargs) != 1 or not self.uses_cache():
+            return super().get(*args, **kwargs)
+        ((lookup, value),) = kwargs.items()
+        field = unique_field(self.model, lookup)
+        if field is None:
+            return super().get(*args, **kwargs)
+        value = field.to_python(value)
+
+        if field.primary_key:
+            return self.get_by_pk(value)
+
+        key = cache_key(self.model, field.attname, value)
+        pk = self.cache.get(key)
+        if pk is not None:
+            obj = self.get_by_pk(pk, raise_missing=False)
+            # The pointer outlives changes of the unique field
+            if obj is not None and getattr(obj, field.attname) == value:
+                return obj
+
+        profiling.record("model-cache-miss")
+        obj = super().get(**{field.attname: value})
+        if self.can_cache():
+            self.cache.set(key, obj.pk, self.get_timeout())
+            pk_key = cache_key(self.model, "pk", obj.pk)
+            self.cache.set(pk_key, obj, self.get_timeout())
+        return obj
+
+    def get_by_pk(self, pk, raise_missing: bool = True):
+        key = cache_key(self.model, "pk", pk)
+        obj = self.cache.get(key)
+        if obj is not None:
+            profiling.record("model-cache-hit")
+            return obj
+
+        profiling.record("model-cache-miss")
+        try:
+            obj = super().get(pk=pk)
+        except self.model.DoesNotExist:
+            if raise_missing:
+                raise
+            return None
+        if self.can_cache():
+            self.cache.set(key, obj, self.get_timeout())
+        return obj
+
+    def in_bulk(self, id_list=None, *, field_name="pk"):
+        if (
+            id_list is None
+            or field_name not in ("pk", self.model._meta.pk.name)
+            or not self.uses_cache()
+        ):
+            return super().in_bulk(id_list, field_name=field_name)
+
+        pks = [self.model._meta.pk.to_python(pk) for pk in id_list]
+        keys = {cache_key(self.model, "pk", pk): pk for pk in pks}
+        cached = self.cache.get_many(keys)
+        objects = {keys[key]: obj for key, obj in cached.items()}
+        missing = [pk for key, pk in keys.items() if key not in cached]
+        if cached:
+            profiling.record("model-cache-hit", description=f"{len(cached)} rows")
+        if missing:
+            profiling.record("model-cache-miss", description=f"{len(missing)} rows")
+            fetched = super().in_bulk(missing)
+            if self.can_cache():
+                self.cache.set_many(
+                    {
+                        cache_key(self.model, "pk", obj.pk): obj
+                        for obj in fetched.values()
+                    },
+                    self.get_timeout(),
+                )
+            objects.update(fetched)
+        return objects
+
+    def invalidate(self, *pks) -> None:
+        """
+        Drop the cached rows with the given primary keys.
+        """
+        self.cache.delete_many([cache_key(self.model, "pk", pk) for pk in pks])
+
+
+def cached_manager(model) -> CachedManager | None:
+    for manager in model._meta.managers:
+        if isinstance(manager, CachedManager):
+            return manager
+    return None
+
+
+def invalidate(model, *pks) -> None:
+    """
+    Drop the cached rows of the model with the given primary keys, now and
+    again when the current transaction commits, so that rows cached by other
+    processes in the meantime aren't left stale.
+    """
+    manager = cached_manager(model)
+    if manager is None or not pks:
+        return
+    manager.invalidate(*pks)
+    transaction.on_commit(lambda: manager.invalidate(*pks))
+
+
+def _invalidate_instance(sender, instance, **kwargs):
+    invalidate(sender, instance.pk)
+
+
+def _invalidate_m2m(sender, instance, action, model, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if type(instance) in _connected:
+        invalidate(type(instance), instance.pk)
+    if model in _connected and pk_set:
+        invalidate(model, *pk_set)
+
+
+def connect_invalidation(models_: Iterable[type]) -> None:
+    """
+    Connect the cache invalidation signal handlers for the given models,
+    skipping those without a CachedManager.
+    """
+    for model in models_:
+        if model in _connected or cached_manager(model) is None:
+            continue
+        _connected.add(model)
+        uid = f"django_structured.model_cache:{model._meta.label_lower}"
+        post_save.connect(_invalidate_instance, sender=model, dispatch_uid=uid)
+        post_delete.connect(_invalidate_instance, sender=model, dispatch_uid=uid)
+    if _connected:
+        m2m_changed.connect(
+            _invalidate_m2m, dispatch_uid="django_structured.model_cache"
+        )
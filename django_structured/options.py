@@ -47,6 +47,96 @@ class ProjectOptions:
             "group": "Containerization",
         },
     )
+    docker_production: bool = field(
+        default=True,
+        metadata={
+            "help": "Add a multi-stage production target with precompiled bytecode to the Dockerfile",
+            "group": "Containerization",
+        },
+    )
+
+    # Serving
+    interface: str = field(
+        default="wsgi",
+        metadata={
+            "help": "Serve the project through wsgi.py or asgi.py",
+            "choices": ["wsgi", "asgi"],
+            "group": "Serving",
+        },
+    )
+    server: str = field(
+        default="gunicorn",
+        metadata={
+            "help": "Production server to generate configuration for",
+            "choices": ["gunicorn", "uvicorn", "granian"],
+            "group": "Serving",
+        },
+    )
+
+    # Performance
+    static_compression: bool = field(
+        default=True,
+        metadata={
+            "help": "Serve content-hashed, precompressed (gzip and brotli) static files",
+            "group": "Performance",
+        },
+    )
+    profiling: bool = field(
+        default=True,
+        metadata={
+            "help": "Profile requests with Server-Timing headers in dev and staging",
+            "group": "Performance",
+        },
+    )
+    memory_watchdog: bool = field(
+        default=False,
+        metadata={
+            "help": "Report worker memory growth and recycle workers that grow too much",
+            "group": "Performance",
+        },
+    )
+    http_efficiency: bool = field(
+        default=True,
+        metadata={
+            "help": "Compress responses, answer conditional requests with 304s and set Cache-Control defaults",
+            "group": "Performance",
+        },
+    )
+    routing: bool = field(
+        default=False,
+        metadata={
+            "help": "Route views declared with @route through an indexed resolver",
+            "group": "Performance",
+        },
+    )
+
+    # REST
+    drf: bool = field(
+        default=False,
+        metadata={
+            "help": "Configure Django REST framework with throughput-tuned defaults",
+            "group": "REST",
+        },
+    )
+
+    # Monitoring
+    sentry: bool = field(
+        default=False,
+        metadata={
+            "help": "Configure Sentry error reporting and performance tracing",
+            "group": "Monitoring",
+        },
+    )
+
+    # Background tasks
+    tasks: str = field(
+        default="none",
+        metadata={
+            "help": "Background task backend; database needs no extra service",
+            "choices": ["none", "database", "celery", "rq"],
+            "group": "Background tasks",
+        },
+    )
 
     # Editors
     vscode: bool = field(
@@ -66,6 +156,12 @@ class ProjectOptions:
         },
     )
 
+    def __post_init__(self):
+        if self.server == "uvicorn" and self.interface != "asgi":
+            raise click.BadParameter(
+                "uvicorn can only serve the asgi interface", param_hint="--server"
+            )
+
 
 @dataclass
 class AppOptions:
@@ -73,6 +169,10 @@ class AppOptions:
         default=True,
         metadata={"help": "Generate migrations for the app"},
     )
+    async_views: bool = field(
+        default=False,
+        metadata={"help": "Generate async views, middleware and test fixtures"},
+    )
 
 
 def click_options(options_dataclass):
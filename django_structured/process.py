@@ -0,0 +1,41 @@
+"""
+The current process: its memory use, and whether a server replaces it when it
+exits.
+"""
+
+import multiprocessing
+import os
+import sys
+
+
+def rss() -> int:
+    """
+    Return the resident set size of this process in bytes.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        # Peak rather than current RSS, in KiB on Linux but bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def supervised() -> bool:
+    """
+    Return whether this process is a server worker that is replaced when it
+    exits: a gunicorn worker, whose arbiter always replaces it, or one of
+    several uvicorn or granian worker processes (serve.py exports their
+    number as WEB_CONCURRENCY). A lone uvicorn or granian process exiting
+    stops the server.
+    """
+    if "gunicorn.arbiter" in sys.modules:
+        return True
+    if multiprocessing.parent_process() is None:
+        return False
+    try:
+        return int(os.environ.get("WEB_CONCURRENCY", 1)) > 1
+    except ValueError:
+        return False
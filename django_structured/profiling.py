@@ -0,0 +1,322 @@
+import contextvars
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Dict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+log = logging.getLogger(__name__)
+
+_current: contextvars.ContextVar["Profile | None"] = contextvars.ContextVar(
+    "django_structured_profile", default=None
+)
+
+
+@dataclass
+class Metric:
+    duration: float = 0.0
+    count: int = 0
+    description: str | None = None
+
+
+@dataclass
+class Profile:
+    """
+    Measurements of a single request. Anything may add its own metrics with
+    record(), and they are reported alongside the built-in ones.
+    """
+
+    start: float = field(default_factory=time.perf_counter)
+    duration: float = 0.0
+    queries: int = 0
+    query_duration: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    template_duration: float = 0.0
+    metrics: Dict[str, Metric] = field(default_factory=dict)
+    _depth: Dict[str, int] = field(default_factory=dict, repr=False)
+
+    def record(
+        self, name: str, duration: float = 0.0, description: str | None = None
+    ) -> None:
+        metric = self.metrics.setdefault(name, Metric())
+        metric.duration += duration
+        metric.count += 1
+        if description is not None:
+            metric.description = description
+
+    def server_timing(self) -> str:
+        """
+        Format this profile as the value of a Server-Timing header.
+        """
+        entries = [
+            f"total;dur={self.duration * 1000:.1f}",
+            f'db;dur={self.query_duration * 1000:.1f};desc="{self.queries} queries"',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f"tpl;dur={self.template_duration * 1000:.1f}",
+        ]
+        for name, metric in self.metrics.items():
+            entry = f"{name};dur={metric.duration * 1000:.1f}"
+            if metric.description:
+                entry += f';desc="{metric.description}"'
+            entries.append(entry)
+        return ", ".join(entries)
+
+    def as_dict(self) -> Dict:
+        return {
+            "duration_ms": round(self.duration * 1000, 3),
+            "queries": self.queries,
+            "query_duration_ms": round(self.query_duration * 1000, 3),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "template_duration_ms": round(self.template_duration * 1000, 3),
+            "metrics": {
+                name: {
+                    "duration_ms": round(metric.duration * 1000, 3),
+                    "count": metric.count,
+                }
+                for name, metric in self.metrics.items()
+            },
+        }
+
+
+def current_profile() -> Profile | None:
+    """
+    Return the profile of the request being handled, or None if the request is
+    not being profiled.
+    """
+    return _current.get()
+
+
+def record(name: str, duration: float = 0.0, description: str | None = None) -> None:
+    """
+    Add a measurement to the current request's profile, if it is profiled.
+    """
+    profile = _current.get()
+    if profile is not None:
+        profile.record(name, duration, description)
+
+
+def _outermost(profile: Profile, kind: str):
+    """
+    Return whether the instrumented call of the given kind is the outermost
+    one, so that nested calls (e.g. included templates) aren't counted twice.
+    """
+    return not profile._depth.get(kind)
+
+
+def _instrument_cache_backend(cls) -> None:
+    if getattr(cls, "_structured_profiled", False):
+        return
+
+    original_get = cls.get
+    original_get_many = cls.get_many
+    missing = object()
+
+    @wraps(original_get)
+    def get(self, key, default=None, version=None):
+        profile = _current.get()
+        if profile is None or not _outermost(profile, "cache"):
+            return original_get(self, key, default, version)
+
+        profile._depth["cache"] = 1
+        try:
+            value = original_get(self, key, missing, version)
+        finally:
+            profile._depth["cache"] = 0
+        if value is missing:
+            profile.cache_misses += 1
+            return default
+        profile.cache_hits += 1
+        return value
+
+    @wraps(original_get_many)
+    def get_many(self, keys, version=None):
+        profile = _current.get()
+        if profile is None or not _outermost(profile, "cache"):
+            return original_get_many(self, keys, version)
+
+        keys = list(keys)
+        profile._depth["cache"] = 1
+        try:
+            values = original_get_many(self, keys, version)
+        finally:
+            profile._depth["cache"] = 0
+        profile.cache_hits += len(values)
+        profile.cache_misses += len(keys) - len(values)
+        return values
+
+    cls.get = get
+    cls.get_many = get_many
+    cls._structured_profiled = True
+
+
+def _instrument_templates() -> None:
+    from django.template.base import Template
+
+    if getattr(Template, "_structured_profiled", False):
+        return
+
+    original_render = Template.render
+
+    @wraps(original_render)
+    def render(self, context):
+        profile = _current.get()
+        if profile is None or not _outermost(profile, "template"):
+            return original_render(self, context)
+
+        profile._depth["template"] = 1
+        start = time.perf_counter()
+        try:
+            return original_render(self, context)
+        finally:
+            profile.template_duration += time.perf_counter() - start
+            profile._depth["template"] = 0
+
+    Template.render = render
+    Template._structured_profiled = True
+
+
+def _profile_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.query_duration += time.perf_counter() - start
+
+
+def _instrument_connection(connection, **kwargs) -> None:
+    # At the bottom of the stack, as execute_wrapper() blocks pop the last one
+    if _profile_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _profile_query)
+
+
+def _instrument_connections() -> None:
+    """
+    Count the queries of every connection, including those opened by the
+    threads sync_to_async runs the ORM in: connections are per thread, but
+    the profile is found through the request's context, which sync_to_async
+    carries over.
+    """
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    connection_created.connect(
+        _instrument_connection, dispatch_uid="django_structured.profiling"
+    )
+    for connection in connections.all():
+        _instrument_connection(connection)
+
+
+def instrument() -> None:
+    """
+    Instrument database connections, the configured cache backends and the
+    Django template engine (once per process). Outside of profiled requests,
+    instrumentation only costs a context variable lookup per call.
+    """
+    _instrument_connections()
+    for cache in settings.CACHES.values():
+        _instrument_cache_backend(import_string(cache["BACKEND"]))
+    _instrument_templates()
+
+
+def profiling_settings() -> Dict:
+    options = {
+        "SAMPLE_RATE": 1.0,
+        "HEADER": True,
+        "LOG": True,
+    }
+    options.update(getattr(settings, "STRUCTURED_PROFILING", {}))
+    return options
+
+
+class ProfilingMiddleware:
+    """
+    Measure wall time, SQL queries, cache hits and misses and template render
+    time of a sample of requests, and report them as a Server-Timing header
+    and a log line on the django_structured.profiling logger.
+
+    Place it first in MIDDLEWARE. Configure with the STRUCTURED_PROFILING
+    setting:
+        SAMPLE_RATE: Fraction of requests to profile. Default: 1.0.
+        HEADER: Whether to add the Server-Timing header. Default: True.
+        LOG: Whether to log each profile. Default: True.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        options = profiling_settings()
+        self.sample_rate = options["SAMPLE_RATE"]
+        self.header = options["HEADER"]
+        self.log = options["LOG"]
+        instrument()
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def sampled(self) -> bool:
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        profile = Profile()
+        token = _current.set(profile)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        profile = Profile()
+        token = _current.set(profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, profile)
+
+    def finish(self, request, response, profile):
+        profile.duration = time.perf_counter() - profile.start
+
+        if self.header:
+            response.headers["Server-Timing"] = profile.server_timing()
+        if self.log:
+            data = profile.as_dict()
+            log.info(
+                "%s %s %s %.1fms queries=%d cache_hits=%d cache_misses=%d",
+                request.method,
+                request.path,
+                response.status_code,
+                profile.duration * 1000,
+                profile.queries,
+                profile.cache_hits,
+                profile.cache_misses,
+                extra={
+                    "profile": data,
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                },
+            )
+        return response
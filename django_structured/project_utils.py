@@ -1,14 +1,150 @@
 import logging
 import pkgutil
 import sys
+import threading
 import warnings
+from dataclasses import dataclass, field
 from importlib import import_module
-from typing import Dict, Iterable, List
+from types import ModuleType
+from typing import Any, Dict, Iterable, List, Tuple
 
 log = logging.getLogger(__name__)
 log.setLevel(logging.INFO)
 
 
+@dataclass
+class _RegisteredModule:
+    module: ModuleType
+    # The spec the module was registered with: reloading a module gives it a
+    # new one
+    spec: Any
+    instances_of: Tuple[type, ...] | None = None
+    classes: List[type] = field(default_factory=list)
+    instances: List[Any] = field(default_factory=list)
+
+    @property
+    def current(self) -> bool:
+        return self.module.__spec__ is self.spec
+
+
+class TypeRegistry:
+    """
+    Classes (and optionally instances) of the modules imported by
+    load_modules, indexed by the types they derive from.
+
+    Usage:
+        from django_structured.project_utils import load_modules, registry
+
+        load_modules(__name__, registry=registry)
+
+        registry.subclasses_of(Handler)
+        registry.subclasses_of(Handler, package="app50.handlers")
+
+    Results are in the order modules were loaded (by name within a package),
+    then the order classes are defined in, and are cached: repeated lookups
+    are a dictionary lookup, plus a check that none of the modules looked in
+    (those of the package, if given) were reloaded since. Modules that were
+    are registered again.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._modules: Dict[str, _RegisteredModule] = {}
+        self._cache: Dict[Tuple, Tuple[Tuple, List[_RegisteredModule]]] = {}
+
+    def register(
+        self, module: ModuleType, instances_of: type | Tuple[type, ...] | None = None
+    ) -> None:
+        """
+        Register the classes defined in a module, and its members that are
+        instances of instances_of. Registering a module again replaces what
+        it registered before.
+        """
+        if instances_of is not None and not isinstance(instances_of, type):
+            instances_of = tuple(instances_of)
+        registered = _RegisteredModule(module, module.__spec__, instances_of)
+        for name, obj in vars(module).items():
+            if name.startswith("__") and name.endswith("__"):
+                continue
+            if isinstance(obj, type):
+                # Skip classes imported from elsewhere
+                if obj.__module__ == module.__name__:
+                    registered.classes.append(obj)
+            elif instances_of is not None and isinstance(obj, instances_of):
+                registered.instances.append(obj)
+        with self._lock:
+            self._modules[module.__name__] = registered
+            self._cache.clear()
+
+    def forget(self, module_name: str) -> None:
+        with self._lock:
+            if self._modules.pop(module_name, None) is not None:
+                self._cache.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._modules.clear()
+            self._cache.clear()
+
+    def _reregister_reloaded(self) -> None:
+        for registered in list(self._modules.values()):
+            if not registered.current:
+                self.register(registered.module, registered.instances_of)
+
+    def _lookup(self, kind: str, base: type, package: str | None) -> Tuple:
+        key = (kind, base, package)
+        cached = self._cache.get(key)
+        if cached is not None:
+            result, scope = cached
+            # A reloaded module may define members where there were none
+            if all(registered.current for registered in scope):
+                return result
+
+        with self._lock:
+            self._reregister_reloaded()
+            found = {}
+            scope = []
+            for name, registered in self._modules.items():
+                if package is not None and not (
+                    name == package or name.startswith(f"{package}.")
+                ):
+                    continue
+                scope.append(registered)
+                if kind == "subclasses":
+                    members = [
+                        cls
+                        for cls in registered.classes
+                        if cls is not base and issubclass(cls, base)
+                    ]
+                else:
+                    members = [
+                        obj for obj in registered.instances if isinstance(obj, base)
+                    ]
+                for member in members:
+                    found.setdefault(id(member), member)
+            result = tuple(found.values())
+            self._cache[key] = (result, scope)
+            return result
+
+    def subclasses_of(self, base: type, package: str | None = None) -> Tuple[type, ...]:
+        """
+        Registered subclasses of base (not including base), only from modules
+        of the given package if any.
+        """
+        return self._lookup("subclasses", base, package)
+
+    def instances_of(self, cls: type, package: str | None = None) -> Tuple:
+        """
+        Registered instances of cls, only from modules of the given package if
+        any.
+        """
+        return self._lookup("instances", cls, package)
+
+
+# Registry shared by the whole process
+registry = TypeRegistry()
+
+
 def load_modules(
     name,
     globals_dict: Dict | None = None,
@@ -19,10 +155,12 @@ def load_modules(
     subclasses_of: type | Iterable[type] | None = None,
     instances_of: type | Iterable[type] | None = None,
     of_types: type | Iterable[type] | None = None,
+    registry: TypeRegistry | None = None,
 ) -> None:
     """
     For use in a package's __init__ module, executes import on all modules in
-    the package, optionally adding members to the given globals and __all__.
+    the package, optionally adding members to the given globals and __all__,
+    and registering their classes in a TypeRegistry.
 
     Usage examples:
         load_modules(__name__)
@@ -36,6 +174,9 @@ def load_modules(
         __all__ = []
         load_modules(__name__, globals(), __all__, subclasses_of=models.Model)
 
+        from django_structured.project_utils import registry
+        load_modules(__name__, registry=registry)
+
     Args:
         path (str): The package path list to load modules from. Just pass
             __name__ for most cases.
@@ -64,6 +205,11 @@ def load_modules(
         of_types (iterable of types): If provided, this list is added to both
             subclasses_of and instances_of lists (even if they are not
             provided).
+
+        registry (TypeRegistry): If provided, the classes defined in the
+            imported modules are registered in it, as are their members that
+            are instances of instances_of. Pass the process-wide
+            django_structured.project_utils.registry in most cases.
     """
     log.debug(f"{name=}")
     if of_types is not None:
@@ -93,6 +239,9 @@ def load_modules(
             log.debug(f"import_module({pkg_name}.{module_name})")
             module = import_module(f"{pkg_name}.{module_name}")
 
+            if registry is not None:
+                registry.register(module, instances_of)
+
             if globals_dict is not None or all_names is not None:
                 log.debug(f"Examining contents of {module!r}")
                 for name in dir(module):
@@ -0,0 +1,317 @@
+"""
+Pytest plugin for Structured projects. Enable it with `-p
+django_structured.pytest_plugin` (generated projects do so in pyproject.toml).
+
+Query budgets:
+    Fail a test when it executes more SQL queries than its budget, reporting
+    the queries that were repeated (usually N+1 patterns).
+
+    @pytest.mark.query_budget(3)
+    def test_list_view(client):
+        client.get("/items/")
+
+    def test_list_view(client, query_budget):
+        with query_budget(3):
+            client.get("/items/")
+
+    Run pytest with --query-report to list the tests executing the most
+    queries. Under pytest-xdist, workers send the queries of each test to the
+    controller, which reports on all of them.
+
+Missing indexes:
+    Run pytest with --capture-queries queries.json to save the queries tests
+    execute, for `manage.py suggestindexes queries.json` to find the full
+    table scans an index would avoid. Under pytest-xdist, each worker saves
+    its own file, suffixed with its name, which the controller merges into
+    the one requested.
+
+Sentry:
+    The sentry_transport fixture initializes Sentry from settings with a fake
+    DSN and an in-memory transport, so tests can check what would be sent
+    without any network access.
+
+    def test_traced(sentry_transport):
+        ...
+        assert sentry_transport.items("transaction")
+
+Background tasks:
+    The eager_tasks fixture runs tasks enqueued during the test immediately,
+    in process, whatever the configured backend.
+
+    def test_signup(client, eager_tasks):
+        client.post("/signup/", {...})
+        assert mail.outbox
+
+Fixtures:
+    The bulk_fixtures fixture loads fixture files with bulk inserts (see
+    django_structured.fixtures), much faster than loaddata. Load fixtures
+    shared by many tests once per session by overriding django_db_setup:
+
+    @pytest.fixture(scope="session")
+    def django_db_setup(django_db_setup, django_db_blocker):
+        from django_structured.fixtures import load_fixtures
+
+        with django_db_blocker.unblock():
+            load_fixtures("seeds", signals=False)
+"""
+
+import glob
+import os
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import List
+
+import pytest
+
+from .indexes import QueryLog
+from .queries import QueryCollector
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@dataclass
+class QueryStats:
+    nodeid: str
+    count: int
+    duration: float
+    shapes: Counter
+
+
+queries_key = pytest.StashKey[List[QueryStats]]()
+item_queries_key = pytest.StashKey[QueryStats]()
+query_log_key = pytest.StashKey[QueryLog]()
+
+
+def format_shapes(shapes: Counter, limit: int = 5) -> str:
+    lines = [
+        f"  {count:>4} x {shape}"
+        for shape, count in shapes.most_common(limit)
+        if count > 1
+    ]
+    return "\n".join(lines)
+
+
+def check_budget(collector: QueryCollector, budget: int, where: str) -> None:
+    if len(collector) <= budget:
+        return
+
+    message = f"{where} executed {len(collector)} queries (budget: {budget})"
+    repeated = format_shapes(collector.shapes())
+    if repeated:
+        message += f"\nRepeated queries:\n{repeated}"
+    raise QueryBudgetExceeded(message)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("django_structured")
+    group.addoption(
+        "--query-report",
+        action="store",
+        type=int,
+        nargs="?",
+        const=10,
+        default=None,
+        metavar="N",
+        help="Summarize the N tests (default: 10) executing the most queries.",
+    )
+    group.addoption(
+        "--capture-queries",
+        action="store",
+        default=None,
+        metavar="PATH",
+        help="Save the queries tests execute to PATH, for manage.py suggestindexes.",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(n): fail the test if it executes more than n SQL queries.",
+    )
+    config.stash[queries_key] = []
+    config.pluginmanager.register(
+        QueryStatsCollector(config.stash[queries_key]), "query_stats_collector"
+    )
+    config.stash[query_log_key] = QueryLog()
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("query_budget")
+    report = item.config.getoption("query_report") is not None
+    capture = item.config.getoption("capture_queries") is not None
+    if marker is None and not report and not capture:
+        return (yield)
+
+    with QueryCollector() as collector:
+        try:
+            result = yield
+        finally:
+            # Failing tests run queries worth indexing for too
+            if capture:
+                item.config.stash[query_log_key].extend(collector)
+
+    if report:
+        item.stash[item_queries_key] = QueryStats(
+            nodeid=item.nodeid,
+            count=len(collector),
+            duration=collector.duration,
+            shapes=collector.shapes(),
+        )
+    if marker is not None:
+        budget = marker.args[0] if marker.args else marker.kwargs["n"]
+        check_budget(collector, budget, item.nodeid)
+
+    return result
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_makereport(item, call):
+    report = yield
+    stats = item.stash.get(item_queries_key, None)
+    if call.when == "call" and stats is not None:
+        # Plain values, which pytest-xdist sends from workers to the controller
+        report.query_stats = {
+            "count": stats.count,
+            "duration": stats.duration,
+            "shapes": dict(stats.shapes),
+        }
+    return report
+
+
+class QueryStatsCollector:
+    """
+    Plugin collecting the query stats of test reports, whether the tests ran
+    in this process or in pytest-xdist workers.
+    """
+
+    def __init__(self, tests: List[QueryStats]):
+        self.tests = tests
+
+    def pytest_runtest_logreport(self, report):
+        stats = getattr(report, "query_stats", None)
+        if stats is None:
+            return
+        self.tests.append(
+            QueryStats(
+                nodeid=report.nodeid,
+                count=stats["count"],
+                duration=stats["duration"],
+                shapes=Counter(stats["shapes"]),
+            )
+        )
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Context manager failing the test if the code in its block executes more
+    than the given number of SQL queries.
+    """
+
+    @contextmanager
+    def _query_budget(budget: int):
+        with QueryCollector() as collector:
+            yield collector
+        check_budget(collector, budget, "Block")
+
+    return _query_budget
+
+
+def xdist_controller(config) -> bool:
+    return not hasattr(config, "workerinput") and config.pluginmanager.hasplugin(
+        "dsession"
+    )
+
+
+def worker_captures(path: str) -> List[str]:
+    return glob.glob(f"{glob.escape(path)}.gw*")
+
+
+def pytest_sessionstart(session):
+    path = session.config.getoption("capture_queries")
+    if path is not None and xdist_controller(session.config):
+        # Left by an earlier run, which would be merged with this one's
+        for capture in worker_captures(path):
+            os.remove(capture)
+
+
+def pytest_sessionfinish(session):
+    path = session.config.getoption("capture_queries")
+    if path is None:
+        return
+    if xdist_controller(session.config):
+        # The controller runs no tests: merge what the workers captured
+        captures = worker_captures(path)
+        QueryLog.load(*captures).save(path)
+        for capture in captures:
+            os.remove(capture)
+        return
+    worker = getattr(session.config, "workerinput", {}).get("workerid")
+    if worker is not None:
+        path = f"{path}.{worker}"
+    session.config.stash[query_log_key].save(path)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    limit = config.getoption("query_report")
+    if limit is None:
+        return
+
+    tests = sorted(
+        config.stash[queries_key], key=lambda test: test.count, reverse=True
+    )[:limit]
+    terminalreporter.section("query report")
+    for test in tests:
+        terminalreporter.write_line(
+            f"{test.count:>6} queries {test.duration * 1000:>9.1f}ms  {test.nodeid}"
+        )
+        repeated = format_shapes(test.shapes, limit=3)
+        if repeated:
+            terminalreporter.write_line(repeated)
+
+
+@pytest.fixture
+def sentry_transport():
+    """
+    Initialize Sentry from the STRUCTURED_SENTRY setting with a fake DSN and
+    return its in-memory transport. Sentry is disabled again after the test.
+    """
+    sentry_sdk = pytest.importorskip("sentry_sdk")
+    from .sentry import FAKE_DSN, init_from_settings, recording_transport
+
+    transport = recording_transport()
+    init_from_settings(dsn=FAKE_DSN, transport=transport)
+    yield transport
+    sentry_sdk.flush()
+    sentry_sdk.init()
+
+
+@pytest.fixture
+def eager_tasks():
+    """
+    Run background tasks as soon as they are enqueued, in process.
+    """
+    from django.conf import settings
+    from django.test import override_settings
+
+    options = {**getattr(settings, "STRUCTURED_TASKS", {}), "BACKEND": "eager"}
+    with override_settings(STRUCTURED_TASKS=options):
+        yield
+
+
+@pytest.fixture
+def bulk_fixtures():
+    """
+    Return a function loading fixtures with bulk inserts, for tests with
+    database access:
+
+        def test_catalog(db, bulk_fixtures):
+            bulk_fixtures("catalog.json", signals=False)
+    """
+    from .fixtures import load_fixtures
+
+    return load_fixtures
@@ -0,0 +1,106 @@
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from typing import Any, List
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s|(?<![:\w]):\w+")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\1)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Reduce a query to its shape, replacing literals and parameters with "?"
+    and collapsing IN (...) and multi-row VALUES lists, so that queries that
+    only differ by their parameters compare equal.
+
+    >>> normalize_sql('SELECT * FROM "app_item" WHERE "id" IN (%s, %s, %s)')
+    'SELECT * FROM "app_item" WHERE "id" IN (...)'
+    """
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _VALUES_LIST.sub(r"\1, ...", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@dataclass
+class Query:
+    sql: str
+    params: Any
+    duration: float
+    alias: str
+    many: bool = False
+
+
+@dataclass
+class QueryCollector:
+    """
+    Context manager recording every SQL query executed through any database
+    connection while active, using connection.execute_wrapper().
+
+    Unlike connection.queries, this works regardless of DEBUG, and costs
+    nothing once the block exits.
+
+    Usage:
+        with QueryCollector() as queries:
+            ...
+        print(len(queries), queries.duration)
+    """
+
+    keep_params: bool = True
+    queries: List[Query] = field(default_factory=list)
+
+    def __enter__(self) -> "QueryCollector":
+        from django.db import connections
+
+        self._stack = ExitStack()
+        for alias in connections:
+            self._stack.enter_context(
+                connections[alias].execute_wrapper(self._wrapper(alias))
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    def _wrapper(self, alias):
+        def wrapper(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                self.queries.append(
+                    Query(
+                        sql=sql,
+                        params=params if self.keep_params else None,
+                        duration=time.perf_counter() - start,
+                        alias=alias,
+                        many=many,
+                    )
+                )
+
+        return wrapper
+
+    def __len__(self):
+        return len(self.queries)
+
+    def __iter__(self):
+        return iter(self.queries)
+
+    def shapes(self) -> Counter:
+        """
+        Count queries by normalized SQL. Shapes executed many times are
+        usually N+1 patterns.
+        """
+        return Counter(normalize_sql(query.sql) for query in self.queries)
+
+    @property
+    def duration(self) -> float:
+        return sum(query.duration for query in self.queries)
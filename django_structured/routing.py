@@ -0,0 +1,257 @@
+"""
+Convention-based routing: views declare their URLs with the route decorator,
+and a Router discovers them in every installed app's views package.
+
+    # app50/views/items.py
+    from django_structured.routing import route
+
+    @route("items/", name="item-list")
+    def item_list(request): ...
+
+    @route("items/<int:pk>/", name="item-detail")
+    class ItemDetailView(DetailView): ...
+
+    # project50/urls.py
+    from django_structured.routing import Router
+
+    urlpatterns = [
+        path("admin/", admin.site.urls),
+        Router().discover().urls,
+    ]
+
+Routes are resolved through IndexedResolver, which indexes patterns by the
+static segments at the start of their route, so only the few patterns sharing
+a path's leading segments are matched against it, instead of every pattern in
+turn. Regular expressions are only run for dynamic segments. Patterns are
+still matched in order, so resolving gives the same result as with
+urlpatterns.
+"""
+
+import sys
+from dataclasses import dataclass, field
+from importlib import import_module
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import django
+from django.apps import AppConfig, apps
+from django.urls import URLPattern, path
+from django.urls.exceptions import Resolver404
+from django.urls.resolvers import ResolverMatch, RoutePattern, URLResolver
+from django.utils.module_loading import module_has_submodule
+from django.views import View
+
+from .project_utils import load_modules, registry
+
+# Attribute of views holding the routes they declared
+ROUTES_ATTRIBUTE = "structured_routes"
+
+
+@dataclass
+class Route:
+    path: str
+    name: str | None = None
+    kwargs: Dict = field(default_factory=dict)
+
+
+def route(path: str, name: str | None = None, kwargs: Dict | None = None) -> Callable:
+    """
+    Decorator declaring the URL of a view function or class, with the same
+    arguments as django.urls.path. May be applied more than once.
+    """
+
+    def decorator(view):
+        routes = vars(view).get(ROUTES_ATTRIBUTE)
+        if routes is None:
+            routes = []
+            setattr(view, ROUTES_ATTRIBUTE, routes)
+        # Decorators apply bottom-up, keep routes in reading order
+        routes.insert(0, Route(path, name, kwargs or {}))
+        return view
+
+    return decorator
+
+
+def declared_routes(obj) -> List[Route]:
+    try:
+        # Only routes declared on the view itself, not inherited ones
+        return vars(obj).get(ROUTES_ATTRIBUTE, [])
+    except TypeError:
+        return []
+
+
+class _Node:
+    __slots__ = ("children", "patterns")
+
+    def __init__(self):
+        self.children: Dict[str, _Node] = {}
+        self.patterns: List[Tuple[int, object]] = []
+
+
+def _static_prefix(pattern) -> List[str] | None:
+    """
+    Path segments a pattern's matches always start with, or None when
+    unknown.
+    """
+    if not isinstance(pattern, RoutePattern):
+        return None
+    segments = str(pattern._route).split("/")
+    prefix = []
+    for index, segment in enumerate(segments):
+        if "<" in segment:
+            break
+        last = index == len(segments) - 1
+        # Patterns of includes match the start of paths, so their last
+        # segment may be the start of a longer one
+        if last and not pattern._is_endpoint:
+            break
+        prefix.append(segment)
+    return prefix
+
+
+class IndexedResolver(URLResolver):
+    """
+    URLResolver finding candidate patterns for a path in a tree of the static
+    segments starting their routes, before matching them in order.
+    """
+
+    def __init__(self, pattern, urlconf_name, *args, **kwargs):
+        super().__init__(pattern, urlconf_name, *args, **kwargs)
+        self._index: _Node | None = None
+
+    @property
+    def index(self) -> _Node:
+        if self._index is None:
+            root = _Node()
+            for position, pattern in enumerate(self.url_patterns):
+                node = root
+                for segment in _static_prefix(pattern.pattern) or ():
+                    node = node.children.setdefault(segment, _Node())
+                node.patterns.append((position, pattern))
+            self._index = root
+        return self._index
+
+    def candidates(self, path: str) -> List:
+        node = self.index
+        found = list(node.patterns)
+        for segment in path.split("/"):
+            node = node.children.get(segment)
+            if node is None:
+                break
+            found.extend(node.patterns)
+        found.sort(key=lambda candidate: candidate[0])
+        return [pattern for _, pattern in found]
+
+    def resolve(self, path):
+        path = str(path)  # path may be a reverse_lazy object
+        match = self.pattern.match(path)
+        if not match:
+            raise Resolver404({"path": path})
+        new_path, args, kwargs = match
+        tried = []
+        for pattern in self.candidates(new_path):
+            try:
+                sub_match = pattern.resolve(new_path)
+            except Resolver404 as e:
+                self._extend_tried(tried, pattern, e.args[0].get("tried"))
+                continue
+            if not sub_match:
+                tried.append([pattern])
+                continue
+            # Combine arguments like URLResolver.resolve
+            sub_match_dict = {**kwargs, **self.default_kwargs, **sub_match.kwargs}
+            sub_match_args = sub_match.args
+            if not sub_match_dict:
+                sub_match_args = args + sub_match.args
+            current_route = (
+                "" if isinstance(pattern, URLPattern) else str(pattern.pattern)
+            )
+            self._extend_tried(tried, pattern, sub_match.tried)
+            extra = {}
+            # ResolverMatch tells captured and extra kwargs apart from 4.1
+            if django.VERSION >= (4, 1):
+                extra["captured_kwargs"] = sub_match.captured_kwargs
+                extra["extra_kwargs"] = {
+                    **self.default_kwargs,
+                    **sub_match.extra_kwargs,
+                }
+            return ResolverMatch(
+                sub_match.func,
+                sub_match_args,
+                sub_match_dict,
+                sub_match.url_name,
+                [self.app_name] + sub_match.app_names,
+                [self.namespace] + sub_match.namespaces,
+                self._join_route(current_route, sub_match.route),
+                tried,
+                **extra,
+            )
+        # List every pattern on the debug 404 page, as URLResolver does
+        raise Resolver404(
+            {"tried": [[pattern] for pattern in self.url_patterns], "path": new_path}
+        )
+
+
+class Router:
+    """
+    URL patterns of views declared with the route decorator, resolved with an
+    IndexedResolver.
+
+    Routes are kept in the order they're registered in, except that routes
+    without dynamic segments come first, so "items/new/" is found before
+    "items/<slug:slug>/" whichever module declares them.
+    """
+
+    def __init__(self, prefix: str = ""):
+        self.prefix = prefix
+        self.patterns: List[URLPattern] = []
+
+    def register(
+        self, view, route: str, name: str | None = None, kwargs: Dict | None = None
+    ) -> "Router":
+        if isinstance(view, type) and issubclass(view, View):
+            view = view.as_view()
+        self.patterns.append(path(route, view, kwargs, name))
+        return self
+
+    def register_module(self, module) -> "Router":
+        """
+        Register the routes of the views defined in a module.
+        """
+        for obj in list(vars(module).values()):
+            if getattr(obj, "__module__", None) != module.__name__:
+                continue
+            for declared in declared_routes(obj):
+                self.register(obj, declared.path, declared.name, declared.kwargs)
+        return self
+
+    def discover(
+        self, app_configs: Iterable[AppConfig] | None = None, package: str = "views"
+    ) -> "Router":
+        """
+        Register the routes declared in the views package of every installed
+        app (or the given ones), importing all of its modules with
+        load_modules.
+        """
+        if app_configs is None:
+            app_configs = apps.get_app_configs()
+        for app_config in app_configs:
+            if not module_has_submodule(app_config.module, package):
+                continue
+            name = f"{app_config.name}.{package}"
+            views = import_module(name)
+            if hasattr(views, "__path__"):
+                load_modules(name, recursive=True, registry=registry)
+            for module_name in sorted(sys.modules):
+                if module_name == name or module_name.startswith(f"{name}."):
+                    self.register_module(sys.modules[module_name])
+        return self
+
+    @property
+    def urls(self) -> IndexedResolver:
+        """
+        Resolver to add to urlpatterns.
+        """
+        patterns = sorted(
+            self.patterns, key=lambda pattern: "<" in str(pattern.pattern)
+        )
+        return IndexedResolver(RoutePattern(self.prefix, is_endpoint=False), patterns)
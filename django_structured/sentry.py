@@ -0,0 +1,160 @@
+"""
+Sentry error reporting and performance tracing for Structured projects.
+
+Nothing here imports sentry_sdk until init_from_settings() finds Sentry
+enabled, so disabled projects don't pay its import and instrumentation cost.
+"""
+
+import logging
+from typing import Callable, Dict, Iterable
+
+from django.conf import settings
+
+log = logging.getLogger(__name__)
+
+# Never worth tracing: load balancer probes and static files
+DEFAULT_IGNORED_PATHS = ("/health", "/healthz", "/ready", "/favicon.ico")
+
+# Well-formed DSN for tests, pointing nowhere
+FAKE_DSN = "https://public@sentry.invalid/1"
+
+
+def sentry_settings() -> Dict:
+    options = {
+        "ENABLED": True,
+        "DSN": None,
+        "ENVIRONMENT": None,
+        "RELEASE": None,
+        "TRACES_SAMPLE_RATE": 0.0,
+        "PROFILES_SAMPLE_RATE": 0.0,
+        "IGNORED_PATHS": DEFAULT_IGNORED_PATHS,
+        # Database spans are always recorded while tracing
+        "CACHE_SPANS": True,
+        "MIDDLEWARE_SPANS": False,
+        "SIGNALS_SPANS": False,
+        "SEND_DEFAULT_PII": False,
+    }
+    options.update(getattr(settings, "STRUCTURED_SENTRY", {}))
+    return options
+
+
+def request_path(sampling_context: Dict) -> str | None:
+    """
+    Return the path of the request a transaction is for, if any.
+    """
+    environ = sampling_context.get("wsgi_environ")
+    if environ is not None:
+        return environ.get("PATH_INFO")
+    scope = sampling_context.get("asgi_scope")
+    if scope is not None:
+        return scope.get("path")
+    return None
+
+
+def make_traces_sampler(
+    sample_rate: float, ignored_paths: Iterable[str]
+) -> Callable[[Dict], float]:
+    """
+    Return a traces_sampler sampling transactions at sample_rate, except for
+    requests to the ignored paths or below them, which are never traced.
+    Decisions made by upstream services are kept, so distributed traces stay
+    complete.
+    """
+    ignored_paths = tuple(ignored_paths)
+    # Whole path segments: "/health" ignores "/health/db", not "/healthcare"
+    ignored_prefixes = tuple(path.rstrip("/") + "/" for path in ignored_paths)
+
+    def traces_sampler(sampling_context: Dict) -> float:
+        parent_sampled = sampling_context.get("parent_sampled")
+        if parent_sampled is not None:
+            return float(parent_sampled)
+
+        path = request_path(sampling_context)
+        if path is not None and (
+            path in ignored_paths or path.startswith(ignored_prefixes)
+        ):
+            return 0.0
+        return sample_rate
+
+    return traces_sampler
+
+
+def ignored_paths(options: Dict) -> list:
+    paths = list(options["IGNORED_PATHS"])
+    for prefix in (settings.STATIC_URL, getattr(settings, "MEDIA_URL", None)):
+        # An unset MEDIA_URL reads as "/", which would match every request
+        if prefix and prefix.startswith("/") and prefix != "/":
+            paths.append(prefix)
+    return paths
+
+
+def init_from_settings(**overrides) -> bool:
+    """
+    Initialize sentry_sdk from the STRUCTURED_SENTRY setting (see
+    sentry_settings() for the defaults). Keyword arguments are passed on to
+    sentry_sdk.init(), overriding the computed options.
+
+    Returns whether Sentry was initialized: it isn't if disabled or without a
+    DSN, in which case sentry_sdk isn't imported at all.
+    """
+    options = sentry_settings()
+    if not options["ENABLED"] or not (options["DSN"] or overrides.get("dsn")):
+        return False
+
+    import sentry_sdk
+    from sentry_sdk.integrations.django import DjangoIntegration
+
+    init_options = {
+        "dsn": options["DSN"],
+        "environment": options["ENVIRONMENT"],
+        "release": options["RELEASE"],
+        "traces_sampler": make_traces_sampler(
+            options["TRACES_SAMPLE_RATE"], ignored_paths(options)
+        ),
+        "profiles_sample_rate": options["PROFILES_SAMPLE_RATE"],
+        "integrations": [
+            DjangoIntegration(
+                cache_spans=options["CACHE_SPANS"],
+                middleware_spans=options["MIDDLEWARE_SPANS"],
+                signals_spans=options["SIGNALS_SPANS"],
+            )
+        ],
+    }
+    if options["SEND_DEFAULT_PII"]:
+        init_options["send_default_pii"] = True
+    init_options.update(overrides)
+    sentry_sdk.init(**init_options)
+    log.debug(f"Sentry initialized for environment {options['ENVIRONMENT']!r}")
+    return True
+
+
+def recording_transport():
+    """
+    Return a sentry_sdk transport keeping envelopes in memory (in its
+    `envelopes` list) instead of sending them, for tests:
+
+        transport = recording_transport()
+        init_from_settings(dsn=FAKE_DSN, transport=transport)
+
+    The sentry_transport fixture of django_structured.pytest_plugin does this
+    for each test.
+    """
+    from sentry_sdk.transport import Transport
+
+    class RecordingTransport(Transport):
+        def __init__(self, options=None):
+            super().__init__(options)
+            self.envelopes = []
+
+        def capture_envelope(self, envelope):
+            self.envelopes.append(envelope)
+
+        def items(self, item_type: str) -> list:
+            return [
+                item.payload.json
+                for envelope in self.envelopes
+                for item in envelope.items
+                if item.type == item_type
+            ]
+
+    return RecordingTransport()
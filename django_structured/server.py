@@ -0,0 +1,185 @@
+import math
+import os
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def cgroup_cpu_limit(cgroup_root: Path = CGROUP_ROOT) -> float | None:
+    """
+    Return the number of CPUs the current cgroup is allowed to use, or None if
+    the cgroup does not limit CPU usage (or cgroups are unavailable).
+
+    Both cgroup v2 (cpu.max) and v1 (cpu.cfs_quota_us / cpu.cfs_period_us) are
+    supported.
+    """
+    cgroup_root = Path(cgroup_root)
+
+    try:
+        quota, period = (cgroup_root / "cpu.max").read_text().split()
+    except (OSError, ValueError):
+        try:
+            quota = (cgroup_root / "cpu" / "cpu.cfs_quota_us").read_text().strip()
+            period = (cgroup_root / "cpu" / "cpu.cfs_period_us").read_text().strip()
+        except OSError:
+            return None
+
+    if quota in ("max", "-1"):
+        return None
+
+    try:
+        return int(quota) / int(period)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def cgroup_memory_limit(cgroup_root: Path = CGROUP_ROOT) -> int | None:
+    """
+    Return the memory limit of the current cgroup in bytes, or None if memory
+    is not limited (or cgroups are unavailable).
+    """
+    cgroup_root = Path(cgroup_root)
+
+    for path in (
+        cgroup_root / "memory.max",
+        cgroup_root / "memory" / "memory.limit_in_bytes",
+    ):
+        try:
+            value = path.read_text().strip()
+        except OSError:
+            continue
+        if value == "max":
+            return None
+        try:
+            limit = int(value)
+        except ValueError:
+            return None
+        # cgroup v1 reports "unlimited" as a very large page-aligned number
+        if limit >= 2**62:
+            return None
+        return limit
+
+    return None
+
+
+def cpu_count(cgroup_root: Path = CGROUP_ROOT) -> int:
+    """
+    Return the number of CPUs actually available to this process, taking CPU
+    affinity and cgroup quotas into account. Always at least 1.
+    """
+    if hasattr(os, "process_cpu_count"):
+        count = os.process_cpu_count()
+    elif hasattr(os, "sched_getaffinity"):
+        count = len(os.sched_getaffinity(0))
+    else:
+        count = os.cpu_count()
+    count = count or 1
+
+    limit = cgroup_cpu_limit(cgroup_root)
+    if limit is not None:
+        count = min(count, math.ceil(limit))
+
+    return max(count, 1)
+
+
+def _env_int(environ, name, default):
+    value = environ.get(name)
+    if value in (None, ""):
+        return default
+    return int(value)
+
+
+@dataclass
+class ServerConfig:
+    """
+    Process model for serving a Django project, shared by the generated
+    gunicorn.conf.py and serve.py.
+
+    Use ServerConfig.from_environment() to derive the values from the CPU and
+    memory available to the container. Every value may be overridden with an
+    environment variable, listed next to each field.
+    """
+
+    interface: str = "wsgi"
+    # WEB_CONCURRENCY
+    workers: int = 1
+    # WEB_THREADS
+    threads: int = 1
+    # WEB_MAX_REQUESTS, WEB_MAX_REQUESTS_JITTER
+    max_requests: int = 1000
+    max_requests_jitter: int = 100
+    # WEB_MAX_LIFETIME: seconds, for servers recycling workers by age rather
+    # than by requests (granian)
+    max_lifetime: int = 3600
+    # WEB_TIMEOUT, WEB_GRACEFUL_TIMEOUT, WEB_KEEPALIVE
+    timeout: int = 30
+    graceful_timeout: int = 30
+    keepalive: int = 5
+    # WEB_PRELOAD (0 or 1)
+    preload_app: bool = True
+    # WEB_BIND
+    bind: str = "0.0.0.0:8000"
+
+    @classmethod
+    def from_environment(
+        cls,
+        interface: str = "wsgi",
+        *,
+        worker_memory: int = 256 * 2**20,
+        environ=None,
+        cgroup_root: Path = CGROUP_ROOT,
+    ) -> "ServerConfig":
+        """
+        Compute a process model for the given interface ("wsgi" or "asgi").
+
+        WSGI workers block on I/O, so they are oversubscribed (2 * CPUs + 1) and
+        each runs a couple of threads. ASGI workers run an event loop, so one
+        single-threaded worker per CPU is enough. In both cases the number of
+        workers is capped so that `worker_memory` bytes per worker fit in the
+        cgroup memory limit.
+        """
+        if interface not in ("wsgi", "asgi"):
+            raise ValueError(f"Unknown interface {interface!r}")
+        environ = os.environ if environ is None else environ
+
+        cpus = cpu_count(cgroup_root)
+        if interface == "wsgi":
+            workers, threads = 2 * cpus + 1, 2
+        else:
+            workers, threads = cpus, 1
+
+        memory = cgroup_memory_limit(cgroup_root)
+        if memory is not None and worker_memory:
+            workers = min(workers, max(memory // worker_memory, 1))
+
+        defaults = cls()
+        return cls(
+            interface=interface,
+            workers=_env_int(environ, "WEB_CONCURRENCY", workers),
+            threads=_env_int(environ, "WEB_THREADS", threads),
+            max_requests=_env_int(environ, "WEB_MAX_REQUESTS", defaults.max_requests),
+            max_requests_jitter=_env_int(
+                environ, "WEB_MAX_REQUESTS_JITTER", defaults.max_requests_jitter
+            ),
+            max_lifetime=_env_int(environ, "WEB_MAX_LIFETIME", defaults.max_lifetime),
+            timeout=_env_int(environ, "WEB_TIMEOUT", defaults.timeout),
+            graceful_timeout=_env_int(
+                environ, "WEB_GRACEFUL_TIMEOUT", defaults.graceful_timeout
+            ),
+            keepalive=_env_int(environ, "WEB_KEEPALIVE", defaults.keepalive),
+            preload_app=bool(
+                _env_int(environ, "WEB_PRELOAD", int(defaults.preload_app))
+            ),
+            bind=environ.get("WEB_BIND") or defaults.bind,
+        )
+
+    def jittered_max_requests(self) -> int:
+        """
+        Return max_requests plus a random jitter, for servers that do not apply
+        jitter themselves. Jitter keeps workers from recycling all at once.
+        """
+        if not self.max_requests:
+            return 0
+        return self.max_requests + random.randint(0, self.max_requests_jitter)
@@ -0,0 +1,30 @@
+"""
+Session engine following the CACHES setting of the running environment:
+
+    SESSION_ENGINE = "django_structured.sessions"
+
+Sessions are read from the cache when it's shared by all workers (redis,
+memcached), and from the database otherwise, as chosen by
+django_structured.http.session_engine for SESSION_CACHE_ALIAS. Settings
+modules overriding CACHES don't need to set SESSION_ENGINE again.
+"""
+
+from importlib import import_module
+
+from django.conf import settings
+
+from .http import session_engine
+
+
+def engine():
+    """
+    The module of the session engine suited to the current CACHES.
+    """
+    return import_module(session_engine(settings.CACHES, settings.SESSION_CACHE_ALIAS))
+
+
+def __getattr__(name):
+    # SessionStore, as looked up by Django on the SESSION_ENGINE module
+    if name.startswith("__"):
+        raise AttributeError(name)
+    return getattr(engine(), name)
@@ -0,0 +1,268 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage,
+    staticfiles_storage,
+)
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import cached_property
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Encoding name, file suffix
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+# Already-compressed formats gain nothing from another pass
+SKIP_EXTENSIONS = {
+    ".br",
+    ".gz",
+    ".zip",
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".webp",
+    ".avif",
+    ".woff",
+    ".woff2",
+    ".mp3",
+    ".mp4",
+    ".webm",
+}
+
+COMPRESSION_MANIFEST = "staticfiles-compressed.json"
+
+
+def compression_settings() -> Dict:
+    options = {
+        "ENCODINGS": ["br", "gzip"],
+        "MIN_SIZE": 256,
+        "WORKERS": None,
+        "MAX_AGE": 60 * 60 * 24 * 365,
+    }
+    options.update(getattr(settings, "STRUCTURED_STATIC_COMPRESSION", {}))
+    if brotli is None and "br" in options["ENCODINGS"]:
+        options["ENCODINGS"] = [e for e in options["ENCODINGS"] if e != "br"]
+    return options
+
+
+def compress_file(path: str, encodings: Iterable[str]) -> List[str]:
+    """
+    Write a compressed variant of the file at path for each encoding, next to
+    the original. Variants that are not smaller than the original are not
+    kept. Returns the suffixes of the variants written.
+
+    Runs in worker processes, so it only deals with plain paths.
+    """
+    with open(path, "rb") as file:
+        content = file.read()
+
+    written = []
+    for encoding in encodings:
+        if encoding == "br":
+            compressed = brotli.compress(content, quality=11)
+        else:
+            compressed = gzip.compress(content, compresslevel=9, mtime=0)
+
+        suffix = ENCODINGS[encoding]
+        if len(compressed) >= len(content):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+            continue
+
+        with open(path + suffix, "wb") as file:
+            file.write(compressed)
+        written.append(suffix)
+
+    return written
+
+
+def compress_files(
+    root: Path,
+    names: Iterable[str],
+    *,
+    encodings: Iterable[str],
+    min_size: int = 256,
+    workers: int | None = None,
+) -> Iterable[Tuple[str, List[str]]]:
+    """
+    Compress the given files (relative to root) in a process pool, yielding
+    (name, suffixes written) for each file compressed.
+
+    The content hash of every compressed file is kept in a manifest in root,
+    and files whose content did not change since the previous run are skipped.
+    """
+    root = Path(root)
+    encodings = list(encodings)
+    manifest_path = root / COMPRESSION_MANIFEST
+    try:
+        previous = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        previous = {}
+
+    manifest = {}
+    pending = []
+    for name in names:
+        path = root / name
+        if path.suffix.lower() in SKIP_EXTENSIONS or not path.is_file():
+            continue
+        if path.stat().st_size < min_size:
+            continue
+
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        manifest[name] = {"hash": digest, "variants": []}
+        cached = previous.get(name)
+        if (
+            cached is not None
+            and cached["hash"] == digest
+            and all(Path(f"{path}{suffix}").exists() for suffix in cached["variants"])
+        ):
+            manifest[name] = cached
+            continue
+        pending.append(name)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                compress_file,
+                [str(root / name) for name in pending],
+                [encodings] * len(pending),
+                chunksize=8,
+            )
+            for name, suffixes in zip(pending, results):
+                manifest[name]["variants"] = suffixes
+                yield name, suffixes
+
+    manifest_path.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage that also writes gzip and brotli variants of
+    every hashed file during collectstatic, for
+    PrecompressedStaticFilesMiddleware (or a web server) to serve.
+
+    Configure with the STRUCTURED_STATIC_COMPRESSION setting:
+        ENCODINGS: Encodings to write, from "br" (requires the brotli
+            package) and "gzip". Default: both.
+        MIN_SIZE: Files smaller than this (in bytes) are not compressed.
+            Default: 256.
+        WORKERS: Size of the compression process pool. Default: CPU count.
+        MAX_AGE: Cache max-age of hashed files, in seconds. Default: 1 year.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        config = compression_settings()
+        names = sorted(set(self.hashed_files.values()))
+        for name, suffixes in compress_files(
+            Path(self.location),
+            names,
+            encodings=config["ENCODINGS"],
+            min_size=config["MIN_SIZE"],
+            workers=config["WORKERS"],
+        ):
+            for suffix in suffixes:
+                yield name, f"{name}{suffix}", True
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    encodings = {}
+    for part in header.split(","):
+        encoding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if encoding:
+            encodings[encoding.strip().lower()] = quality
+    return encodings
+
+
+class PrecompressedStaticFilesMiddleware:
+    """
+    Serve static files from STATIC_ROOT, preferring the precompressed variant
+    written by CompressedManifestStaticFilesStorage that the client accepts.
+
+    Files with a content hash in their name are served with far-future,
+    immutable cache headers. Requests for files that don't exist in
+    STATIC_ROOT are passed on unchanged.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.static_url = settings.STATIC_URL or ""
+        if self.static_url and not self.static_url.startswith(("/", "http")):
+            self.static_url = f"/{self.static_url}"
+        self.root = settings.STATIC_ROOT
+        self.max_age = compression_settings()["MAX_AGE"]
+
+    def __call__(self, request):
+        if (
+            self.root
+            and self.static_url.startswith("/")
+            and request.method in ("GET", "HEAD")
+            and request.path.startswith(self.static_url)
+        ):
+            response = self.serve(request, request.path[len(self.static_url) :])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    @cached_property
+    def hashed_names(self) -> Set[str]:
+        hashed_files = getattr(staticfiles_storage, "hashed_files", None) or {}
+        return set(hashed_files.values())
+
+    def serve(self, request, name: str):
+        try:
+            path = safe_join(self.root, name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        accepted = parse_accept_encoding(request.headers.get("Accept-Encoding", ""))
+        encoding = None
+        for candidate, suffix in ENCODINGS.items():
+            if accepted.get(candidate, 0) > 0 and os.path.isfile(path + suffix):
+                encoding = candidate
+                path = path + suffix
+                break
+
+        content_type, _ = mimetypes.guess_type(name)
+        response = FileResponse(
+            open(path, "rb"),
+            content_type=content_type or "application/octet-stream",
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        patch_vary_headers(response, ["Accept-Encoding"])
+
+        if name in self.hashed_names:
+            response.headers["Cache-Control"] = (
+                f"public, max-age={self.max_age}, immutable"
+            )
+        else:
+            response.headers["Cache-Control"] = "public, max-age=60"
+        return response
@@ -0,0 +1,206 @@
+"""
+Background tasks for Structured projects, with interchangeable backends:
+
+* "database": Tasks are stored in the database and run by
+  `manage.py runtasks`. Needs no extra service. Requires
+  "django_structured.tasks" in INSTALLED_APPS.
+* "celery": Tasks are Celery shared tasks, run by `manage.py runtasks`.
+* "rq": Tasks are enqueued to RQ on Redis, run by `manage.py runtasks`.
+* "eager": Tasks run immediately, in process. Meant for tests.
+
+Define tasks in the `tasks` package of an app:
+
+    from django_structured.tasks import task
+
+    @task(retries=5)
+    def send_welcome_email(user_id):
+        ...
+
+    send_welcome_email.enqueue(user.pk)
+"""
+
+import json
+from dataclasses import dataclass, field
+from datetime import timedelta
+from functools import update_wrapper
+from typing import Callable, Dict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+BACKENDS = ("database", "celery", "rq", "eager")
+
+# Every task defined with @task, by name
+registry: Dict[str, "Task"] = {}
+
+
+def tasks_settings() -> Dict:
+    options = {
+        "BACKEND": "database",
+        "QUEUES": ["default"],
+        "CONCURRENCY": 1,
+        "RETRIES": 3,
+        # Seconds before the first retry, doubled on every further retry
+        "RETRY_DELAY": 10,
+        # database backend: seconds between polls of an empty queue
+        "POLL_INTERVAL": 1.0,
+        # database backend: seconds after which a running task is considered
+        # lost with its worker, and queued again. Must exceed the longest task
+        "CLAIM_TIMEOUT": 3600,
+        # celery and rq backends
+        "BROKER_URL": "redis://localhost:6379/0",
+        # celery backend: dotted path to the project's Celery app
+        "CELERY_APP": None,
+    }
+    options.update(getattr(settings, "STRUCTURED_TASKS", {}))
+    if options["BACKEND"] not in BACKENDS:
+        raise ValueError(
+            f"Unknown STRUCTURED_TASKS backend {options['BACKEND']!r}, "
+            f"expected one of {BACKENDS}"
+        )
+    return options
+
+
+def retry_delay(delay: float, attempt: int) -> timedelta:
+    """
+    Return how long to wait before retrying a task that failed on the given
+    (1-based) attempt: exponential backoff from `delay` seconds.
+    """
+    return timedelta(seconds=delay * 2 ** (attempt - 1))
+
+
+@dataclass
+class Task:
+    """
+    A function that may be run in the background. Call it to run it in the
+    current process, or enqueue() it to have a worker run it.
+    """
+
+    func: Callable
+    queue: str = "default"
+    retries: int | None = None
+    retry_delay: float | None = None
+    name: str = field(init=False)
+
+    def __post_init__(self):
+        self.name = f"{self.func.__module__}.{self.func.__qualname__}"
+        update_wrapper(self, self.func)
+        self._celery_task = None
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def options(self) -> Dict:
+        options = tasks_settings()
+        if self.retries is not None:
+            options["RETRIES"] = self.retries
+        if self.retry_delay is not None:
+            options["RETRY_DELAY"] = self.retry_delay
+        return options
+
+    def enqueue(self, *args, **kwargs):
+        """
+        Have a worker run the task with the given arguments, which must be
+        JSON-serializable. Returns the backend's handle on the job (the
+        QueuedTask, Celery AsyncResult or RQ Job), or the result of the task
+        with the eager backend.
+        """
+        options = self.options()
+        backend = options["BACKEND"]
+
+        if backend == "eager":
+            # Catch arguments that a real backend couldn't serialize
+            json.dumps([args, kwargs])
+            return self.func(*args, **kwargs)
+
+        if backend == "database":
+            from .models import QueuedTask
+
+            return QueuedTask.objects.create(
+                name=self.name,
+                queue=self.queue,
+                args=list(args),
+                kwargs=kwargs,
+                max_attempts=options["RETRIES"] + 1,
+            )
+
+        if backend == "celery":
+            return self.celery_task(options).apply_async(args, kwargs, queue=self.queue)
+
+        if backend == "rq":
+            from rq import Retry
+
+            intervals = [
+                int(retry_delay(options["RETRY_DELAY"], attempt).total_seconds())
+                for attempt in range(1, options["RETRIES"] + 1)
+            ]
+            # enqueue_call, as enqueue() would take task arguments named like
+            # its own options (timeout, description, ...) for itself
+            return rq_queue(self.queue, options).enqueue_call(
+                self.func,
+                args=args,
+                kwargs=kwargs,
+                retry=(
+                    Retry(max=options["RETRIES"], interval=intervals)
+                    if intervals
+                    else None
+                ),
+            )
+
+    delay = enqueue
+
+    def celery_task(self, options: Dict | None = None):
+        """
+        Return the Celery task wrapping this task, registering it if needed.
+        """
+        if self._celery_task is None:
+            from celery import shared_task
+
+            options = options or self.options()
+            self._celery_task = shared_task(
+                name=self.name,
+                autoretry_for=(Exception,),
+                max_retries=options["RETRIES"],
+                retry_backoff=options["RETRY_DELAY"],
+                acks_late=True,
+            )(self.func)
+        return self._celery_task
+
+
+def task(func: Callable | None = None, **options):
+    """
+    Decorator turning a function into a Task.
+
+    Args:
+        queue (str): Queue to enqueue the task to. Default: "default".
+        retries (int): Number of times to retry a failing task. Default: the
+            RETRIES task setting.
+        retry_delay (float): Seconds before the first retry. Default: the
+            RETRY_DELAY task setting.
+    """
+
+    def decorator(func):
+        task = Task(func, **options)
+        registry[task.name] = task
+        return task
+
+    return decorator if func is None else decorator(func)
+
+
+def get_task(name: str) -> Task:
+    """
+    Return the task with the given name, importing it if needed.
+    """
+    if name not in registry:
+        obj = import_string(name)
+        if not isinstance(obj, Task):
+            raise TypeError(f"{name} is not a task")
+    return registry[name]
+
+
+def rq_queue(name: str, options: Dict | None = None):
+    from redis import Redis
+    from rq import Queue
+
+    options = options or tasks_settings()
+    return Queue(name, connection=Redis.from_url(options["BROKER_URL"]))
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class TasksConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "django_structured.tasks"
+    label = "structured_tasks"
+    verbose_name = "Background tasks"
@@ -0,0 +1,53 @@
+from django.db import models
+from django.utils import timezone
+
+
+class QueuedTask(models.Model):
+    """
+    A task enqueued with the database backend, waiting for a runtasks worker.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=255)
+    queue = models.CharField(max_length=100, default="default")
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=1)
+    run_after = models.DateTimeField(default=timezone.now)
+    created = models.DateTimeField(auto_now_add=True)
+    # When a worker last started running the task
+    claimed = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["run_after", "id"]
+        indexes = [
+            # Workers poll for the next runnable task of their queues
+            models.Index(
+                fields=["queue", "run_after"],
+                name="structured_task_ready_idx",
+                condition=models.Q(status="queued"),
+            ),
+            # Workers look for running tasks whose claim timed out
+            models.Index(
+                fields=["claimed"],
+                name="structured_task_running_idx",
+                condition=models.Q(status="running"),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
@@ -0,0 +1,58 @@
+from django import template
+
+from ..cache import get_or_compute, make_key
+
+register = template.Library()
+
+
+class CacheFragmentNode(template.Node):
+    def __init__(self, nodelist, timeout, name, vary_on):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        timeout = self.timeout.resolve(context)
+        try:
+            timeout = float(timeout)
+        except (TypeError, ValueError):
+            raise template.TemplateSyntaxError(
+                f"cachefragment timeout must be a number, got {timeout!r}"
+            )
+        parts = [var.resolve(context) for var in self.vary_on]
+        return get_or_compute(
+            make_key("fragment", self.name, *parts),
+            lambda: self.nodelist.render(context),
+            timeout,
+            name=f"fragment:{self.name}",
+        )
+
+
+@register.tag
+def cachefragment(parser, token):
+    """
+    Cache the contents of the block, with stampede protection (see
+    django_structured.cache). Usage:
+
+        {% load structured_cache %}
+        {% cachefragment 300 sidebar request.user.pk %}
+            ...
+        {% endcachefragment %}
+
+    The first argument is the timeout in seconds, the second the fragment's
+    name, and any further variables are part of the cache key.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"{bits[0]} tag requires a timeout and a fragment name"
+        )
+    nodelist = parser.parse((f"end{bits[0]}",))
+    parser.delete_first_token()
+    return CacheFragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        bits[2],
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
@@ -0,0 +1,174 @@
+import contextvars
+import logging
+from functools import wraps
+from typing import Iterable, List
+
+from asgiref import sync
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
+from django.http import Http404, JsonResponse
+from django.views import View
+
+log = logging.getLogger(__name__)
+
+# Modules whose sync_to_async hops are expected: the async ORM API (aget,
+# acount, aiterator, ... of querysets, asave, adelete, ... of models) is
+# implemented with sync_to_async.
+EXPECTED_HOP_MODULES = ("django.db.models.query", "django.db.models.base")
+
+_hops: contextvars.ContextVar[List[str] | None] = contextvars.ContextVar(
+    "django_structured_sync_hops", default=None
+)
+_original_sync_to_async_call = None
+
+
+class SyncHopError(RuntimeError):
+    pass
+
+
+def _describe(func) -> str:
+    func = getattr(func, "func", func)
+    module = getattr(func, "__module__", None) or "?"
+    name = getattr(func, "__qualname__", None) or repr(func)
+    return f"{module}.{name}"
+
+
+def _install_hop_counter():
+    """
+    Wrap asgiref's SyncToAsync.__call__ (once per process) to record hops
+    made while a sync_hop_budget view is running. Outside of such views the
+    wrapper only costs a context variable lookup.
+    """
+    global _original_sync_to_async_call
+    if _original_sync_to_async_call is not None:
+        return
+
+    _original_sync_to_async_call = original = sync.SyncToAsync.__call__
+
+    @wraps(original)
+    def __call__(self, *args, **kwargs):
+        hops = _hops.get()
+        if hops is not None:
+            hops.append(_describe(self.func))
+        return original(self, *args, **kwargs)
+
+    sync.SyncToAsync.__call__ = __call__
+
+
+def sync_hop_budget(
+    max_hops: int = 0,
+    *,
+    strict: bool | None = None,
+    ignore: Iterable[str] = EXPECTED_HOP_MODULES,
+):
+    """
+    Decorator for async views (or view methods) flagging hidden sync_to_async
+    hops, each of which hands the request to a thread pool and back.
+
+    Hops into the modules listed in `ignore` (by default, the async ORM API)
+    are not counted. If more than `max_hops` other hops happen while the view
+    runs, SyncHopError is raised when `strict` (default: settings.DEBUG),
+    otherwise a warning is logged.
+
+    Usage:
+        @sync_hop_budget()
+        async def item_detail(request, pk):
+            ...
+    """
+    ignore = tuple(ignore)
+
+    def decorator(view):
+        _install_hop_counter()
+
+        @wraps(view)
+        async def wrapper(*args, **kwargs):
+            token = _hops.set([])
+            try:
+                response = await view(*args, **kwargs)
+                hops = _hops.get()
+            finally:
+                _hops.reset(token)
+
+            unexpected = [hop for hop in hops if not hop.startswith(ignore)]
+            if len(unexpected) > max_hops:
+                message = (
+                    f"{_describe(view)} made {len(unexpected)} sync_to_async "
+                    f"hop(s) (budget: {max_hops}): {', '.join(unexpected)}"
+                )
+                if settings.DEBUG if strict is None else strict:
+                    raise SyncHopError(message)
+                log.warning(message)
+
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+class AsyncQuerySetMixin:
+    """
+    Shared configuration for the async model views. Only the given `fields`
+    are fetched, as dictionaries, so that no related object or deferred field
+    can trigger a synchronous query while rendering.
+    """
+
+    model = None
+    queryset = None
+    fields: Iterable[str] = ()
+
+    def get_queryset(self):
+        if self.queryset is not None:
+            queryset = self.queryset.all()
+        elif self.model is not None:
+            queryset = self.model._default_manager.all()
+        else:
+            raise ImproperlyConfigured(
+                f"{type(self).__name__} is missing a queryset or model."
+            )
+        return queryset.values(*self.fields)
+
+
+class AsyncModelListView(AsyncQuerySetMixin, View):
+    """
+    Paginated JSON list of model instances, using acount() and aiterator().
+    Querysets without an ordering are ordered by primary key, so that pages
+    don't overlap.
+    """
+
+    paginate_by = 50
+    chunk_size = 100
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        if not queryset.ordered:
+            queryset = queryset.order_by("pk")
+        try:
+            page = max(int(request.GET.get("page", 1)), 1)
+        except ValueError:
+            page = 1
+        start = (page - 1) * self.paginate_by
+
+        count = await queryset.acount()
+        results = [
+            row
+            async for row in queryset[start : start + self.paginate_by].aiterator(
+                chunk_size=self.chunk_size
+            )
+        ]
+        return JsonResponse({"count": count, "page": page, "results": results})
+
+
+class AsyncModelDetailView(AsyncQuerySetMixin, View):
+    """
+    JSON detail of a model instance, using aget().
+    """
+
+    pk_url_kwarg = "pk"
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            obj = await self.get_queryset().aget(pk=kwargs[self.pk_url_kwarg])
+        except ObjectDoesNotExist:
+            raise Http404
+        return JsonResponse(obj)
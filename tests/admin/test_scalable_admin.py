@@ -0,0 +1,121 @@
+import pytest
+
+
+@pytest.fixture
+def models(django_settings):
+    django_settings(
+        INSTALLED_APPS=[
+            "django.contrib.admin",
+            "django.contrib.auth",
+            "django.contrib.contenttypes",
+            "django.contrib.messages",
+            "django.contrib.sessions",
+            "django_structured",
+        ],
+        STRUCTURED_ADMIN={"RAW_ID_THRESHOLD": 2, "ESTIMATE_COUNT_THRESHOLD": 10},
+    )
+    from types import SimpleNamespace
+
+    from django.db import connection, models
+
+    from django_structured import admin
+
+    class Author(models.Model):
+        name = models.CharField(max_length=100)
+
+        class Meta:
+            app_label = "django_structured"
+
+    class Book(models.Model):
+        title = models.CharField(max_length=100)
+        author = models.ForeignKey(Author, on_delete=models.CASCADE)
+
+        class Meta:
+            app_label = "django_structured"
+
+    class Base(models.Model):
+        class Meta:
+            abstract = True
+            app_label = "django_structured"
+
+    with connection.schema_editor() as editor:
+        editor.create_model(Author)
+        editor.create_model(Book)
+
+    admin._large_tables.clear()
+    yield SimpleNamespace(Author=Author, Book=Book, Base=Base)
+    admin._large_tables.clear()
+
+
+def test_autoregister(models):
+    from django.contrib.admin import AdminSite
+    from django.contrib.auth.models import User
+
+    from django_structured.admin import ScalableModelAdmin, autoregister
+
+    site = AdminSite()
+    site.register(models.Author)
+    registered = autoregister(
+        [models.Author, models.Book, models.Base, User],
+        app_label="django_structured",
+        site=site,
+    )
+
+    assert registered == [models.Book]
+    assert isinstance(site._registry[models.Book], ScalableModelAdmin)
+
+
+def test_list_select_related(models):
+    from django.contrib.admin import AdminSite
+
+    from django_structured.admin import ScalableModelAdmin
+
+    class BookAdmin(ScalableModelAdmin):
+        list_display = ["title", "author", "__str__"]
+
+    model_admin = BookAdmin(models.Book, AdminSite())
+
+    assert model_admin.get_list_select_related(None) == ["author"]
+
+
+def test_raw_id_widget_for_large_tables(models):
+    from django.contrib.admin import AdminSite
+    from django.contrib.admin.widgets import ForeignKeyRawIdWidget
+
+    from django_structured.admin import ScalableModelAdmin, _large_tables
+
+    model_admin = ScalableModelAdmin(models.Book, AdminSite())
+    author_field = models.Book._meta.get_field("author")
+
+    formfield = model_admin.formfield_for_foreignkey(author_field, None)
+    assert not isinstance(formfield.widget, ForeignKeyRawIdWidget)
+
+    # Table sizes are checked once per process
+    models.Author.objects.bulk_create(models.Author(name=str(i)) for i in range(3))
+    formfield = model_admin.formfield_for_foreignkey(author_field, None)
+    assert not isinstance(formfield.widget, ForeignKeyRawIdWidget)
+
+    _large_tables.clear()
+    formfield = model_admin.formfield_for_foreignkey(author_field, None)
+    assert isinstance(formfield.widget, ForeignKeyRawIdWidget)
+
+
+def test_paginator_uses_statistics(models):
+    from django.db import connection
+
+    from django_structured.admin import EstimatedCountPaginator
+
+    models.Author.objects.bulk_create(models.Author(name=str(i)) for i in range(3))
+    queryset = models.Author.objects.order_by("pk")
+    assert EstimatedCountPaginator(queryset, 2).count == 3
+
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+        cursor.execute(
+            "UPDATE sqlite_stat1 SET stat = '5000' WHERE tbl = %s",
+            [models.Author._meta.db_table],
+        )
+
+    assert EstimatedCountPaginator(queryset, 2).count == 5000
+    filtered = queryset.filter(name="1")
+    assert EstimatedCountPaginator(filtered, 2).count == 1
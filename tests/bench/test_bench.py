@@ -0,0 +1,113 @@
+import pytest
+
+from django_structured.bench import compare
+
+
+@pytest.fixture
+def config(django_settings):
+    from django_structured.bench import BenchConfig, BenchRequest
+
+    django_settings(ROOT_URLCONF=__name__, ALLOWED_HOSTS=["localhost"])
+
+    def _config(**options):
+        return BenchConfig(
+            requests=[
+                BenchRequest("/items/?page=2"),
+                BenchRequest("/items/3/"),
+                BenchRequest.from_dict(
+                    {"method": "POST", "path": "/items/", "json": {"name": "x"}}
+                ),
+            ],
+            threads=2,
+            iterations=5,
+            duration=None,
+            **options,
+        )
+
+    return _config
+
+
+@pytest.mark.parametrize(
+    "app",
+    ["django.core.wsgi.get_wsgi_application", "django.core.asgi.get_asgi_application"],
+)
+def test_run(config, mocker, app):
+    from django.utils.module_loading import import_string
+
+    from django_structured import bench
+
+    interface = "asgi" if "asgi" in app else "wsgi"
+    mocker.patch.object(bench, "load_application", return_value=import_string(app)())
+
+    results = bench.run(config(interface=interface))
+
+    assert results["errors"] == []
+    assert set(results["routes"]) == {"/items/", "/items/<int:pk>/"}
+    items = results["routes"]["/items/"]
+    assert items["requests"] == 20
+    assert items["failures"] == 0
+    assert items["queries_per_request"] == 1
+    assert results["routes"]["/items/<int:pk>/"]["queries_per_request"] == 2
+    assert results["total"]["p50_ms"] <= results["total"]["p99_ms"]
+    assert "\n" in bench.format_results(results)
+
+
+def test_capture_queries(config, mocker):
+    from django.core.wsgi import get_wsgi_application
+
+    from django_structured import bench
+
+    mocker.patch.object(bench, "load_application", return_value=get_wsgi_application())
+
+    results = bench.run(config(capture_queries=True))
+
+    # 20 requests to /items/ and 10 to /items/3/, not counting the warmup
+    assert [(query["shape"], query["count"]) for query in results["queries"]] == [
+        ("SELECT ?", 40)
+    ]
+
+
+def test_compare():
+    def results(p95, queries):
+        stats = {"p95_ms": p95, "queries_per_request": queries}
+        return {"routes": {"/items/": stats}, "total": stats}
+
+    assert compare(results(10.5, 2), results(10, 2), max_regression=10) == []
+    assert compare(results(12, 3), results(10, 2), max_regression=10) == [
+        "/items/: p95_ms 10.00 -> 12.00 (+20%)",
+        "/items/: queries_per_request 2.00 -> 3.00 (+50%)",
+        "total: p95_ms 10.00 -> 12.00 (+20%)",
+        "total: queries_per_request 2.00 -> 3.00 (+50%)",
+    ]
+
+
+def query(count):
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        for _ in range(count):
+            cursor.execute("SELECT 1")
+
+
+def items(request):
+    from django.http import JsonResponse
+
+    query(1)
+    return JsonResponse({"method": request.method, "body": request.body.decode()})
+
+
+def item(request, pk):
+    from django.http import JsonResponse
+
+    query(2)
+    return JsonResponse({"pk": pk})
+
+
+def __getattr__(name):
+    # ROOT_URLCONF for the tests above, built once Django is configured
+    if name == "urlpatterns":
+        from django.urls import path
+        from django.views.decorators.csrf import csrf_exempt
+
+        return [path("items/", csrf_exempt(items)), path("items/<int:pk>/", item)]
+    raise AttributeError(name)
@@ -0,0 +1,176 @@
+import json
+import os
+import subprocess
+import sys
+import textwrap
+import zipfile
+
+import pytest
+
+from django_structured.bundle import build, count_syscalls, main
+
+SUFFIX = ".cpython-311-x86_64-linux-gnu.so"
+
+
+def write(root, files):
+    for name, source in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(textwrap.dedent(source))
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    write(
+        root,
+        {
+            "manage.py": """
+                import json
+                import os
+                import sys
+
+
+                def main():
+                    import proj
+                    import purelib
+
+                    loaded = sorted(name for name in sys.modules if name[:5] == "proj.")
+                    print(json.dumps({
+                        "argv": sys.argv[1:],
+                        "proj": proj.__file__,
+                        "purelib": purelib.__file__,
+                        "loaded": loaded,
+                    }))
+            """,
+            "proj/__init__.py": """
+                from django_structured.project_utils import load_modules
+
+                load_modules(__name__, recursive=True)
+            """,
+            "proj/a.py": "A = 1",
+            "proj/sub/__init__.py": "",
+            "proj/sub/b.py": "B = 2",
+            "proj/templates/index.html": "<html></html>",
+            "proj/management/__init__.py": "",
+            "proj/management/commands/__init__.py": "",
+            "proj/management/commands/hello.py": "",
+            "proj/__pycache__/a.cpython-311.pyc": "stale",
+            "tests/test_proj.py": "",
+        },
+    )
+    site = tmp_path / "site"
+    write(
+        site,
+        {
+            "purelib/__init__.py": "VALUE = 1",
+            "purelib-1.0.dist-info/METADATA": "Name: purelib",
+            "nativelib/__init__.py": "",
+            f"nativelib/_speedups{SUFFIX}": "",
+            "pip/__init__.py": "",
+            "distutils-precedence.pth": "",
+        },
+    )
+    return root
+
+
+def test_build(project, tmp_path):
+    output = tmp_path / "project.pyz"
+
+    results = build(project, output, site_packages=[tmp_path / "site"])
+
+    assert results["native"] == ["nativelib"]
+    assert results["failed"] == []
+    assert os.access(output, os.X_OK)
+    assert output.read_bytes().startswith(b"#!/usr/bin/env python3\n")
+    with zipfile.ZipFile(output) as archive:
+        names = set(archive.namelist())
+        extract = archive.read("_bundle/extract").decode().splitlines()
+    assert {
+        "__main__.py",
+        "__main__.pyc",
+        "manage.py",
+        "manage.pyc",
+        "proj/__init__.pyc",
+        "proj/sub/b.py",
+        "proj/sub/b.pyc",
+        "purelib/__init__.pyc",
+        "purelib-1.0.dist-info/METADATA",
+        f"_native/nativelib/_speedups{SUFFIX}",
+        "_native/nativelib/__init__.py",
+    } <= names
+    assert not any("__pycache__" in name or name.startswith("pip/") for name in names)
+    assert "distutils-precedence.pth" not in names
+    assert "tests/test_proj.py" not in names
+    assert "proj/templates/index.html" in extract
+    assert "proj/management/commands/hello.pyc" in extract
+    assert "proj/management/commands/hello.py" not in extract
+    assert f"_native/nativelib/_speedups{SUFFIX}" in extract
+
+
+@pytest.mark.parametrize("source", [True, False])
+def test_run(project, tmp_path, source):
+    output = tmp_path / "project.pyz"
+    cache = tmp_path / "cache"
+    package_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+    build(project, output, site_packages=[tmp_path / "site"], keep_source=source)
+    # Bundle django_structured as it would be installed
+    with zipfile.ZipFile(output, "a") as archive:
+        for path in sorted(
+            os.path.join(directory, name)
+            for directory, _, names in os.walk(
+                os.path.join(package_root, "django_structured")
+            )
+            for name in names
+            if name.endswith(".py")
+        ):
+            archive.write(path, os.path.relpath(path, package_root))
+
+    process = subprocess.run(
+        [sys.executable, "-S", str(output), "check"],
+        cwd=tmp_path,
+        env={**os.environ, "STRUCTURED_BUNDLE_CACHE": str(cache)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    ran = json.loads(process.stdout)
+
+    assert ran["argv"] == ["check"]
+    assert ran["proj"] == os.path.join(str(output), "proj", "__init__.pyc")
+    assert ran["purelib"] == os.path.join(str(output), "purelib", "__init__.pyc")
+    assert ran["loaded"] == [
+        "proj.a",
+        "proj.management",
+        "proj.management.commands",
+        "proj.management.commands.hello",
+        "proj.sub",
+        "proj.sub.b",
+    ]
+    (extracted,) = cache.iterdir()
+    assert (extracted / "proj/templates/index.html").is_file()
+    assert (extracted / f"_native/nativelib/_speedups{SUFFIX}").is_file()
+
+
+def test_main(project, tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(project)
+
+    assert main(["--output", str(tmp_path / "out.pyz")]) == 0
+    assert "Wrote" in capsys.readouterr().out
+    with pytest.raises(SystemExit):
+        main(["--main", "missing:main"])
+
+
+def test_count_syscalls():
+    summary = textwrap.dedent(
+        """\
+        % time     seconds  usecs/call     calls    errors syscall
+        ------ ----------- ----------- --------- --------- ----------------
+         40.00    0.000400           2       200        50 newfstatat
+         30.00    0.000300           3       100           openat
+         30.00    0.000300           1       300           read
+        ------ ----------- ----------- --------- --------- ----------------
+        100.00    0.001000           1       600        50 total
+        """
+    )
+    assert count_syscalls(summary) == {"syscalls": 600, "file_syscalls": 300}
@@ -0,0 +1,202 @@
+import time
+
+import pytest
+
+from django_structured.cache import Entry, should_recompute
+
+
+@pytest.fixture
+def profile(django_settings):
+    from django_structured import profiling
+
+    django_settings(
+        STRUCTURED_CACHE={"BETA": 0, "LOCK_WAIT": 0.1},
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+    )
+    profile = profiling.Profile()
+    token = profiling._current.set(profile)
+    yield profile
+    profiling._current.reset(token)
+
+
+def test_should_recompute():
+    now = time.time()
+
+    assert should_recompute(Entry(None, 1.0, now - 1), beta=1.0, now=now)
+    assert not should_recompute(Entry(None, 0.001, now + 60), beta=1.0, now=now)
+    assert not should_recompute(Entry(None, 1.0, now + 1), beta=0, now=now)
+
+
+def test_get_or_compute(profile):
+    from django_structured.cache import get_or_compute
+
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "value"
+
+    assert get_or_compute("key", compute, 60) == "value"
+    assert get_or_compute("key", compute, 60) == "value"
+    assert len(calls) == 1
+    assert profile.metrics["cache-miss"].count == 1
+    assert profile.metrics["cache-hit"].count == 1
+    assert profile.metrics["cache-recompute"].description == "key"
+
+
+def test_locked_key_serves_stale_value(profile):
+    from django.core.cache import cache
+
+    from django_structured.cache import get_or_compute
+
+    cache.set("key", Entry("stale", 1.0, time.time() - 1))
+    cache.add("key:lock", 1)
+
+    assert get_or_compute("key", lambda: "fresh", 60, beta=1.0) == "stale"
+    # Without a value to serve, it waits for the lock, then computes anyway
+    cache.delete("key")
+    assert get_or_compute("key", lambda: "fresh", 60) == "fresh"
+
+
+def test_lock_released_by_owner_only(profile):
+    from django.core.cache import cache
+
+    from django_structured.cache import get_or_compute
+
+    def compute():
+        # The lock expires during a slow computation, another process takes it
+        cache.delete("key:lock")
+        cache.add("key:lock", "other")
+        return "value"
+
+    assert get_or_compute("key", compute, 60) == "value"
+    assert cache.get("key:lock") == "other"
+
+    cache.delete_many(["key", "key:lock"])
+    assert get_or_compute("key", lambda: "value", 60) == "value"
+    assert cache.get("key:lock") is None
+
+
+def test_cached_async(profile):
+    import asyncio
+
+    from django_structured.cache import cached
+
+    calls = []
+
+    @cached(60)
+    async def fragment(pk):
+        calls.append(pk)
+        return f"<li>{pk}</li>"
+
+    async def main():
+        return [await fragment(1), await fragment(1), await fragment(2)]
+
+    assert asyncio.run(main()) == ["<li>1</li>", "<li>1</li>", "<li>2</li>"]
+    assert calls == [1, 2]
+
+
+def test_cache_view(profile):
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+
+    from django_structured.cache import cache_view
+
+    calls = []
+
+    @cache_view(60, vary_on_headers=["Accept-Language"])
+    def view(request):
+        calls.append(request.method)
+        return HttpResponse(f"{len(calls)}")
+
+    factory = RequestFactory()
+    first = view(factory.get("/items/", HTTP_ACCEPT_LANGUAGE="en"))
+    second = view(factory.get("/items/", HTTP_ACCEPT_LANGUAGE="en"))
+    other = view(factory.get("/items/", HTTP_ACCEPT_LANGUAGE="fr"))
+    view(factory.post("/items/"))
+
+    assert first.content == second.content == b"1"
+    assert other.content == b"2"
+    assert calls == ["GET", "GET", "POST"]
+    assert second["Vary"] == "Accept-Language"
+
+
+def set_cookie(request, response):
+    response.set_cookie("seen", "1")
+
+
+def set_private(request, response):
+    response["Cache-Control"] = "private"
+
+
+def set_no_store(request, response):
+    response["Cache-Control"] = "no-store"
+
+
+def vary_on_cookie(request, response):
+    response["Vary"] = "Cookie"
+
+
+def render_csrf_token(request, response):
+    from django.middleware.csrf import get_token
+
+    response.content = get_token(request)
+
+
+def read_session(request, response):
+    response.content = request.session.get("cart", "")
+
+
+@pytest.mark.parametrize(
+    "personalize",
+    [
+        set_cookie,
+        set_private,
+        set_no_store,
+        vary_on_cookie,
+        render_csrf_token,
+        read_session,
+    ],
+)
+def test_cache_view_skips_client_specific(profile, personalize):
+    from django.contrib.sessions.backends.signed_cookies import SessionStore
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+
+    from django_structured.cache import cache_view
+
+    calls = []
+
+    @cache_view(60)
+    def view(request):
+        calls.append(1)
+        response = HttpResponse("page")
+        personalize(request, response)
+        return response
+
+    for _ in range(2):
+        request = RequestFactory().get("/items/")
+        request.session = SessionStore()
+        view(request)
+
+    assert len(calls) == 2
+
+
+def test_cachefragment_tag(profile):
+    from django.template import Context, Engine
+
+    engine = Engine(
+        libraries={
+            "structured_cache": "django_structured.templatetags.structured_cache"
+        }
+    )
+    template = engine.from_string(
+        "{% load structured_cache %}"
+        "{% cachefragment 60 items pk %}{{ value }}{% endcachefragment %}"
+    )
+
+    assert template.render(Context({"pk": 1, "value": "a"})) == "a"
+    assert template.render(Context({"pk": 1, "value": "b"})) == "a"
+    assert template.render(Context({"pk": 2, "value": "c"})) == "c"
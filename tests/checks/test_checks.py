@@ -0,0 +1,98 @@
+import pytest
+
+
+@pytest.fixture
+def run_checks(django_settings):
+    from django.core import checks as django_checks
+
+    from django_structured import checks
+
+    def _run_checks(**options):
+        django_settings(**options)
+        checks.register()
+        return {
+            message.id: message
+            for message in django_checks.run_checks(
+                tags=["performance"], include_deployment_checks=True
+            )
+        }
+
+    return _run_checks
+
+
+def test_generated_defaults(run_checks):
+    messages = run_checks(
+        DEBUG=True,
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+        DATABASES={
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"},
+            "replica": {"ENGINE": "django.db.backends.postgresql", "NAME": "app"},
+        },
+        TEMPLATES=[
+            {
+                "BACKEND": "django.template.backends.django.DjangoTemplates",
+                "OPTIONS": {"loaders": ["django.template.loaders.filesystem.Loader"]},
+            }
+        ],
+    )
+
+    assert set(messages) == {
+        "structured.E001",
+        "structured.W001",
+        "structured.W002",
+        "structured.W003",
+    }
+    assert messages["structured.E001"].is_serious()
+    assert messages["structured.E001"].impact == "high"
+    assert messages["structured.W002"].msg.startswith("Database 'replica'")
+    assert messages["structured.W003"].hint.endswith("Estimated impact: medium.")
+
+
+def test_tuned_settings(run_checks):
+    messages = run_checks(
+        DEBUG=False,
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}},
+        DATABASES={
+            "default": {
+                "ENGINE": "django.db.backends.postgresql",
+                "NAME": "app",
+                "CONN_MAX_AGE": 60,
+            },
+        },
+        TEMPLATES=[
+            {
+                "BACKEND": "django.template.backends.django.DjangoTemplates",
+                "OPTIONS": {
+                    "loaders": [
+                        (
+                            "django.template.loaders.cached.Loader",
+                            ["django.template.loaders.filesystem.Loader"],
+                        )
+                    ]
+                },
+            }
+        ],
+    )
+
+    assert messages == {}
+
+
+def test_custom_rule(run_checks):
+    from django_structured import checks
+
+    @checks.performance_rule("tests.W001", impact="low", hint="Use Redis.")
+    def check_session_engine(settings):
+        if settings.SESSION_ENGINE == "django.contrib.sessions.backends.db":
+            return "Sessions are stored in the database."
+
+    try:
+        messages = run_checks(DEBUG=False)
+    finally:
+        del checks.rules["tests.W001"]
+
+    assert messages["tests.W001"].hint == "Use Redis. Estimated impact: low."
+
+    with pytest.raises(ValueError):
+        checks.performance_rule("tests.W002", impact="huge")
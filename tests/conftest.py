@@ -0,0 +1,70 @@
+import sys
+
+import pytest
+
+pytest_plugins = ["pytester"]
+
+LIBRARIES = ("django.", "django_structured.")
+
+
+def reset_django():
+    """
+    Undo settings.configure() and django.setup(), so that the next test may
+    configure Django differently.
+    """
+    from django.apps import apps
+    from django.conf import settings
+    from django.core.cache import caches
+    from django.db import connections
+    from django.template import engines
+    from django.utils.functional import empty
+
+    connections.close_all()
+    for handler in (caches, connections, engines):
+        handler.__dict__.pop("settings", None)
+        handler.__dict__.pop("templates", None)
+        handler.__init__()
+
+    settings._wrapped = empty
+    apps.app_configs = {}
+    # Keep models of library modules, which stay imported (and so won't
+    # register their models again). Forget models defined by tests.
+    for app_models in apps.all_models.values():
+        for name, model in list(app_models.items()):
+            module = model.__module__
+            if module not in sys.modules or not module.startswith(LIBRARIES):
+                del app_models[name]
+    apps.apps_ready = apps.models_ready = apps.loading = apps.ready = False
+    apps.clear_cache()
+
+
+@pytest.fixture
+def django_settings():
+    """
+    Factory fixture configuring Django with the given settings. Django is reset
+    when the test finishes.
+
+    Usage:
+        def test_something(django_settings):
+            settings = django_settings(INSTALLED_APPS=["django_structured"])
+    """
+    pytest.importorskip("django")
+    import django
+    from django.conf import settings
+
+    def _configure(**options):
+        if settings.configured:
+            reset_django()
+        options.setdefault("INSTALLED_APPS", ["django_structured"])
+        options.setdefault(
+            "DATABASES",
+            {"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}},
+        )
+        settings.configure(**options)
+        django.setup()
+        return settings
+
+    yield _configure
+
+    if settings.configured:
+        reset_django()
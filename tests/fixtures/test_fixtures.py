@@ -0,0 +1,173 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def models(django_settings):
+    django_settings()
+    from types import SimpleNamespace
+
+    from django.db import connection, models
+
+    class Tag(models.Model):
+        name = models.CharField(max_length=100)
+
+        class Meta:
+            app_label = "django_structured"
+
+    class Author(models.Model):
+        name = models.CharField(max_length=100)
+
+        class Meta:
+            app_label = "django_structured"
+
+    class Book(models.Model):
+        title = models.CharField(max_length=100)
+        author = models.ForeignKey(Author, on_delete=models.CASCADE)
+        tags = models.ManyToManyField(Tag)
+
+        class Meta:
+            app_label = "django_structured"
+
+    with connection.schema_editor() as editor:
+        for model in (Tag, Author, Book):
+            editor.create_model(model)
+    return SimpleNamespace(Tag=Tag, Author=Author, Book=Book)
+
+
+@pytest.fixture
+def fixture_file(models, tmp_path):
+    path = tmp_path / "library.json"
+    # Books come before the authors they depend on
+    path.write_text(
+        json.dumps(
+            [
+                {
+                    "model": "django_structured.book",
+                    "pk": pk,
+                    "fields": {"title": f"Book {pk}", "author": 1, "tags": [1, 2]},
+                }
+                for pk in range(1, 4)
+            ]
+            + [
+                {"model": "django_structured.author", "pk": 1, "fields": {"name": "A"}},
+                {"model": "django_structured.tag", "pk": 1, "fields": {"name": "x"}},
+                {"model": "django_structured.tag", "pk": 2, "fields": {"name": "y"}},
+            ]
+        )
+    )
+    return path
+
+
+def test_sort_models(models):
+    from django_structured.fixtures import sort_models
+
+    ordered = sort_models([models.Book, models.Author, models.Tag])
+
+    assert ordered.index(models.Author) < ordered.index(models.Book)
+    assert ordered.index(models.Tag) < ordered.index(models.Book)
+
+
+def test_sort_models_defined_before_dependencies(django_settings):
+    django_settings()
+    from django.db import models
+
+    from django_structured.fixtures import sort_models
+
+    class Chapter(models.Model):
+        volume = models.ForeignKey("Volume", on_delete=models.CASCADE)
+
+        class Meta:
+            app_label = "django_structured"
+
+    class Volume(models.Model):
+        class Meta:
+            app_label = "django_structured"
+
+    class Anthology(Volume):
+        editor = models.OneToOneField("Editor", on_delete=models.CASCADE)
+
+        class Meta:
+            app_label = "django_structured"
+
+    class Editor(models.Model):
+        class Meta:
+            app_label = "django_structured"
+
+    assert sort_models([Anthology, Chapter, Editor, Volume]) == [
+        Volume,
+        Chapter,
+        Editor,
+        Anthology,
+    ]
+
+
+@pytest.mark.parametrize("signals", [True, False])
+def test_load_fixtures(models, fixture_file, signals):
+    from django.db.models.signals import post_save
+
+    from django_structured.fixtures import load_fixtures
+    from django_structured.queries import QueryCollector
+
+    received = []
+
+    def receiver(sender, instance, raw, **kwargs):
+        received.append((sender, raw))
+
+    post_save.connect(receiver)
+    try:
+        with QueryCollector() as collector:
+            assert load_fixtures(str(fixture_file), signals=signals) == 6
+    finally:
+        post_save.disconnect(receiver)
+
+    assert models.Book.objects.count() == 3
+    assert set(models.Book.objects.get(pk=2).tags.values_list("name", flat=True)) == {
+        "x",
+        "y",
+    }
+    # One insert per model and one for the many-to-many relations
+    inserts = [query for query in collector if query.sql.startswith("INSERT")]
+    assert len(inserts) == 4
+    if signals:
+        assert len(received) == 6
+        assert all(raw for _, raw in received)
+    else:
+        assert received == []
+
+
+@pytest.mark.parametrize("upsert", [True, False])
+def test_load_fixtures_updates_existing(models, fixture_file, mocker, upsert):
+    from django_structured import fixtures
+
+    mocker.patch.object(fixtures, "supports_upsert", return_value=upsert)
+    fixtures.load_fixtures(str(fixture_file))
+    data = json.loads(fixture_file.read_text())
+    for obj in data:
+        if obj["model"] == "django_structured.book":
+            obj["fields"]["title"] += " (2nd edition)"
+            obj["fields"]["tags"] = [2]
+    data.append({"model": "django_structured.tag", "pk": 3, "fields": {"name": "z"}})
+    fixture_file.write_text(json.dumps(data))
+
+    assert fixtures.load_fixtures(str(fixture_file)) == 7
+
+    assert models.Tag.objects.count() == 3
+    assert models.Book.objects.get(pk=1).title == "Book 1 (2nd edition)"
+    assert list(models.Book.objects.get(pk=1).tags.values_list("pk", flat=True)) == [2]
+
+
+def test_bulkloaddata_command(models, fixture_file):
+    from io import StringIO
+
+    from django.core.management import CommandError, call_command
+
+    stdout = StringIO()
+    call_command("bulkloaddata", str(fixture_file.parent), stdout=stdout)
+
+    assert "Installed 6 object(s) from 1 fixture(s)" in stdout.getvalue()
+    assert models.Author.objects.get().name == "A"
+
+    with pytest.raises(CommandError):
+        call_command("bulkloaddata", "missing")
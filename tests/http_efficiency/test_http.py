@@ -0,0 +1,214 @@
+import gzip
+import zlib
+
+import pytest
+from django.http import HttpResponse, StreamingHttpResponse
+from django.urls import path
+from django.views.decorators.cache import cache_control
+
+PAGE = "<p>Hello, world</p>\n" * 100
+
+
+def page(request):
+    return HttpResponse(PAGE)
+
+
+def tiny(request):
+    return HttpResponse("<p>Hi</p>")
+
+
+def image(request):
+    return HttpResponse(b"\x89PNG" * 1000, content_type="image/png")
+
+
+def stream(request):
+    return StreamingHttpResponse(line.encode() for line in PAGE.splitlines(True))
+
+
+async def astream(request):
+    async def lines():
+        for line in PAGE.splitlines(True):
+            yield line.encode()
+
+    return StreamingHttpResponse(lines())
+
+
+@cache_control(max_age=3600, public=True)
+def cached(request):
+    return HttpResponse(PAGE)
+
+
+urlpatterns = [
+    path("page/", page, name="page"),
+    path("public/", page, name="public"),
+    path("tiny/", tiny),
+    path("image/", image),
+    path("stream/", stream),
+    path("astream/", astream),
+    path("cached/", cached),
+]
+
+
+@pytest.fixture
+def client(django_settings):
+    from django.test import Client
+    from django.urls import clear_url_caches
+
+    django_settings(
+        ROOT_URLCONF=__name__,
+        ALLOWED_HOSTS=["testserver"],
+        MIDDLEWARE=[
+            "django_structured.http.CompressionMiddleware",
+            "django.middleware.http.ConditionalGetMiddleware",
+            "django_structured.http.CacheControlMiddleware",
+        ],
+        STRUCTURED_HTTP={
+            "ENCODINGS": ["gzip"],
+            "VIEW_CACHE_CONTROL": {"public": {"public": True, "max_age": 60}},
+        },
+    )
+    clear_url_caches()
+    yield Client()
+    clear_url_caches()
+
+
+def test_compresses_accepted_encoding(client):
+    response = client.get("/page/", HTTP_ACCEPT_ENCODING="br, gzip")
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert int(response.headers["Content-Length"]) == len(response.content)
+    assert gzip.decompress(response.content) == PAGE.encode()
+
+
+@pytest.mark.parametrize(
+    "url, accept_encoding, vary",
+    [
+        ("/page/", "", True),
+        ("/page/", "gzip;q=0", True),
+        ("/tiny/", "gzip", False),
+        ("/image/", "gzip", False),
+    ],
+)
+def test_leaves_uncompressed(client, url, accept_encoding, vary):
+    response = client.get(url, HTTP_ACCEPT_ENCODING=accept_encoding)
+
+    assert "Content-Encoding" not in response.headers
+    assert ("Vary" in response.headers) == vary
+
+
+def test_compresses_streaming_responses(client):
+    response = client.get("/stream/", HTTP_ACCEPT_ENCODING="gzip")
+    chunks = list(response.streaming_content)
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    # Output is flushed every MIN_SIZE bytes of content, not every line
+    assert len(chunks) < len(PAGE.splitlines()) / 10
+    decompressor = zlib.decompressobj(31)
+    flushed = decompressor.decompress(b"".join(chunks[:2]))
+    assert 512 <= len(flushed) < len(PAGE)
+    content = b"".join(chunks)
+    assert gzip.decompress(content) == PAGE.encode()
+
+
+def test_gzip_random_filename(client):
+    responses = [
+        client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        for url in ["/page/", "/stream/"] * 10
+    ]
+    contents = [
+        response.content if not response.streaming else b"".join(response)
+        for response in responses
+    ]
+
+    # File names of random length, so that compressed sizes vary
+    assert all(content[3] == gzip.FNAME for content in contents)
+    assert len({len(content) for content in contents[::2]}) > 1
+    assert len({len(content) for content in contents[1::2]}) > 1
+    assert all(gzip.decompress(content) == PAGE.encode() for content in contents)
+
+
+def test_gzip_without_random_filename(client):
+    from django_structured.http import compress, http_settings
+
+    options = {**http_settings(), "GZIP_RANDOM_BYTES": 0}
+    content = compress(PAGE.encode(), "gzip", options)
+
+    assert content[3] == 0
+    assert compress(PAGE.encode(), "gzip", options) == content
+    assert gzip.decompress(content) == PAGE.encode()
+
+
+def test_compresses_async_streaming_responses(client):
+    import asyncio
+
+    from django.test import AsyncClient
+
+    async def get():
+        response = await AsyncClient().get("/astream/", ACCEPT_ENCODING="gzip")
+        return response, b"".join([chunk async for chunk in response])
+
+    response, content = asyncio.run(get())
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(content) == PAGE.encode()
+
+
+def test_not_modified(client):
+    response = client.get("/page/", HTTP_ACCEPT_ENCODING="gzip")
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = client.get(
+        "/page/", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+@pytest.mark.parametrize(
+    "url, cache_control",
+    [
+        ("/page/", "private, no-cache"),
+        ("/public/", "public, max-age=60"),
+        ("/cached/", "max-age=3600, public"),
+    ],
+)
+def test_cache_control(client, url, cache_control):
+    response = client.get(url)
+
+    assert response.headers["Cache-Control"] == cache_control
+
+
+@pytest.mark.parametrize(
+    "backend, engine",
+    [
+        ("django.core.cache.backends.locmem.LocMemCache", "db"),
+        ("django.core.cache.backends.redis.RedisCache", "cached_db"),
+        ("django.core.cache.backends.memcached.PyMemcacheCache", "cached_db"),
+    ],
+)
+def test_session_engine(backend, engine):
+    from django_structured.http import session_engine
+
+    caches = {"default": {"BACKEND": backend}}
+    assert session_engine(caches) == f"django.contrib.sessions.backends.{engine}"
+
+
+@pytest.mark.parametrize(
+    "backend, engine",
+    [
+        ("django.core.cache.backends.locmem.LocMemCache", "db"),
+        ("django.core.cache.backends.redis.RedisCache", "cached_db"),
+    ],
+)
+def test_sessions_follow_caches(django_settings, backend, engine):
+    from importlib import import_module
+
+    django_settings(
+        CACHES={"default": {"BACKEND": backend}},
+        SESSION_ENGINE="django_structured.sessions",
+    )
+    store = import_module("django.contrib.sessions.backends." + engine).SessionStore
+
+    assert import_module("django_structured.sessions").SessionStore is store
@@ -0,0 +1,190 @@
+import textwrap
+
+import pytest
+
+from django_structured.imports import ImportGraph, candidates, main, parse_importtime
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     heavylib.core
+import time:       400 |        500 |   heavylib
+import time:        50 |        550 | proj.views
+import time:        20 |         20 | proj
+"""
+
+
+def write(root, files):
+    for name, source in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(textwrap.dedent(source))
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    write(
+        root,
+        {
+            "proj/__init__.py": "",
+            "proj/settings.py": """
+                SECRET_KEY = "secret"
+                ROOT_URLCONF = "proj.urls"
+                INSTALLED_APPS = ["proj"]
+                DATABASES = {}
+            """,
+            "proj/urls.py": """
+                from django.urls import path
+
+                from . import reports, views
+
+                urlpatterns = [
+                    path("", views.index),
+                    path("report/", reports.report),
+                ]
+            """,
+            "proj/views.py": """
+                import json
+                from typing import TYPE_CHECKING
+
+                if TYPE_CHECKING:
+                    import decimal
+
+                def index(request):
+                    import csv
+
+                    from django.http import HttpResponse
+
+                    return HttpResponse()
+            """,
+            "proj/reports.py": """
+                from django.http import HttpResponse
+
+                from .helpers import heavy
+
+                def report(request):
+                    return HttpResponse(heavy())
+            """,
+            "proj/helpers/__init__.py": """
+                from django_structured.project_utils import load_modules
+
+                load_modules(__name__)
+            """,
+            "proj/helpers/heavy.py": """
+                import heavylib
+
+                def heavy():
+                    return heavylib.VALUE
+            """,
+        },
+    )
+    write(
+        tmp_path / "site",
+        {
+            "heavylib/__init__.py": """
+                import time
+
+                time.sleep(0.05)
+                VALUE = "heavy"
+            """
+        },
+    )
+    return root
+
+
+def test_parse_importtime():
+    timings = parse_importtime(IMPORTTIME)
+
+    assert list(timings) == ["heavylib.core", "heavylib", "proj.views", "proj"]
+    assert timings["heavylib"].self_us == 400
+    assert timings["heavylib"].cumulative_us == 500
+    assert timings["heavylib.core"].parent == "heavylib"
+    assert timings["heavylib"].parent == "proj.views"
+    assert timings["proj.views"].parent is None
+
+
+def test_graph(project):
+    graph = ImportGraph(project)
+
+    views = graph.module("proj.views")
+    assert views.imports == {"json", "typing"}
+    assert views.deferred == {"csv", "django.http"}
+    assert graph.module("proj.urls").imports == {
+        "django.urls",
+        "proj.reports",
+        "proj.views",
+    }
+    assert graph.module("proj.helpers").imports == {
+        "django_structured.project_utils",
+        "proj.helpers.heavy",
+    }
+    assert graph.module("json") is None
+
+    reachable = graph.reachable(["proj.urls"])
+    assert {"proj", "proj.helpers.heavy", "heavylib", "json"} <= reachable
+    assert "csv" not in reachable
+    assert "heavylib" not in graph.reachable(["proj.urls"], barriers={"proj.reports"})
+
+
+def test_candidates(project):
+    graph = ImportGraph(project)
+    project_info = {
+        "settings": "proj.settings",
+        "urlconf": "proj.urls",
+        "apps": ["proj"],
+        "views": [
+            {"route": "", "view": "proj.views.index", "module": "proj.views"},
+            {
+                "route": "report/",
+                "view": "proj.reports.report",
+                "module": "proj.reports",
+            },
+        ],
+    }
+    timings = parse_importtime(IMPORTTIME.replace("proj.views", "proj.helpers.heavy"))
+
+    (candidate,) = candidates(graph, timings, project_info, 0.1, 1)
+    assert candidate["module"] == "heavylib"
+    assert candidate["cumulative_ms"] == 0.5
+    assert candidate["imported_by"] == ["proj.helpers.heavy"]
+    assert [view["view"] for view in candidate["views"]] == ["proj.reports.report"]
+
+    assert candidates(graph, timings, project_info, 1, 1) == []
+
+    # Not worth deferring when also imported outside of views
+    write(project, {"proj/models.py": "import heavylib.core"})
+    assert candidates(ImportGraph(project), timings, project_info, 0.1, 1) == []
+
+
+def test_main(project, monkeypatch, capsys):
+    monkeypatch.syspath_prepend(str(project.parent / "site"))
+    monkeypatch.chdir(project)
+    output = project / "imports.json"
+
+    assert (
+        main(["--settings", "proj.settings", "--repeat", "1", "--budget-ms", "0.1"])
+        == 1
+    )
+    assert "over the 0.1 ms budget" in capsys.readouterr().out
+
+    assert (
+        main(
+            [
+                "--settings",
+                "proj.settings",
+                "--repeat",
+                "1",
+                "--threshold-ms",
+                "20",
+                "--output",
+                str(output),
+                "--budget-ms",
+                "100000",
+            ]
+        )
+        == 0
+    )
+    out = capsys.readouterr().out
+    assert "Within the 100,000.0 ms startup budget" in out
+    assert "used by proj.reports.report (report/)" in out
+    assert output.exists()
@@ -0,0 +1,110 @@
+import json
+import logging
+import logging.config
+import sys
+import threading
+
+import pytest
+
+from django_structured.logging import JSONFormatter, QueueHandler
+
+
+class ListHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.records = []
+        self.unblocked = threading.Event()
+        self.unblocked.set()
+
+    def emit(self, record):
+        self.unblocked.wait()
+        self.records.append(record)
+
+
+@pytest.fixture
+def configure():
+    handlers = []
+
+    def _configure(target_level="NOTSET", maxsize=100):
+        logging.config.dictConfig(
+            {
+                "version": 1,
+                "disable_existing_loggers": False,
+                "handlers": {
+                    "target": {"()": ListHandler, "level": target_level},
+                    "queue": {
+                        "()": "django_structured.logging.QueueHandler",
+                        "handlers": ["target"],
+                        "maxsize": maxsize,
+                    },
+                },
+                "loggers": {
+                    "tests.logs": {
+                        "handlers": ["queue"],
+                        "level": "DEBUG",
+                        "propagate": False,
+                    }
+                },
+            }
+        )
+        logger = logging.getLogger("tests.logs")
+        queue_handler = logger.handlers[0]
+        handlers.append(queue_handler)
+        return logger, queue_handler, logging._handlers["target"]
+
+    yield _configure
+    for handler in handlers:
+        handler.close()
+    logging.config.dictConfig({"version": 1, "disable_existing_loggers": False})
+
+
+def test_queue_handler(configure):
+    logger, queue_handler, target = configure(target_level="INFO")
+    items = [1, 2]
+
+    logger.debug("Not emitted by any handler")
+    logger.info("Items: %s", items, extra={"request_id": "abc"})
+    items.append(3)
+    queue_handler.close()
+
+    assert [record.getMessage() for record in target.records] == ["Items: [1, 2]"]
+    assert target.records[0].request_id == "abc"
+    assert target.records[0].threadName == "MainThread"
+
+
+def test_drops_when_full(configure):
+    logger, queue_handler, target = configure(maxsize=2)
+    target.unblocked.clear()
+
+    for index in range(10):
+        logger.info("Message %d", index)
+    # The listener holds one record, the queue two more
+    assert queue_handler.dropped >= 7
+
+    target.unblocked.set()
+    queue_handler.queue.join()
+    logger.info("After")
+    queue_handler.close()
+
+    messages = [record.getMessage() for record in target.records]
+    dropped = f"Logging queue full, dropped {queue_handler.dropped} record(s)"
+    assert messages[-2:] == [dropped, "After"]
+
+
+def test_json_formatter():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord(
+            "app", logging.ERROR, __file__, 1, "Failed %s", ("job",), True
+        )
+        record.exc_info = sys.exc_info()
+    record.job_id = 42
+
+    data = json.loads(JSONFormatter().format(record))
+
+    assert data["level"] == "ERROR"
+    assert data["logger"] == "app"
+    assert data["message"] == "Failed job"
+    assert data["job_id"] == 42
+    assert "ValueError: boom" in data["exception"]
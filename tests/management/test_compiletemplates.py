@@ -0,0 +1,59 @@
+from io import StringIO
+
+import pytest
+
+
+@pytest.fixture
+def template_dir(tmp_path, django_settings):
+    django_settings(
+        TEMPLATES=[
+            {
+                "BACKEND": "django.template.backends.django.DjangoTemplates",
+                "DIRS": [tmp_path],
+                "OPTIONS": {
+                    "loaders": [
+                        (
+                            "django.template.loaders.cached.Loader",
+                            ["django.template.loaders.filesystem.Loader"],
+                        )
+                    ],
+                },
+            }
+        ]
+    )
+    (tmp_path / "base.html").write_text("{% block content %}{% endblock %}")
+    (tmp_path / "pages").mkdir()
+    (tmp_path / "pages" / "home.html").write_text(
+        '{% extends "base.html" %}{% block content %}{{ title }}{% endblock %}'
+    )
+    return tmp_path
+
+
+def test_compiles_all_templates(template_dir):
+    from django.core.management import call_command
+    from django.template import engines
+
+    stdout = StringIO()
+    call_command("compiletemplates", stdout=stdout)
+
+    assert "Compiled 2 template(s)" in stdout.getvalue()
+    cached_loader = engines["django"].engine.template_loaders[0]
+    assert {"base.html", "pages/home.html"} <= set(cached_loader.get_template_cache)
+
+
+def test_fails_on_syntax_error(template_dir):
+    from django.core.management import call_command
+    from django.core.management.base import CommandError
+
+    (template_dir / "broken.html").write_text("{% if %}")
+    (template_dir / "pages" / "broken.html").write_text("{% endblock %}")
+
+    with pytest.raises(CommandError, match="broken.html"):
+        call_command("compiletemplates", stdout=StringIO())
+
+    stderr = StringIO()
+    with pytest.raises(CommandError, match="2 template"):
+        call_command(
+            "compiletemplates", keep_going=True, stdout=StringIO(), stderr=stderr
+        )
+    assert "pages/broken.html" in stderr.getvalue()
@@ -0,0 +1,159 @@
+import json
+from io import StringIO
+from types import ModuleType
+
+import pytest
+
+
+@pytest.fixture
+def models(django_settings, monkeypatch):
+    """
+    Models registered in a fresh registry, as load_modules would.
+    """
+    django_settings()
+    from django.db import connection, models
+
+    from django_structured import project_utils
+
+    module = ModuleType("indexapp.models")
+
+    class Category(models.Model):
+        __module__ = module.__name__
+        name = models.CharField(max_length=100)
+
+        class Meta:
+            app_label = "django_structured"
+
+    class Item(models.Model):
+        __module__ = module.__name__
+        code = models.CharField(max_length=20, db_index=True)
+        name = models.CharField(max_length=100)
+        status = models.CharField(max_length=20)
+        rank = models.IntegerField(default=0)
+        category = models.ForeignKey(Category, on_delete=models.CASCADE)
+
+        class Meta:
+            app_label = "django_structured"
+
+    with connection.schema_editor() as editor:
+        editor.create_model(Category)
+        editor.create_model(Item)
+
+    module.Category = Category
+    module.Item = Item
+    registry = project_utils.TypeRegistry()
+    registry.register(module)
+    monkeypatch.setattr(project_utils, "registry", registry)
+    return module
+
+
+@pytest.fixture
+def captured(models, tmp_path):
+    """
+    Run typical queries, returning the file they're captured in.
+    """
+    from django_structured.indexes import QueryLog
+    from django_structured.queries import QueryCollector
+
+    category = models.Category.objects.create(name="Tools")
+    models.Item.objects.create(
+        code="a", name="Hammer", status="open", category=category
+    )
+    with QueryCollector() as queries:
+        for status in ("open", "closed", "open"):
+            list(models.Item.objects.filter(status=status).order_by("rank"))
+        list(models.Item.objects.filter(rank__gte=3))
+        list(models.Item.objects.filter(name__icontains="ham"))
+        models.Item.objects.get(code="a")
+        models.Item.objects.get(pk=1)
+        list(models.Item.objects.filter(category=category))
+
+    log = QueryLog()
+    log.extend(queries)
+    path = tmp_path / "queries.json"
+    log.save(path)
+    return path
+
+
+def test_suggest_indexes(captured):
+    from django_structured.indexes import QueryLog, suggest_indexes
+
+    suggestions, errors = suggest_indexes(QueryLog.load(captured))
+
+    assert errors == []
+    assert [(s.label, s.fields, s.count) for s in suggestions] == [
+        ("django_structured.Item", ["status", "rank"], 3),
+        ("django_structured.Item", ["rank"], 1),
+    ]
+    assert (
+        suggestions[0]
+        .code()
+        .startswith('models.Index(fields=["status", "rank"], name="django_stru_status_')
+    )
+
+
+def test_command(captured):
+    from django.core.management import call_command
+    from django.core.management.base import CommandError
+
+    stdout = StringIO()
+    call_command("suggestindexes", str(captured), stdout=stdout)
+    output = stdout.getvalue()
+    assert "django_structured.Item: 3 queries" in output
+    assert 'models.Index(fields=["status", "rank"]' in output
+    assert '3 x SELECT "django_structured_item"."id"' in output
+
+    stdout = StringIO()
+    call_command(
+        "suggestindexes", str(captured), format="json", min_count=2, stdout=stdout
+    )
+    assert [s["fields"] for s in json.loads(stdout.getvalue())] == [["status", "rank"]]
+
+    with pytest.raises(CommandError, match="2 missing index"):
+        call_command("suggestindexes", str(captured), check=True, stdout=StringIO())
+
+
+def test_only_registered_models(captured, monkeypatch):
+    from django_structured import project_utils
+    from django_structured.indexes import QueryLog, suggest_indexes
+
+    monkeypatch.setattr(project_utils, "registry", project_utils.TypeRegistry())
+    log = QueryLog.load(captured)
+
+    assert suggest_indexes(log)[0] == []
+    assert len(suggest_indexes(log, all_models=True)[0]) == 2
+
+
+@pytest.mark.parametrize(
+    "sql, table, columns",
+    [
+        (
+            'SELECT "app_item"."id" FROM "app_item" WHERE ("app_item"."status" = %s '
+            'AND "app_item"."rank" > %s) ORDER BY "app_item"."name" ASC',
+            "app_item",
+            ["status", "rank"],
+        ),
+        (
+            'SELECT "app_item"."id" FROM "app_item" WHERE "app_item"."owner_id" IN '
+            '(SELECT U0."id" FROM "app_user" U0 WHERE U0."email" = %s) '
+            'ORDER BY "app_item"."created" DESC LIMIT 21',
+            "app_user",
+            ["email"],
+        ),
+        (
+            "SELECT `app_item`.`id` FROM `app_item` WHERE `app_item`.`kind` = %s "
+            "ORDER BY `app_item`.`created` DESC",
+            "app_item",
+            ["kind", "created"],
+        ),
+        (
+            'SELECT "app_item"."id" FROM "app_item" WHERE "app_item"."name" LIKE %s',
+            "app_item",
+            [],
+        ),
+    ],
+)
+def test_index_columns(sql, table, columns):
+    from django_structured.indexes import index_columns
+
+    assert index_columns(sql, table) == columns
@@ -0,0 +1,153 @@
+import json
+import tracemalloc
+
+import pytest
+from django.http import HttpResponse
+
+from django_structured import memory
+
+MB = 1024 * 1024
+
+leaked = []
+
+
+def leaky(request, pk):
+    leaked.append(bytearray(MB))
+    return HttpResponse()
+
+
+def fine(request):
+    return HttpResponse()
+
+
+def __getattr__(name):
+    if name == "urlpatterns":
+        from django.urls import path
+
+        return [path("leaky/<int:pk>/", leaky), path("fine/", fine)]
+    raise AttributeError(name)
+
+
+@pytest.fixture
+def watchdog(django_settings, monkeypatch, tmp_path):
+    from django.urls import clear_url_caches
+
+    def _watchdog(**options):
+        django_settings(
+            ROOT_URLCONF=__name__,
+            ALLOWED_HOSTS=["testserver"],
+            MIDDLEWARE=["django_structured.memory.MemoryWatchdogMiddleware"],
+            STRUCTURED_MEMORY={
+                "SAMPLE_RATE": 1.0,
+                "INTERVAL": 3600,
+                "WARMUP_REQUESTS": 0,
+                "REPORT_DIR": str(tmp_path),
+                **options,
+            },
+        )
+        clear_url_caches()
+        monkeypatch.setattr(memory, "_watchdog", None)
+        return memory.get_watchdog()
+
+    yield _watchdog
+
+    if memory._watchdog is not None:
+        memory._watchdog.stop()
+    leaked.clear()
+    tracemalloc.stop()
+    clear_url_caches()
+
+
+def test_middleware(watchdog):
+    from django.test import Client
+
+    watchdog = watchdog(TRACEMALLOC=1)
+    client = Client()
+    for pk in range(3):
+        client.get(f"/leaky/{pk}/")
+    client.get("/fine/")
+    client.get("/missing/")
+
+    assert watchdog.requests == 5
+    assert watchdog.thread.is_alive()
+    assert tracemalloc.is_tracing()
+    leaky_route = watchdog.routes["/leaky/<int:pk>/"]
+    assert leaky_route.requests == 3
+    assert leaky_route.growth >= 3 * MB
+    assert watchdog.routes["/fine/"].growth < MB
+    assert watchdog.routes["<unresolved>"].requests == 1
+
+
+def test_sample(watchdog, mocker, tmp_path):
+    watchdog = watchdog(TRACEMALLOC=1, MAX_GROWTH_MB=5, RECYCLE=True)
+    watchdog.start()
+    watchdog.record("/leaky/<int:pk>/", 2 * MB)
+    watchdog.record("/fine/", 0)
+    kill = mocker.patch.object(memory.os, "kill")
+    mocker.patch.object(memory, "rss", side_effect=[100 * MB, 104 * MB, 106 * MB])
+
+    report = watchdog.sample()
+    assert report["baseline_mb"] == report["rss_mb"] == 100
+    assert report["growth_mb"] == 0
+    assert not report["recycled"]
+    assert list(report["routes"]) == ["/leaky/<int:pk>/", "/fine/"]
+
+    leaked.append(bytearray(MB))
+    report = watchdog.sample()
+    assert report["growth_mb"] == 4
+    assert not report["recycled"]
+    (location, *_) = report["locations"]
+    assert location["location"].startswith(__file__)
+    assert location["size_diff_kb"] >= 1024
+    kill.assert_not_called()
+
+    report = watchdog.sample()
+    assert report["recycled"]
+    assert report["peak_mb"] == 106
+    assert [sample["rss_mb"] for sample in report["history"]] == [100, 104, 106]
+    kill.assert_called_once_with(memory.os.getpid(), memory.signal.SIGTERM)
+    assert watchdog.stopped.is_set()
+
+    written = json.loads((tmp_path / f"memory-{memory.os.getpid()}.json").read_text())
+    assert written == report
+
+
+def test_warmup(watchdog, mocker):
+    watchdog = watchdog(WARMUP_REQUESTS=10, MAX_GROWTH_MB=0)
+    kill = mocker.patch.object(memory.os, "kill")
+    mocker.patch.object(memory, "rss", return_value=200 * MB)
+
+    report = watchdog.sample()
+    assert report["baseline_mb"] is None
+    assert not report["recycled"]
+    kill.assert_not_called()
+
+
+def test_report_only_without_supervisor(watchdog, mocker, caplog):
+    watchdog = watchdog(MAX_GROWTH_MB=0)
+    kill = mocker.patch.object(memory.os, "kill")
+    mocker.patch.object(memory, "rss", side_effect=[100 * MB, 110 * MB, 120 * MB])
+
+    watchdog.sample()
+    assert not watchdog.sample()["recycled"]
+    assert not watchdog.sample()["recycled"]
+    kill.assert_not_called()
+    assert caplog.text.count("no server would replace it") == 1
+
+
+def test_supervised(monkeypatch, mocker):
+    from django_structured import process
+
+    monkeypatch.delitem(process.sys.modules, "gunicorn.arbiter", raising=False)
+    parent = mocker.patch.object(process.multiprocessing, "parent_process")
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+
+    parent.return_value = None
+    assert not process.supervised()
+    parent.return_value = object()
+    assert process.supervised()
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")
+    assert not process.supervised()
+
+    monkeypatch.setitem(process.sys.modules, "gunicorn.arbiter", object())
+    assert process.supervised()
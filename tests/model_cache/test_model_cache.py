@@ -0,0 +1,150 @@
+import pytest
+
+
+@pytest.fixture
+def models(django_settings):
+    django_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+    )
+    from types import SimpleNamespace
+
+    from django.db import connection, models
+
+    from django_structured import model_cache
+    from django_structured.model_cache import CachedManager, connect_invalidation
+
+    class Tag(models.Model):
+        name = models.CharField(max_length=100)
+
+        class Meta:
+            app_label = "django_structured"
+
+    class Country(models.Model):
+        code = models.CharField(max_length=2, unique=True)
+        name = models.CharField(max_length=100)
+        tags = models.ManyToManyField(Tag)
+
+        objects = CachedManager()
+
+        class Meta:
+            app_label = "django_structured"
+
+    with connection.schema_editor() as editor:
+        editor.create_model(Tag)
+        editor.create_model(Country)
+
+    connect_invalidation([Tag, Country])
+    yield SimpleNamespace(Tag=Tag, Country=Country)
+    model_cache._connected.clear()
+
+
+@pytest.fixture
+def queries():
+    from django_structured.queries import QueryCollector
+
+    return QueryCollector
+
+
+def test_get(models, queries):
+    france = models.Country.objects.create(code="fr", name="France")
+
+    with queries() as collector:
+        assert models.Country.objects.get(pk=france.pk).name == "France"
+        assert models.Country.objects.get(id=str(france.pk)).name == "France"
+        assert models.Country.objects.get(code="fr").name == "France"
+        assert models.Country.objects.get(code__exact="fr").name == "France"
+    assert len(collector) == 2
+
+    with pytest.raises(models.Country.DoesNotExist):
+        models.Country.objects.get(pk=france.pk + 1)
+
+    # Anything but a single unique lookup goes to the database
+    with queries() as collector:
+        models.Country.objects.get(name="France")
+        models.Country.objects.get(code="fr", name="France")
+    assert len(collector) == 2
+
+
+def test_in_bulk(models, queries):
+    countries = [models.Country.objects.create(code=code, name=code) for code in "ab"]
+    pks = [country.pk for country in countries]
+    models.Country.objects.get(pk=pks[0])
+
+    with queries() as collector:
+        assert set(models.Country.objects.in_bulk(pks)) == set(pks)
+        assert set(models.Country.objects.in_bulk(pks)) == set(pks)
+    assert len(collector) == 1
+
+
+def test_invalidation(models, queries):
+    france = models.Country.objects.create(code="fr", name="France")
+    models.Country.objects.get(code="fr")
+
+    france.name = "République française"
+    france.save()
+    assert models.Country.objects.get(pk=france.pk).name == "République française"
+
+    # The unique field pointer is checked against the fetched row
+    france.code = "fx"
+    france.save()
+    with pytest.raises(models.Country.DoesNotExist):
+        models.Country.objects.get(code="fr")
+
+    tag = models.Tag.objects.create(name="europe")
+    models.Country.objects.get(pk=france.pk)
+    france.tags.add(tag)
+    with queries() as collector:
+        models.Country.objects.get(pk=france.pk)
+    assert len(collector) == 1
+
+    france.delete()
+    with pytest.raises(models.Country.DoesNotExist):
+        models.Country.objects.get(pk=france.pk)
+
+
+def test_related_managers_skip_cache(models, queries):
+    france = models.Country.objects.create(code="fr", name="France")
+    europe = models.Tag.objects.create(name="europe")
+    asia = models.Tag.objects.create(name="asia")
+    france.tags.add(europe)
+    models.Country.objects.get(pk=france.pk)
+
+    with queries() as collector:
+        assert europe.country_set.get(pk=france.pk) == france
+        assert europe.country_set.in_bulk([france.pk]) == {france.pk: france}
+    assert len(collector) == 2
+
+    with pytest.raises(models.Country.DoesNotExist):
+        asia.country_set.get(pk=france.pk)
+    assert asia.country_set.in_bulk([france.pk]) == {}
+
+
+def test_cache_key(models):
+    from django_structured.model_cache import cache_key
+
+    key = cache_key(models.Country, "name", "République " + "x" * 300)
+
+    assert key.startswith("structured:model:1:django_structured.country:name:")
+    assert len(key) < 250
+    assert key.isascii() and " " not in key
+
+
+def test_rolled_back_rows_not_cached(models):
+    from django.db import transaction
+
+    france = models.Country.objects.create(code="fr", name="France")
+
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            models.Country.objects.filter(pk=france.pk).update(name="Rolled back")
+            models.Country.objects.invalidate(france.pk)
+            assert models.Country.objects.get(pk=france.pk).name == "Rolled back"
+            assert models.Country.objects.get(code="fr").name == "Rolled back"
+            assert models.Country.objects.in_bulk([france.pk])
+            raise RuntimeError
+
+    assert models.Country.objects.get(pk=france.pk).name == "France"
+    assert models.Country.objects.get(code="fr").name == "France"
+    assert models.Country.objects.in_bulk([france.pk])[france.pk].name == "France"
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+
+import pytest
+
+
+@pytest.fixture
+def profiling(django_settings):
+    django_settings(
+        CACHES={
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        },
+        TEMPLATES=[{"BACKEND": "django.template.backends.django.DjangoTemplates"}],
+    )
+    from django_structured import profiling
+
+    return profiling
+
+
+def view(request):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.http import HttpResponse
+    from django.template import engines
+
+    from django_structured.profiling import record
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.execute("SELECT 2")
+    cache.set("present", 1)
+    cache.get("present")
+    cache.get("absent")
+    cache.get_many(["present", "absent"])
+    record("custom", 0.5, "custom metric")
+    content = engines["django"].from_string("{{ value }}").render({"value": "hi"})
+    return HttpResponse(content)
+
+
+def test_profiles_request(profiling, caplog):
+    from django.test import RequestFactory
+
+    middleware = profiling.ProfilingMiddleware(view)
+    with caplog.at_level(logging.INFO, logger="django_structured.profiling"):
+        response = middleware(RequestFactory().get("/page/"))
+
+    assert response.content == b"hi"
+    timing = response.headers["Server-Timing"]
+    assert 'desc="2 queries"' in timing
+    assert 'cache;desc="2 hits, 2 misses"' in timing
+    assert "tpl;dur=" in timing
+    assert 'custom;dur=500.0;desc="custom metric"' in timing
+
+    (record,) = caplog.records
+    assert record.path == "/page/"
+    assert record.profile["queries"] == 2
+    assert profiling.current_profile() is None
+
+
+def test_profiles_async_request(profiling):
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+
+    async def async_view(request):
+        profiling.record("work", 0.001)
+        return HttpResponse()
+
+    middleware = profiling.ProfilingMiddleware(async_view)
+    response = asyncio.run(middleware(RequestFactory().get("/")))
+
+    assert "work;dur=1.0" in response.headers["Server-Timing"]
+
+
+def test_profiles_async_request_queries(profiling):
+    from asgiref.sync import sync_to_async
+    from django.db import connection
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+
+    def query(sql):
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+
+    async def async_view(request):
+        # Through worker threads, which have connections of their own
+        await sync_to_async(query)("SELECT 1")
+        await sync_to_async(query, thread_sensitive=False)("SELECT 2")
+        return HttpResponse()
+
+    middleware = profiling.ProfilingMiddleware(async_view)
+    response = asyncio.run(middleware(RequestFactory().get("/")))
+
+    assert 'desc="2 queries"' in response.headers["Server-Timing"]
+
+
+def test_sampling(profiling):
+    from django.conf import settings
+    from django.test import RequestFactory
+
+    settings.STRUCTURED_PROFILING = {"SAMPLE_RATE": 0}
+    middleware = profiling.ProfilingMiddleware(view)
+    response = middleware(RequestFactory().get("/"))
+
+    assert "Server-Timing" not in response.headers
@@ -0,0 +1,129 @@
+import tomllib
+from pathlib import Path
+
+import pytest
+
+import django_structured
+from django_structured.options import ProjectOptions
+
+TPL = Path(django_structured.__file__).parent.parent / "tpl"
+
+
+@pytest.fixture
+def render(django_settings):
+    """
+    Render a template of the tpl directory with ProjectOptions.
+    """
+    django_settings()
+    from dataclasses import asdict
+
+    from django.template import Context, Engine
+
+    def _render(name, **options):
+        context = {"project_name": "project50", **asdict(ProjectOptions(**options))}
+        template = Engine().from_string((TPL / name).read_text())
+        return template.render(Context(context, autoescape=False))
+
+    return _render
+
+
+def test_depends_on_django_structured(render):
+    pyproject = tomllib.loads(render("python/pyproject.toml"))
+
+    dependencies = pyproject["tool"]["poetry"]["dependencies"]
+    assert dependencies["django-structured"] == "^0.1.0"
+
+
+def stages(dockerfile):
+    """
+    Instructions of each stage of a Dockerfile, by stage name.
+    """
+    stages = {}
+    for line in dockerfile.splitlines():
+        instruction, _, arguments = line.strip().partition(" ")
+        if instruction == "FROM":
+            name = arguments.split()[-1]
+            stages[name] = [line.strip()]
+        elif stages and instruction.isupper():
+            stages[name].append(line.strip())
+    return stages
+
+
+def installed_groups(stages, name, groups):
+    """
+    Poetry groups installed in the virtualenv of a stage and its bases.
+    """
+    installed = set()
+    for line in stages[name]:
+        if line.startswith("FROM "):
+            base = line.split()[1]
+        elif line.startswith("COPY --from=") and "${VIRTUAL_ENV}" in line:
+            base = line.split()[1].removeprefix("--from=")
+        else:
+            base = None
+        if base in stages:
+            installed |= installed_groups(stages, base, groups)
+        if "poetry install" in line:
+            arguments = line.split("poetry install", 1)[1].split()
+            selected = set(groups)
+            for option, value in zip(arguments, arguments[1:]):
+                if option == "--only":
+                    selected = set(value.split(","))
+                elif option == "--without":
+                    selected -= set(value.split(","))
+            installed |= selected
+    return installed
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"interface": "asgi"},
+        {"interface": "asgi", "server": "uvicorn", "tasks": "celery"},
+        {"server": "granian", "tasks": "rq"},
+    ],
+)
+def test_production_image_installs_runtime_groups(render, options):
+    pyproject = tomllib.loads(render("python/pyproject.toml", **options))
+    dockerfile = stages(render("python/Dockerfile", **options))
+
+    poetry = pyproject["tool"]["poetry"]
+    groups = {
+        "main": poetry["dependencies"],
+        **{name: group["dependencies"] for name, group in poetry["group"].items()},
+    }
+    installed = installed_groups(dockerfile, "production", groups)
+
+    server = options.get("server", "gunicorn")
+    assert any(server in groups[name] for name in installed)
+    if options.get("tasks") in ("celery", "rq"):
+        assert "tasks" in installed
+    assert installed.isdisjoint({"dev", "test"})
+
+
+@pytest.mark.parametrize(
+    "options, packages",
+    [
+        ({"drf": True}, {"djangorestframework", "orjson"}),
+        ({"static_compression": True, "http_efficiency": False}, {"brotli"}),
+        ({"static_compression": False, "http_efficiency": True}, {"brotli"}),
+        ({"sentry": True}, {"sentry-sdk"}),
+    ],
+)
+def test_optional_dependencies(render, options, packages):
+    disabled = {
+        "drf": False,
+        "static_compression": False,
+        "http_efficiency": False,
+        "sentry": False,
+    }
+    pyproject = tomllib.loads(render("python/pyproject.toml", **disabled))
+    dependencies = pyproject["tool"]["poetry"]["dependencies"]
+    assert packages.isdisjoint(dependencies)
+
+    pyproject = tomllib.loads(
+        render("python/pyproject.toml", **{**disabled, **options})
+    )
+    dependencies = pyproject["tool"]["poetry"]["dependencies"]
+    assert packages <= set(dependencies)
@@ -12,14 +12,22 @@ import yaml
 yaml_dir = Path(__file__).resolve().parent
 
 
-def make_package(data) -> Tuple[ModuleType, List[str]]:
+def make_package(data, layout: str = "directory") -> Tuple[ModuleType, List[str]]:
     """
     Create a package from a dict of contents.
 
+    Layouts:
+
+    * directory: Plain source files
+    * zip: Sources and compiled modules in a zip archive, as bundled by
+        `structured bundle`
+    * zip-sourceless: Only compiled modules in a zip archive
+
     Returns the constructed package and a lst of modules imported while
     importing the package (not including the package name itself).
     """
     tmpdir = tempfile.mkdtemp()
+    path = tmpdir
 
     def _construct(data, dir):
         for key, value in data.items():
@@ -35,7 +43,24 @@ def make_package(data) -> Tuple[ModuleType, List[str]]:
 
     _construct(data, tmpdir)
 
-    sys.path = [".", tmpdir] + sys.path
+    if layout != "directory":
+        from django_structured.bundle import compile_tree, write_archive
+
+        source = Path(tmpdir)
+        compile_tree(source, keep_source=layout == "zip")
+        path = os.path.join(tempfile.mkdtemp(), "package.zip")
+        write_archive(source, Path(path))
+
+    sys.path = [".", path] + sys.path
+    # Tests collected earlier imported django_structured: set it aside so
+    # that the package imports it afresh, as reported by modules_imported
+    library = {
+        name: module
+        for name, module in sys.modules.items()
+        if name == "django_structured" or name.startswith("django_structured.")
+    }
+    for name in library:
+        del sys.modules[name]
     modules_before = set(sys.modules.keys())
     try:
         result = __import__(list(data.keys())[0])
@@ -43,8 +68,12 @@ def make_package(data) -> Tuple[ModuleType, List[str]]:
         modules_imported = set(sys.modules.keys()) - modules_before
         for module in modules_imported:
             del sys.modules[module]
+        sys.modules.update(library)
         sys.path = sys.path[2:]
+        sys.path_importer_cache.pop(path, None)
         shutil.rmtree(tmpdir)
+        if path != tmpdir:
+            shutil.rmtree(os.path.dirname(path))
 
     return result, modules_imported
 
@@ -61,6 +90,15 @@ def get_exception(name: str) -> Exception:
         return __builtins__[name]
 
 
+def get_attribute(obj, path: str):
+    """
+    Given a dotted path of attributes, return the attribute of obj.
+    """
+    for name in path.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
 @pytest.mark.parametrize(
     "yaml_file",
     [pytest.param(file, id=file.name) for file in yaml_dir.glob("**/*.yaml")],
@@ -90,6 +128,11 @@ def test_load_modules(yaml_file):
         values
     * modules_imported (list): Asserts that, when imported, the package
         imported the given modules
+    * registry_subclasses (list): For each item, asserts that the package's
+        registry has the "expected" subclasses (as module.name) of "base" (a
+        dotted path from the package), in order, limited to "package" if given
+    * registry_instances (list): As registry_subclasses, for instances, given
+        by name
     """
     with yaml_file.open("r") as file:
         yaml_contents = yaml.safe_load(file)
@@ -139,4 +182,19 @@ def test_load_modules(yaml_file):
                 f"Actual: {getattr(pkg, name)})"
             )
 
+    # Testing registry lookups, including their order
+    for lookup in tests.get("registry_subclasses", []):
+        found = pkg.registry.subclasses_of(
+            get_attribute(pkg, lookup["base"]), lookup.get("package")
+        )
+        assert [f"{cls.__module__}.{cls.__qualname__}" for cls in found] == (
+            lookup["expected"]
+        )
+
+    for lookup in tests.get("registry_instances", []):
+        found = pkg.registry.instances_of(
+            get_attribute(pkg, lookup["base"]), lookup.get("package")
+        )
+        assert [obj.name for obj in found] == lookup["expected"]
+
     assert yaml_contents is not None
@@ -0,0 +1,91 @@
+import importlib
+import sys
+
+import pytest
+
+from django_structured.project_utils import TypeRegistry, load_modules
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    """
+    An importable package of handlers, removed from sys.modules afterwards.
+    """
+    root = tmp_path / "handlers_pkg"
+    root.mkdir()
+    (root / "__init__.py").write_text("")
+    (root / "base.py").write_text("class Handler:\n    pass\n")
+    (root / "a.py").write_text(
+        "from .base import Handler\n\nclass AHandler(Handler):\n    pass\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield root
+    for name in list(sys.modules):
+        if name == "handlers_pkg" or name.startswith("handlers_pkg."):
+            del sys.modules[name]
+
+
+def test_registry_cached(package):
+    import handlers_pkg
+    from handlers_pkg.base import Handler
+
+    registry = TypeRegistry()
+    load_modules(handlers_pkg.__name__, registry=registry)
+
+    found = registry.subclasses_of(Handler)
+    assert [cls.__name__ for cls in found] == ["AHandler"]
+    assert registry.subclasses_of(Handler) is found
+
+
+def test_registry_reload(package):
+    """
+    Lookups return the classes of reloaded modules, not the stale ones.
+    """
+    import handlers_pkg
+    from handlers_pkg.base import Handler
+
+    registry = TypeRegistry()
+    load_modules(handlers_pkg.__name__, registry=registry)
+
+    stale = registry.subclasses_of(Handler)
+    (package / "a.py").write_text(
+        "from .base import Handler\n\n"
+        "class AHandler(Handler):\n    pass\n\n"
+        "class NewHandler(Handler):\n    pass\n"
+    )
+    importlib.invalidate_caches()
+    module = importlib.reload(sys.modules["handlers_pkg.a"])
+
+    found = registry.subclasses_of(Handler)
+    assert [cls.__name__ for cls in found] == ["AHandler", "NewHandler"]
+    assert found[0] is module.AHandler
+    assert found[0] is not stale[0]
+
+
+def test_registry_reload_into_empty_lookup(package):
+    """
+    A reloaded module is seen by lookups that found nothing in it before.
+    """
+    import handlers_pkg
+
+    registry = TypeRegistry()
+    load_modules(handlers_pkg.__name__, registry=registry)
+
+    assert registry.subclasses_of(AssertionError) == ()
+    (package / "a.py").write_text("class Failure(AssertionError):\n    pass\n")
+    importlib.invalidate_caches()
+    module = importlib.reload(sys.modules["handlers_pkg.a"])
+
+    assert registry.subclasses_of(AssertionError) == (module.Failure,)
+
+
+def test_registry_forget(package):
+    import handlers_pkg
+    from handlers_pkg.base import Handler
+
+    registry = TypeRegistry()
+    load_modules(handlers_pkg.__name__, registry=registry)
+
+    assert registry.subclasses_of(Handler)
+    registry.forget("handlers_pkg.a")
+    assert registry.subclasses_of(Handler) == ()
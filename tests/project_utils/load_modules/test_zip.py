@@ -0,0 +1,40 @@
+from pathlib import Path
+
+import pytest
+import yaml
+
+from .test_load_modules import make_package, yaml_dir
+
+
+def load(yaml_file: Path, layout: str):
+    """
+    Import the package of a yaml file in the given layout, returning what
+    load_modules did, or the exception it raised.
+    """
+    with yaml_file.open("r") as file:
+        yaml_contents = yaml.safe_load(file)
+    try:
+        pkg, modules_imported = make_package(
+            {"package": yaml_contents["package"]}, layout
+        )
+    except Exception as e:
+        return type(e)
+    names = {name for name in vars(pkg) if not name.startswith("__")}
+    return (
+        sorted(modules_imported),
+        sorted(getattr(pkg, "__all__", [])),
+        names,
+    )
+
+
+@pytest.mark.parametrize("layout", ["zip", "zip-sourceless"])
+@pytest.mark.parametrize(
+    "yaml_file",
+    [pytest.param(file, id=file.name) for file in yaml_dir.glob("**/*.yaml")],
+)
+def test_load_modules_from_zip(yaml_file, layout):
+    """
+    load_modules finds the same modules in zip archives (as made by
+    `structured bundle`) as in directories.
+    """
+    assert load(yaml_file, layout) == load(yaml_file, "directory")
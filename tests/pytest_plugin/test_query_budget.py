@@ -0,0 +1,160 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+import django_structured
+from django_structured.queries import normalize_sql
+
+CONFTEST = """
+import django
+from django.conf import settings
+
+settings.configure(
+    DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}},
+)
+django.setup()
+"""
+
+TESTS = """
+import pytest
+from django.db import connection
+
+
+def run_queries(n):
+    with connection.cursor() as cursor:
+        for i in range(n):
+            cursor.execute("SELECT %s", [i])
+
+
+@pytest.mark.query_budget(3)
+def test_marker_within_budget():
+    run_queries(3)
+
+
+@pytest.mark.query_budget(2)
+def test_marker_over_budget():
+    run_queries(5)
+
+
+def test_fixture_over_budget(query_budget):
+    with query_budget(1):
+        run_queries(2)
+"""
+
+
+@pytest.fixture
+def pytester(pytester, monkeypatch):
+    """
+    Pytester with the example tests, running in subprocesses that import
+    this checkout of django_structured.
+    """
+    pytest.importorskip("django")
+    package_root = str(Path(django_structured.__file__).parent.parent)
+    monkeypatch.setenv(
+        "PYTHONPATH", os.pathsep.join([package_root, os.environ.get("PYTHONPATH", "")])
+    )
+    pytester.makeconftest(CONFTEST)
+    pytester.makepyfile(TESTS)
+    return pytester
+
+
+@pytest.mark.parametrize(
+    "sql, expected",
+    [
+        (
+            'SELECT "a"."id" FROM "a" WHERE "a"."id" IN (%s, %s, %s)',
+            'SELECT "a"."id" FROM "a" WHERE "a"."id" IN (...)',
+        ),
+        (
+            "SELECT * FROM t WHERE name = 'it''s' AND n = 42 LIMIT 21",
+            "SELECT * FROM t WHERE name = ? AND n = ? LIMIT ?",
+        ),
+        (
+            "INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)",
+            "INSERT INTO t (a, b) VALUES (?, ?), ...",
+        ),
+        ('SELECT "t2"."c1"::text FROM "t2"', 'SELECT "t2"."c1"::text FROM "t2"'),
+    ],
+)
+def test_normalize_sql(sql, expected):
+    assert normalize_sql(sql) == expected
+
+
+def test_query_budget(pytester):
+    result = pytester.runpytest_subprocess(
+        "-p", "django_structured.pytest_plugin", "-p", "no:randomly", "--query-report"
+    )
+
+    result.assert_outcomes(passed=1, failed=2)
+    result.stdout.fnmatch_lines(
+        [
+            "*executed 5 queries (budget: 2)*",
+            "*5 x SELECT ?*",
+            "*Block executed 2 queries (budget: 1)*",
+            "*query report*",
+            "*5 queries*test_marker_over_budget*",
+        ]
+    )
+
+
+def test_query_report_xdist(pytester):
+    pytest.importorskip("xdist")
+
+    result = pytester.runpytest_subprocess(
+        "-p",
+        "django_structured.pytest_plugin",
+        "-p",
+        "no:randomly",
+        "-n",
+        "2",
+        "--query-report",
+    )
+
+    result.assert_outcomes(passed=1, failed=2)
+    result.stdout.fnmatch_lines(
+        [
+            "*query report*",
+            "*5 queries*test_marker_over_budget*",
+            "*5 x SELECT ?*",
+            "*3 queries*test_marker_within_budget*",
+        ]
+    )
+
+
+def test_capture_queries(pytester):
+    result = pytester.runpytest_subprocess(
+        "-p",
+        "django_structured.pytest_plugin",
+        "-p",
+        "no:randomly",
+        "--capture-queries",
+        "queries.json",
+    )
+
+    result.assert_outcomes(passed=1, failed=2)
+    queries = json.loads((pytester.path / "queries.json").read_text())
+    assert [(query["shape"], query["count"]) for query in queries] == [("SELECT ?", 10)]
+
+
+def test_capture_queries_xdist(pytester):
+    pytest.importorskip("xdist")
+    # Left by an earlier run
+    (pytester.path / "queries.json.gw9").write_text("[]")
+
+    result = pytester.runpytest_subprocess(
+        "-p",
+        "django_structured.pytest_plugin",
+        "-p",
+        "no:randomly",
+        "-n",
+        "2",
+        "--capture-queries",
+        "queries.json",
+    )
+
+    result.assert_outcomes(passed=1, failed=2)
+    queries = json.loads((pytester.path / "queries.json").read_text())
+    assert [(query["shape"], query["count"]) for query in queries] == [("SELECT ?", 10)]
+    assert not list(pytester.path.glob("queries.json.gw*"))
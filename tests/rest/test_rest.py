@@ -0,0 +1,44 @@
+import decimal
+import io
+
+import pytest
+
+
+@pytest.fixture
+def rest(django_settings):
+    pytest.importorskip("rest_framework")
+    django_settings(INSTALLED_APPS=["rest_framework", "django_structured"])
+    from django_structured import rest
+
+    return rest
+
+
+def test_orjson_round_trip(rest):
+    data = {"price": decimal.Decimal("1.50"), "name": "é", 1: None}
+
+    rendered = rest.ORJSONRenderer().render(data)
+    parsed = rest.ORJSONParser().parse(io.BytesIO(rendered))
+
+    # Like DRF's JSONRenderer, Decimals outside of serializers become floats
+    assert parsed == {"price": 1.5, "name": "é", "1": None}
+
+
+def test_parse_error(rest):
+    from rest_framework.exceptions import ParseError
+
+    with pytest.raises(ParseError):
+        rest.ORJSONParser().parse(io.BytesIO(b"{"))
+
+
+def test_eager_loading(rest, mocker):
+    class Serializer(rest.EagerLoadingMixin):
+        select_related = ["author"]
+        prefetch_related = ["tags"]
+
+    queryset = mocker.MagicMock()
+    Serializer.setup_eager_loading(queryset)
+
+    queryset.select_related.assert_called_once_with("author")
+    queryset.select_related.return_value.prefetch_related.assert_called_once_with(
+        "tags"
+    )
@@ -0,0 +1,21 @@
+from django.http import HttpResponse
+from django.views import View
+
+from django_structured.routing import route
+
+
+@route("items/", name="item-list")
+def item_list(request):
+    return HttpResponse("list")
+
+
+@route("items/<slug:slug>/", name="item-slug")
+def item_slug(request, slug):
+    return HttpResponse(slug)
+
+
+@route("items/new/", name="item-new")
+@route("items/create/")
+class ItemCreateView(View):
+    def get(self, request):
+        return HttpResponse("new")
@@ -0,0 +1,10 @@
+from django.http import HttpResponse
+
+from django_structured.routing import route
+
+from ..items import item_list  # noqa: F401 (only routed once, by items)
+
+
+@route("pages/<int:pk>/", name="page", kwargs={"extra": True})
+def page(request, pk, extra=False):
+    return HttpResponse(f"{pk} {extra}")
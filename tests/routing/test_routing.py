@@ -0,0 +1,176 @@
+import django
+import pytest
+from django.http import HttpResponse
+from django.urls import include, path, re_path
+from django.urls.exceptions import Resolver404
+from django.urls.resolvers import RegexPattern, ResolverMatch, URLResolver
+
+from django_structured.routing import IndexedResolver, Router
+
+APP = f"{__package__}.app"
+
+
+def view(request, *args, **kwargs):
+    return HttpResponse()
+
+
+PATTERNS = [
+    path("", view, name="home"),
+    path("items/", view, name="items"),
+    path("items/<int:pk>/", view, name="item"),
+    path("items/<int:pk>/edit/", view, name="item-edit"),
+    path("items/latest/", view, name="latest"),
+    path("items/<slug:slug>/", view, name="item-slug"),
+    path("api/", include([path("ping/", view, name="ping")])),
+    path("ap", include([path("ple/", view, name="apple")])),
+    re_path(r"^archive/(\d{4})/$", view, name="archive"),
+    path("<str:page>/", view, name="page"),
+]
+
+
+@pytest.fixture
+def router(django_settings):
+    from django.urls import clear_url_caches
+
+    django_settings(
+        INSTALLED_APPS=["django_structured", APP],
+        ROOT_URLCONF=__name__,
+        ALLOWED_HOSTS=["testserver"],
+    )
+    clear_url_caches()
+    yield Router().discover()
+    clear_url_caches()
+
+
+def __getattr__(name):
+    if name == "urlpatterns":
+        return [path("admin/", view), Router().discover().urls]
+    raise AttributeError(name)
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/",
+        "/items/",
+        "/items/3/",
+        "/items/3/edit/",
+        "/items/latest/",
+        "/items/some-slug/",
+        "/api/ping/",
+        "/apple/",
+        "/archive/2024/",
+        "/about/",
+        "/items/3/delete/",
+        "/api/pong/",
+        "/archive/24/",
+    ],
+)
+def test_resolve_like_django(django_settings, path):
+    django_settings()
+    expected = URLResolver(RegexPattern(r"^/"), PATTERNS)
+    indexed = IndexedResolver(RegexPattern(r"^/"), PATTERNS)
+
+    try:
+        match = expected.resolve(path)
+    except Resolver404:
+        with pytest.raises(Resolver404):
+            indexed.resolve(path)
+        return
+    result = indexed.resolve(path)
+    assert (result.url_name, result.args, result.kwargs, result.route) == (
+        match.url_name,
+        match.args,
+        match.kwargs,
+        match.route,
+    )
+
+
+class ResolverMatch32(ResolverMatch):
+    """
+    ResolverMatch with the signature of Django 3.2 to 4.0.
+    """
+
+    def __init__(
+        self,
+        func,
+        args,
+        kwargs,
+        url_name=None,
+        app_names=None,
+        namespaces=None,
+        route=None,
+        tried=None,
+    ):
+        super().__init__(
+            func, args, kwargs, url_name, app_names, namespaces, route, tried
+        )
+
+
+@pytest.mark.parametrize("version", [(3, 2, 25, "final", 0), django.VERSION])
+def test_resolve_across_django_versions(django_settings, monkeypatch, version):
+    from django_structured import routing
+
+    django_settings()
+    monkeypatch.setattr(django, "VERSION", version)
+    if version < (4, 1):
+        monkeypatch.setattr(routing, "ResolverMatch", ResolverMatch32)
+    indexed = IndexedResolver(RegexPattern(r"^/"), PATTERNS, {"source": "index"})
+
+    match = indexed.resolve("/items/3/")
+
+    assert (match.url_name, match.kwargs) == ("item", {"source": "index", "pk": 3})
+
+
+def test_candidates(django_settings):
+    django_settings()
+    indexed = IndexedResolver(RegexPattern(r"^/"), PATTERNS)
+
+    def candidates(path):
+        return [str(pattern.pattern) for pattern in indexed.candidates(path)]
+
+    # Patterns without a static prefix are candidates for every path
+    anywhere = ["ap", r"^archive/(\d{4})/$", "<str:page>/"]
+    assert candidates("items/3/") == [
+        "items/<int:pk>/",
+        "items/<int:pk>/edit/",
+        "items/<slug:slug>/",
+        *anywhere,
+    ]
+    assert candidates("items/") == [
+        "items/",
+        "items/<int:pk>/",
+        "items/<int:pk>/edit/",
+        "items/<slug:slug>/",
+        *anywhere,
+    ]
+    assert candidates("api/ping/") == ["api/", *anywhere]
+    assert candidates("about/") == anywhere
+
+
+def test_discover(router):
+    patterns = router.urls.url_patterns
+    routes = [(str(pattern.pattern), pattern.name) for pattern in patterns]
+    assert routes == [
+        ("items/", "item-list"),
+        ("items/new/", "item-new"),
+        ("items/create/", None),
+        ("items/<slug:slug>/", "item-slug"),
+        ("pages/<int:pk>/", "page"),
+    ]
+
+
+def test_urls(router):
+    from django.test import Client
+    from django.urls import resolve, reverse
+
+    client = Client()
+    assert reverse("item-slug", args=["new-item"]) == "/items/new-item/"
+    assert reverse("page", args=[3]) == "/pages/3/"
+    assert resolve("/items/new/").url_name == "item-new"
+    assert resolve("/items/x/").kwargs == {"slug": "x"}
+
+    assert client.get("/items/new/").content == b"new"
+    assert client.get("/items/create/").content == b"new"
+    assert client.get("/pages/3/").content == b"3 True"
+    assert client.get("/pages/x/").status_code == 404
@@ -0,0 +1,96 @@
+import sys
+from wsgiref.util import setup_testing_defaults
+
+import pytest
+
+from django_structured.sentry import make_traces_sampler
+
+
+@pytest.mark.parametrize(
+    "sampling_context, expected",
+    [
+        ({"wsgi_environ": {"PATH_INFO": "/api/items/"}}, 0.25),
+        ({"wsgi_environ": {"PATH_INFO": "/healthz"}}, 0.0),
+        ({"wsgi_environ": {"PATH_INFO": "/health/db"}}, 0.0),
+        ({"wsgi_environ": {"PATH_INFO": "/healthcare/"}}, 0.25),
+        ({"asgi_scope": {"path": "/static/app.css"}}, 0.0),
+        ({"asgi_scope": {"path": "/static"}}, 0.25),
+        ({"asgi_scope": {"path": "/api/"}, "parent_sampled": True}, 1.0),
+        ({"wsgi_environ": {"PATH_INFO": "/health"}, "parent_sampled": False}, 0.0),
+        ({"transaction_context": {"name": "task"}}, 0.25),
+    ],
+)
+def test_traces_sampler(sampling_context, expected):
+    sampler = make_traces_sampler(0.25, ["/healthz", "/health", "/static/"])
+
+    assert sampler(sampling_context) == expected
+
+
+def test_disabled_without_import_cost(django_settings, monkeypatch):
+    from django_structured.sentry import FAKE_DSN, init_from_settings
+
+    django_settings(STRUCTURED_SENTRY={"DSN": FAKE_DSN, "ENABLED": False})
+    monkeypatch.delitem(sys.modules, "sentry_sdk", raising=False)
+
+    assert init_from_settings() is False
+    assert "sentry_sdk" not in sys.modules
+
+
+def test_traces_through_recording_transport(django_settings):
+    sentry_sdk = pytest.importorskip("sentry_sdk")
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+
+    from django_structured.sentry import (
+        FAKE_DSN,
+        init_from_settings,
+        recording_transport,
+    )
+
+    django_settings(
+        ROOT_URLCONF=__name__,
+        ALLOWED_HOSTS=["127.0.0.1"],
+        STATIC_URL="/static/",
+        STRUCTURED_SENTRY={"TRACES_SAMPLE_RATE": 1.0},
+    )
+    transport = recording_transport()
+    try:
+        assert init_from_settings(dsn=FAKE_DSN, transport=transport)
+        application = get_wsgi_application()
+        for path in ["/items/", "/healthz"]:
+            environ = {"PATH_INFO": path}
+            setup_testing_defaults(environ)
+            b"".join(application(environ, lambda status, headers: None))
+        sentry_sdk.flush()
+    finally:
+        sentry_sdk.init()
+        connection.close()
+
+    transactions = transport.items("transaction")
+    assert [t["transaction"] for t in transactions] == ["/items/"]
+    spans = transactions[0]["spans"]
+    assert any(span["op"] == "db" for span in spans)
+
+
+def items(request):
+    from django.db import connection
+    from django.http import HttpResponse
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    return HttpResponse()
+
+
+def health(request):
+    from django.http import HttpResponse
+
+    return HttpResponse()
+
+
+def __getattr__(name):
+    # ROOT_URLCONF for the tests above, built once Django is configured
+    if name == "urlpatterns":
+        from django.urls import path
+
+        return [path("items/", items), path("healthz", health)]
+    raise AttributeError(name)
@@ -0,0 +1,96 @@
+import pytest
+
+from django_structured.server import (
+    ServerConfig,
+    cgroup_cpu_limit,
+    cgroup_memory_limit,
+    cpu_count,
+)
+
+
+@pytest.fixture
+def cgroup_v2(tmp_path):
+    def _write(cpu_max="max 100000", memory_max="max"):
+        (tmp_path / "cpu.max").write_text(f"{cpu_max}\n")
+        (tmp_path / "memory.max").write_text(f"{memory_max}\n")
+        return tmp_path
+
+    return _write
+
+
+@pytest.mark.parametrize(
+    "cpu_max, expected",
+    [
+        ("max 100000", None),
+        ("200000 100000", 2.0),
+        ("150000 100000", 1.5),
+    ],
+)
+def test_cgroup_v2_cpu_limit(cgroup_v2, cpu_max, expected):
+    assert cgroup_cpu_limit(cgroup_v2(cpu_max=cpu_max)) == expected
+
+
+def test_cgroup_v1_limits(tmp_path):
+    (tmp_path / "cpu").mkdir()
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("300000\n")
+    (tmp_path / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    (tmp_path / "memory").mkdir()
+    (tmp_path / "memory" / "memory.limit_in_bytes").write_text(f"{2**63 - 4096}\n")
+
+    assert cgroup_cpu_limit(tmp_path) == 3.0
+    assert cgroup_memory_limit(tmp_path) is None
+
+
+def test_no_cgroups(tmp_path):
+    assert cgroup_cpu_limit(tmp_path) is None
+    assert cgroup_memory_limit(tmp_path) is None
+    assert cpu_count(tmp_path) >= 1
+
+
+def test_cpu_count_respects_quota(cgroup_v2):
+    assert cpu_count(cgroup_v2(cpu_max="50000 100000")) == 1
+
+
+@pytest.mark.parametrize(
+    "interface, workers, threads",
+    [
+        ("wsgi", 5, 2),
+        ("asgi", 2, 1),
+    ],
+)
+def test_process_model(mocker, cgroup_v2, interface, workers, threads):
+    mocker.patch("django_structured.server.cpu_count", return_value=2)
+    config = ServerConfig.from_environment(
+        interface, environ={}, cgroup_root=cgroup_v2()
+    )
+
+    assert (config.workers, config.threads) == (workers, threads)
+
+
+def test_workers_fit_memory_limit(mocker, cgroup_v2):
+    mocker.patch("django_structured.server.cpu_count", return_value=8)
+    root = cgroup_v2(memory_max=str(1024 * 2**20))
+    config = ServerConfig.from_environment(
+        "wsgi", worker_memory=300 * 2**20, environ={}, cgroup_root=root
+    )
+
+    assert config.workers == 3
+
+
+def test_environment_overrides(cgroup_v2):
+    config = ServerConfig.from_environment(
+        "wsgi",
+        environ={
+            "WEB_CONCURRENCY": "7",
+            "WEB_PRELOAD": "0",
+            "WEB_KEEPALIVE": "2",
+            "WEB_MAX_LIFETIME": "600",
+        },
+        cgroup_root=cgroup_v2(),
+    )
+
+    assert config.workers == 7
+    assert config.preload_app is False
+    assert config.keepalive == 2
+    assert config.max_lifetime == 600
+    assert 1000 <= config.jittered_max_requests() <= 1100
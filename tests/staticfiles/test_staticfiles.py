@@ -0,0 +1,88 @@
+import gzip
+
+import pytest
+
+CSS = "body { color: red; }\n" * 100
+
+
+@pytest.fixture
+def static_root(tmp_path, django_settings):
+    root = tmp_path / "static"
+    root.mkdir()
+    django_settings(
+        STATIC_URL="/static/",
+        STATIC_ROOT=root,
+        STRUCTURED_STATIC_COMPRESSION={"ENCODINGS": ["gzip"], "WORKERS": 1},
+    )
+    return root
+
+
+def test_compress_files_skips_unchanged(static_root):
+    from django_structured.staticfiles import compress_files
+
+    (static_root / "app.css").write_text(CSS)
+    (static_root / "tiny.css").write_text("a{}")
+    (static_root / "logo.png").write_bytes(b"\x89PNG" * 100)
+
+    names = ["app.css", "tiny.css", "logo.png"]
+    compressed = dict(compress_files(static_root, names, encodings=["gzip"]))
+
+    assert compressed == {"app.css": [".gz"]}
+    assert gzip.decompress((static_root / "app.css.gz").read_bytes()) == CSS.encode()
+
+    # Unchanged content is skipped, changed content is compressed again
+    assert dict(compress_files(static_root, names, encodings=["gzip"])) == {}
+    (static_root / "app.css").write_text(CSS * 2)
+    compressed = dict(compress_files(static_root, names, encodings=["gzip"]))
+    assert compressed == {"app.css": [".gz"]}
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, content_encoding",
+    [
+        ("gzip, deflate", "gzip"),
+        ("gzip;q=0, deflate", None),
+        ("", None),
+    ],
+)
+def test_middleware_serves_precompressed(
+    static_root, accept_encoding, content_encoding
+):
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+
+    from django_structured.staticfiles import (
+        PrecompressedStaticFilesMiddleware,
+        compress_files,
+    )
+
+    (static_root / "app.css").write_text(CSS)
+    list(compress_files(static_root, ["app.css"], encodings=["gzip"]))
+
+    middleware = PrecompressedStaticFilesMiddleware(lambda request: HttpResponse())
+    request = RequestFactory().get(
+        "/static/app.css", HTTP_ACCEPT_ENCODING=accept_encoding
+    )
+    response = middleware(request)
+
+    assert response.headers.get("Content-Encoding") == content_encoding
+    assert response.headers["Content-Type"] == "text/css"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    content = b"".join(response.streaming_content)
+    if content_encoding == "gzip":
+        content = gzip.decompress(content)
+    assert content == CSS.encode()
+
+
+def test_middleware_passes_through_missing_files(static_root):
+    from django.http import HttpResponse
+    from django.test import RequestFactory
+
+    from django_structured.staticfiles import PrecompressedStaticFilesMiddleware
+
+    middleware = PrecompressedStaticFilesMiddleware(
+        lambda request: HttpResponse("fallback")
+    )
+
+    for path in ["/static/missing.css", "/static/../secret.txt", "/other/"]:
+        assert middleware(RequestFactory().get(path)).content == b"fallback"
@@ -0,0 +1,184 @@
+import pytest
+
+from django_structured.tasks import task
+
+calls = []
+
+
+@task
+def record(value):
+    calls.append(value)
+
+
+@task(retries=2)
+def flaky(value):
+    calls.append(value)
+    if calls.count(value) < 2:
+        raise RuntimeError("first attempt fails")
+
+
+@task(retries=1)
+def broken():
+    raise RuntimeError("always fails")
+
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    calls.clear()
+
+
+@pytest.fixture
+def database_backend(django_settings):
+    from django.core.management import call_command
+
+    django_settings(
+        INSTALLED_APPS=["django_structured", "django_structured.tasks"],
+        STRUCTURED_TASKS={"BACKEND": "database", "RETRY_DELAY": 0, "POLL_INTERVAL": 0},
+    )
+    call_command("migrate", verbosity=0)
+
+
+def test_eager(django_settings):
+    django_settings(STRUCTURED_TASKS={"BACKEND": "eager"})
+
+    record.enqueue(1)
+    assert calls == [1]
+
+    with pytest.raises(TypeError):
+        record.enqueue(object())
+
+
+def test_unknown_backend(django_settings):
+    django_settings(STRUCTURED_TASKS={"BACKEND": "carrier-pigeon"})
+
+    with pytest.raises(ValueError):
+        record.enqueue(1)
+
+
+def test_database_worker(database_backend):
+    from django.core.management import call_command
+
+    from django_structured.tasks.models import QueuedTask
+
+    queued = record.enqueue("a")
+    assert calls == []
+    assert queued.name == "tasks.test_tasks.record"
+    assert queued.max_attempts == 4
+
+    call_command("runtasks", burst=True, verbosity=0)
+
+    queued.refresh_from_db()
+    assert calls == ["a"]
+    assert queued.status == QueuedTask.DONE
+    assert queued.attempts == 1
+
+
+def test_database_retries(database_backend):
+    from django.core.management import call_command
+
+    from django_structured.tasks.models import QueuedTask
+
+    retried = flaky.enqueue("b")
+    failed = broken.enqueue()
+
+    call_command("runtasks", burst=True, verbosity=0)
+
+    retried.refresh_from_db()
+    assert calls == ["b", "b"]
+    assert retried.status == QueuedTask.DONE
+    assert retried.attempts == 2
+
+    failed.refresh_from_db()
+    assert failed.status == QueuedTask.FAILED
+    assert failed.attempts == 2
+    assert "always fails" in failed.last_error
+
+
+def test_database_requeues_lost(database_backend):
+    from datetime import timedelta
+
+    from django.core.management import call_command
+    from django.utils import timezone
+
+    from django_structured.tasks.models import QueuedTask
+
+    # Claimed by workers that died while running them
+    lost = record.enqueue("c")
+    exhausted = broken.enqueue()
+    recent = record.enqueue("d")
+    QueuedTask.objects.filter(pk__in=[lost.pk, exhausted.pk]).update(
+        status=QueuedTask.RUNNING, claimed=timezone.now() - timedelta(hours=2)
+    )
+    QueuedTask.objects.filter(pk=lost.pk).update(attempts=1)
+    QueuedTask.objects.filter(pk=exhausted.pk).update(attempts=2)
+    QueuedTask.objects.filter(pk=recent.pk).update(
+        status=QueuedTask.RUNNING, attempts=1, claimed=timezone.now()
+    )
+
+    call_command("runtasks", burst=True, verbosity=0)
+
+    lost.refresh_from_db()
+    assert calls == ["c"]
+    assert lost.status == QueuedTask.DONE
+    assert lost.attempts == 2
+
+    exhausted.refresh_from_db()
+    assert exhausted.status == QueuedTask.FAILED
+    assert "after it was claimed" in exhausted.last_error
+
+    recent.refresh_from_db()
+    assert recent.status == QueuedTask.RUNNING
+
+
+def test_database_concurrency(django_settings, tmp_path):
+    from django.core.management import call_command
+
+    # A database file, shared by the worker threads
+    django_settings(
+        INSTALLED_APPS=["django_structured", "django_structured.tasks"],
+        DATABASES={
+            "default": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": str(tmp_path / "db.sqlite3"),
+            }
+        },
+        STRUCTURED_TASKS={"BACKEND": "database", "CONCURRENCY": 4},
+    )
+    call_command("migrate", verbosity=0)
+    from django_structured.tasks.models import QueuedTask
+
+    for value in range(40):
+        record.enqueue(value)
+
+    call_command("runtasks", burst=True, verbosity=0)
+
+    assert sorted(calls) == list(range(40))
+    assert set(QueuedTask.objects.values_list("status", "attempts")) == {
+        (QueuedTask.DONE, 1)
+    }
+
+
+def test_database_worker_survives_errors(database_backend, mocker):
+    from io import StringIO
+
+    from django.core.management import call_command
+    from django.db import OperationalError
+
+    from django_structured.management.commands import runtasks
+
+    claim = runtasks.claim
+    errors = [OperationalError("database is locked")]
+
+    def failing_claim(queues):
+        if errors:
+            raise errors.pop()
+        return claim(queues)
+
+    mocker.patch.object(runtasks, "claim", failing_claim)
+    record.enqueue("e")
+    stderr = StringIO()
+
+    call_command("runtasks", burst=True, verbosity=0, stderr=stderr)
+
+    assert calls == ["e"]
+    assert "database is locked" in stderr.getvalue()
@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import pytest
+
+
+@pytest.fixture
+def Item(django_settings, tmp_path):
+    # A database file, as sync_to_async runs queries in another thread, which
+    # wouldn't see an in-memory database
+    django_settings(
+        DEBUG=True,
+        DATABASES={
+            "default": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": str(tmp_path / "db.sqlite3"),
+            }
+        },
+    )
+    from django.db import connection, models
+
+    class Item(models.Model):
+        name = models.CharField(max_length=100)
+
+        class Meta:
+            app_label = "django_structured"
+
+    with connection.schema_editor() as editor:
+        editor.create_model(Item)
+    Item.objects.bulk_create(Item(name=f"Item {i}") for i in range(3))
+    connection.close()
+    return Item
+
+
+def call(view, path="/", **kwargs):
+    from django.test import RequestFactory
+
+    from django_structured.views import sync_hop_budget
+
+    request = RequestFactory().get(path)
+    budgeted = sync_hop_budget(strict=True)(view)
+    return asyncio.run(budgeted(request, **kwargs))
+
+
+def test_list_view(Item):
+    from django_structured.views import AsyncModelListView
+
+    view = AsyncModelListView.as_view(model=Item, fields=["name"], paginate_by=2)
+    response = call(view, "/?page=2")
+
+    assert json.loads(response.content) == {
+        "count": 3,
+        "page": 2,
+        "results": [{"name": "Item 2"}],
+    }
+
+
+def test_detail_view(Item):
+    from django.http import Http404
+
+    from django_structured.views import AsyncModelDetailView
+
+    pk = Item.objects.get(name="Item 1").pk
+    view = AsyncModelDetailView.as_view(model=Item, fields=["id", "name"])
+
+    assert json.loads(call(view, pk=pk).content) == {"id": pk, "name": "Item 1"}
+    with pytest.raises(Http404):
+        call(view, pk=pk + 100)
+
+
+def test_model_methods_within_budget(Item):
+    from django.http import JsonResponse
+
+    async def view(request):
+        item = Item(name="New")
+        await item.asave()
+        await item.arefresh_from_db()
+        return JsonResponse({"id": item.pk})
+
+    response = call(view)
+    assert Item.objects.filter(pk=json.loads(response.content)["id"]).exists()
+
+
+def test_list_view_orders_unordered_querysets(Item, mocker):
+    from django.db.models.query import QuerySet
+
+    from django_structured.views import AsyncModelListView
+
+    order_by = mocker.spy(QuerySet, "order_by")
+    view = AsyncModelListView.as_view(model=Item, fields=["name"], paginate_by=2)
+    call(view)
+    order_by.assert_called_once_with(mocker.ANY, "pk")
+
+    queryset = Item.objects.order_by("-name")
+    order_by.reset_mock()
+    view = AsyncModelListView.as_view(queryset=queryset, fields=["name"])
+    response = call(view)
+    order_by.assert_not_called()
+    assert json.loads(response.content)["results"][0] == {"name": "Item 2"}
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def views(django_settings):
+    django_settings(DEBUG=False)
+    from django_structured import views
+
+    return views
+
+
+def blocking_call():
+    return 42
+
+
+def test_within_budget(views):
+    from asgiref.sync import sync_to_async
+
+    @views.sync_hop_budget(1, strict=True)
+    async def view():
+        return await sync_to_async(blocking_call)()
+
+    assert asyncio.run(view()) == 42
+
+
+def test_over_budget(views):
+    from asgiref.sync import sync_to_async
+
+    @views.sync_hop_budget(strict=True)
+    async def view():
+        return await sync_to_async(blocking_call)()
+
+    with pytest.raises(views.SyncHopError, match="blocking_call"):
+        asyncio.run(view())
+
+
+def test_warns_when_not_strict(views, caplog):
+    from asgiref.sync import sync_to_async
+
+    @views.sync_hop_budget()
+    async def view():
+        await sync_to_async(blocking_call)()
+        return await sync_to_async(blocking_call)()
+
+    assert asyncio.run(view()) == 42
+    assert "made 2 sync_to_async hop(s) (budget: 0)" in caplog.text
+
+
+def test_ignores_expected_modules(views):
+    from asgiref.sync import sync_to_async
+
+    @views.sync_hop_budget(strict=True, ignore=[__name__])
+    async def view():
+        return await sync_to_async(blocking_call)()
+
+    assert asyncio.run(view()) == 42
@@ -1,10 +1,15 @@
-import pkgutil
+from django.apps import apps
 
+from django_structured.admin import autoregister
+from django_structured.project_utils import load_modules, registry
 
-def load_models():
-    for loader, module_name, is_pkg in pkgutil.iter_modules(__path__):
-        loader.find_spec(module_name).loader.load_module(module_name)
+from .. import models
 
+# Modules in this package register custom ModelAdmins with @admin.register
+load_modules(__name__, registry=registry)
 
-load_models()
-del load_models
+# Every other model of this app gets a ScalableModelAdmin
+autoregister(
+    (getattr(models, name) for name in models.__all__),
+    app_label=apps.get_containing_app_config(__name__).label,
+)
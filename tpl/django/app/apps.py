@@ -1,6 +1,12 @@
 from django.apps import AppConfig
 
+from django_structured import checks
+
 
 class App50Config(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "app50"
+
+    def ready(self):
+        # Flag settings that hurt performance in `manage.py check --deploy`
+        checks.register()
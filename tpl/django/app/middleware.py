@@ -0,0 +1,23 @@
+if async_views:
+    from asgiref.sync import iscoroutinefunction
+    from django.utils.decorators import sync_and_async_middleware
+
+    @sync_and_async_middleware
+    def app_middleware(get_response):
+        """
+        Middleware that runs natively under both WSGI and ASGI. Keeping every
+        middleware async-capable avoids a thread switch per middleware and
+        request under asgi.py. Don't call blocking code (such as the sync ORM)
+        here.
+        """
+        if iscoroutinefunction(get_response):
+
+            async def middleware(request):
+                return await get_response(request)
+
+        else:
+
+            def middleware(request):
+                return get_response(request)
+
+        return middleware
@@ -1,6 +1,12 @@
 from django.db import models
 
-from django_structured.project_utils import load_modules
+from django_structured.model_cache import connect_invalidation
+from django_structured.project_utils import load_modules, registry
 
 __all__ = []
-load_modules(__path__, globals(), __all__, subclasses_of=models.Model)
+load_modules(
+    __name__, globals(), __all__, subclasses_of=models.Model, registry=registry
+)
+
+# Keep the read-through cache of models with a CachedManager up to date
+connect_invalidation(globals()[name] for name in __all__)
@@ -0,0 +1,5 @@
+from django_structured.project_utils import load_modules, registry
+
+# Modules in this package define background tasks with
+# django_structured.tasks.task, run by `manage.py runtasks` workers
+load_modules(__name__, registry=registry)
@@ -0,0 +1,20 @@
+import pytest
+
+if async_views:
+    from django.test import AsyncClient
+
+    @pytest.fixture
+    def async_client():
+        """
+        Django test client calling views through the ASGI handler, for testing
+        async views and middleware.
+        """
+        return AsyncClient()
+
+
+@pytest.fixture(autouse=True)
+def _eager_tasks(eager_tasks):
+    """
+    Run background tasks enqueued by the code under test immediately, without
+    a worker.
+    """
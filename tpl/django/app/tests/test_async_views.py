@@ -0,0 +1,40 @@
+import pytest
+
+if async_views:
+    from asgiref.sync import async_to_sync
+    from django.contrib.contenttypes.models import ContentType
+    from django.urls import include, path, reverse
+
+    # The app's URLs, as the project includes them
+    urlpatterns = [path("app50/", include("app50.urls"))]
+    pytestmark = [pytest.mark.django_db, pytest.mark.urls(__name__)]
+
+    def get(async_client, name, **kwargs):
+        response = async_to_sync(async_client.get)(
+            reverse(f"app50:{name}", kwargs=kwargs)
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    def test_model_type_list(async_client):
+        data = get(async_client, "model-type-list")
+
+        assert data["count"] == ContentType.objects.count()
+        assert data["results"][0]["id"] == ContentType.objects.order_by("pk")[0].pk
+
+    def test_model_type_detail(async_client):
+        content_type = ContentType.objects.get_for_model(ContentType)
+
+        data = get(async_client, "model-type-detail", pk=content_type.pk)
+
+        assert data == {
+            "id": content_type.pk,
+            "app_label": "contenttypes",
+            "model": "contenttype",
+        }
+
+    @pytest.mark.query_budget(1)
+    def test_app_model_types(async_client):
+        data = get(async_client, "app-model-types", app_label="auth")
+
+        assert data == {"app_label": "auth", "models": ["group", "permission", "user"]}
@@ -0,0 +1,20 @@
+import pytest
+from django.apps import apps
+
+
+@pytest.mark.django_db
+@pytest.mark.query_budget(1)
+@pytest.mark.parametrize(
+    "model",
+    [
+        pytest.param(model, id=model.__name__)
+        for model in apps.get_app_config("app50").get_models()
+    ],
+)
+def test_default_manager_is_one_query(model):
+    """
+    Listing a model through its default manager must stay a single query. Use
+    the query_budget marker (or fixture) on view tests too, to catch N+1
+    queries as soon as they are introduced.
+    """
+    list(model._default_manager.all()[:10])
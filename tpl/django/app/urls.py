@@ -0,0 +1,32 @@
+"""
+URLs of the app, included in the project's urls.py with:
+
+    path("app50/", include("app50.urls")),
+"""
+
+from django.urls import path
+
+app_name = "app50"
+
+urlpatterns = []
+
+if async_views:
+    from .views import async_views
+
+    urlpatterns += [
+        path(
+            "model-types/",
+            async_views.ModelTypeListView.as_view(),
+            name="model-type-list",
+        ),
+        path(
+            "model-types/<int:pk>/",
+            async_views.ModelTypeDetailView.as_view(),
+            name="model-type-detail",
+        ),
+        path(
+            "model-types/<str:app_label>/models/",
+            async_views.app_model_types,
+            name="app-model-types",
+        ),
+    ]
@@ -0,0 +1,36 @@
+"""
+Async views, served without blocking the event loop when the project runs
+under asgi.py.
+
+Only use the async ORM API (aget, acount, aiterator, asave, ...) in these
+views. Any other sync_to_async hop is reported by @sync_hop_budget (and raises
+an error when DEBUG is on).
+
+The views below list the installed models (their content types), as examples
+of a class-based and a function view. Replace them with views of the app's
+models, routed in ../urls.py.
+"""
+
+if async_views:
+    from django.contrib.contenttypes.models import ContentType
+    from django.http import JsonResponse
+
+    from django_structured.views import (
+        AsyncModelDetailView,
+        AsyncModelListView,
+        sync_hop_budget,
+    )
+
+    class ModelTypeListView(AsyncModelListView):
+        model = ContentType
+        fields = ["id", "app_label", "model"]
+
+    class ModelTypeDetailView(AsyncModelDetailView):
+        model = ContentType
+        fields = ["id", "app_label", "model"]
+
+    @sync_hop_budget()
+    async def app_model_types(request, app_label):
+        types = ContentType.objects.filter(app_label=app_label).order_by("model")
+        models = [name async for name in types.values_list("model", flat=True)]
+        return JsonResponse({"app_label": app_label, "models": models})
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+"""
+Measure throughput and peak memory of streaming exports and bulk upserts
+(django_structured.bulk) against loading a whole queryset and saving rows one
+by one.
+
+Runs against the configured default database, in a scratch table created and
+dropped by the benchmark.
+
+Usage:
+    python benchmarks/bulk.py --rows 1000000 --save-rows 10000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project50.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, models, transaction  # noqa: E402
+
+from django_structured import bulk  # noqa: E402
+
+
+class BenchmarkRow(models.Model):
+    sku = models.CharField(max_length=20, unique=True)
+    name = models.CharField(max_length=100)
+    quantity = models.IntegerField(default=0)
+
+    class Meta:
+        app_label = "django_structured"
+
+
+def rows(count, offset=0):
+    for i in range(offset, offset + count):
+        yield {"sku": f"sku-{i}", "name": f"Row {i}", "quantity": i % 100}
+
+
+def measure(label, fn, count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<32} {elapsed:>8.2f} s  {count / elapsed:>12,.0f} rows/s"
+        f"  peak {peak / 2**20:>8.1f} MiB"
+    )
+
+
+def drain(stream):
+    for _ in stream:
+        pass
+
+
+def save_each(count):
+    with transaction.atomic():
+        for row in rows(count, offset=10**9):
+            BenchmarkRow.objects.update_or_create(sku=row["sku"], defaults=row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument(
+        "--save-rows",
+        type=int,
+        default=10_000,
+        help="rows for the one-by-one baseline, which is much slower",
+    )
+    parser.add_argument("--batch-size", type=int, default=bulk.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--chunk-size", type=int, default=bulk.DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    with connection.schema_editor() as editor:
+        editor.create_model(BenchmarkRow)
+    try:
+        queryset = BenchmarkRow.objects.order_by("pk")
+        fields = ["sku", "name", "quantity"]
+
+        measure(
+            "import: save() per row",
+            lambda: save_each(args.save_rows),
+            args.save_rows,
+        )
+        measure(
+            "import: bulk_upsert (insert)",
+            lambda: bulk.bulk_upsert(
+                BenchmarkRow, rows(args.rows), ["sku"], batch_size=args.batch_size
+            ),
+            args.rows,
+        )
+        measure(
+            "import: bulk_upsert (update)",
+            lambda: bulk.bulk_upsert(
+                BenchmarkRow, rows(args.rows), ["sku"], batch_size=args.batch_size
+            ),
+            args.rows,
+        )
+        count = queryset.count()
+        measure(
+            "export: list(queryset) to CSV",
+            lambda: drain(bulk.csv_stream(queryset, fields, chunk_size=count or 1)),
+            count,
+        )
+        measure(
+            "export: streaming CSV",
+            lambda: drain(
+                bulk.csv_stream(queryset, fields, chunk_size=args.chunk_size)
+            ),
+            count,
+        )
+        measure(
+            "export: streaming JSON",
+            lambda: drain(
+                bulk.json_stream(queryset, fields, chunk_size=args.chunk_size)
+            ),
+            count,
+        )
+    finally:
+        with connection.schema_editor() as editor:
+            editor.delete_model(BenchmarkRow)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Compare request latency under heavy logging with a handler writing directly
+to slow I/O, and with the queue-based handler of settings/base/logging.py.
+
+Requests are simulated by threads each logging a number of records per
+request to a handler taking --io-delay seconds per record, standing in for a
+slow disk, pipe or network log shipper.
+
+Usage:
+    python benchmarks/logging_latency.py --requests 200 --logs 20 --threads 8
+"""
+import argparse
+import logging
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from django_structured.logging import JSONFormatter, QueueHandler  # noqa: E402
+
+
+class SlowHandler(logging.Handler):
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+        self.setFormatter(JSONFormatter())
+
+    def emit(self, record):
+        self.format(record)
+        time.sleep(self.delay)
+
+
+def request(logger, logs):
+    start = time.perf_counter()
+    for index in range(logs):
+        logger.info("Handled step %d", index, extra={"request_id": "abc"})
+    return time.perf_counter() - start
+
+
+def run(label, handler, args):
+    logger = logging.getLogger(f"benchmark.{label}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as executor:
+        latencies = sorted(
+            executor.map(lambda _: request(logger, args.logs), range(args.requests))
+        )
+    elapsed = time.perf_counter() - start
+    handler.close()
+
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{label:<8} p50 {p50 * 1000:>8.2f} ms  p99 {p99 * 1000:>8.2f} ms  "
+        f"{args.requests / elapsed:>8,.0f} req/s"
+    )
+    return p50, p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--logs", type=int, default=20, help="records per request")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--io-delay", type=float, default=0.0005)
+    parser.add_argument("--maxsize", type=int, default=10000)
+    args = parser.parse_args()
+
+    direct = run("direct", SlowHandler(args.io_delay), args)
+
+    target = SlowHandler(args.io_delay)
+    target.set_name("benchmark-slow")
+    queue_handler = QueueHandler(["benchmark-slow"], maxsize=args.maxsize)
+    queued = run("queue", queue_handler, args)
+
+    print()
+    print(f"p50 speedup: {direct[0] / queued[0]:.1f}x")
+    print(f"p99 speedup: {direct[1] / queued[1]:.1f}x")
+    print(f"records dropped by the queue: {queue_handler.dropped}")
+
+
+if __name__ == "__main__":
+    main()
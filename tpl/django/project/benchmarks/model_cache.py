@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Compare primary key fetches through the ORM with fetches through the
+read-through model cache of django_structured.model_cache.
+
+The model is benchmarked with a CachedManager attached for the occasion, so
+any model with rows will do, cached or not.
+
+Usage:
+    python benchmarks/model_cache.py --model auth.User --rows 100 --repeat 20
+"""
+import argparse
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project50.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.apps import apps  # noqa: E402
+
+from django_structured.model_cache import CachedManager  # noqa: E402
+
+
+def measure(label, fn, repeat, rows):
+    best = min(timeit.repeat(fn, number=1, repeat=repeat))
+    print(f"{label:<40} {best * 1000:>9.2f} ms  {rows / best:>12,.0f} rows/s")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default="auth.User")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    model = apps.get_model(args.model)
+    pks = list(model._default_manager.values_list("pk", flat=True)[: args.rows])
+    if not pks:
+        parser.error(f"{args.model} has no rows to fetch")
+
+    manager = CachedManager()
+    manager.model = model
+    manager.in_bulk(pks)  # Warm the cache
+
+    orm = (
+        measure(
+            "orm: get(pk=...)",
+            lambda: [model._default_manager.get(pk=pk) for pk in pks],
+            args.repeat,
+            len(pks),
+        ),
+        measure(
+            "orm: in_bulk()",
+            lambda: model._default_manager.in_bulk(pks),
+            args.repeat,
+            len(pks),
+        ),
+    )
+    cached = (
+        measure(
+            "cache: get(pk=...)",
+            lambda: [manager.get(pk=pk) for pk in pks],
+            args.repeat,
+            len(pks),
+        ),
+        measure(
+            "cache: in_bulk()",
+            lambda: manager.in_bulk(pks),
+            args.repeat,
+            len(pks),
+        ),
+    )
+
+    print()
+    for index, label in enumerate(["get(pk=...)", "in_bulk()"]):
+        print(f"{label:<20} speedup: {orm[index] / cached[index]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
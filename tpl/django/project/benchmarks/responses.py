@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+Measure the bytes sent and latency of typical responses through the project's
+middleware, with and without the compression, conditional GET and
+Cache-Control middleware of django_structured.http.
+
+Latency is the time to produce a response plus the time to send it at the
+given bandwidth. Revalidations send the ETag of the previous response.
+
+Usage:
+    python benchmarks/responses.py --requests 200 --bandwidth 10 50
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project50.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.http import (  # noqa: E402
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.test import Client  # noqa: E402
+from django.test.utils import override_settings, setup_test_environment  # noqa: E402
+from django.urls import path  # noqa: E402
+
+HTTP_MIDDLEWARE = [
+    "django_structured.http.CompressionMiddleware",
+    "django.middleware.http.ConditionalGetMiddleware",
+    "django_structured.http.CacheControlMiddleware",
+]
+
+ROWS = [
+    {"id": index, "name": f"Item {index}", "price": index * 1.5, "tags": ["a", "b"]}
+    for index in range(200)
+]
+
+
+def html(request):
+    rows = "".join(
+        f"<tr><td>{row['id']}</td><td>{row['name']}</td><td>{row['price']}</td></tr>"
+        for row in ROWS
+    )
+    return HttpResponse(f"<html><body><table>{rows}</table></body></html>")
+
+
+def api(request):
+    return JsonResponse(ROWS, safe=False)
+
+
+def export(request):
+    lines = (f"{row['id']},{row['name']},{row['price']}\n" for row in ROWS)
+    return StreamingHttpResponse(lines, content_type="text/csv")
+
+
+urlpatterns = [
+    path("html/", html),
+    path("api/", api),
+    path("export/", export),
+]
+
+
+def measure(label, client, url, requests, bandwidths, revalidate):
+    headers = {"HTTP_ACCEPT_ENCODING": "br, gzip"}
+    response = client.get(url, **headers)
+    if revalidate and response.has_header("ETag"):
+        headers["HTTP_IF_NONE_MATCH"] = response.headers["ETag"]
+
+    best = float("inf")
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(url, **headers)
+        content = b"".join(response) if response.streaming else response.content
+        best = min(best, time.perf_counter() - start)
+
+    sent = len(content) + sum(
+        len(name) + len(value) + 4 for name, value in response.items()
+    )
+    latencies = "  ".join(
+        f"{(best + sent * 8 / (bandwidth * 1e6)) * 1000:>7.2f} ms"
+        for bandwidth in bandwidths
+    )
+    status = response.status_code
+    print(f"{label:<34} {status}  {sent:>8,} B  {best * 1e6:>8.1f} µs  {latencies}")
+    return sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument(
+        "--bandwidth", type=float, nargs="+", default=[10, 50], help="Mbit/s"
+    )
+    args = parser.parse_args()
+
+    setup_test_environment()
+    plain = [name for name in settings.MIDDLEWARE if name not in HTTP_MIDDLEWARE]
+    structured = list(settings.MIDDLEWARE)
+    if structured == plain:
+        print("http_efficiency is off, adding the django_structured.http middleware")
+        index = plain.index("django.contrib.sessions.middleware.SessionMiddleware")
+        structured = plain[:index] + HTTP_MIDDLEWARE + plain[index:]
+
+    columns = "  ".join(f"{f'{mbps:g} Mbit/s':>10}" for mbps in args.bandwidth)
+    print(f"{'':<38} {'sent':>10}  {'server':>11}  {columns}")
+    runs = [
+        ("plain", plain, False),
+        ("structured", structured, False),
+        ("structured, revalidated", structured, True),
+    ]
+    for url in ("/html/", "/api/", "/export/"):
+        for label, middleware, revalidate in runs:
+            with override_settings(MIDDLEWARE=middleware, ROOT_URLCONF=__name__):
+                measure(
+                    f"{url} {label}",
+                    Client(),
+                    url,
+                    args.requests,
+                    args.bandwidth,
+                    revalidate,
+                )
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Compare serialization throughput of Django REST framework's stock JSON
+renderer and parser with the orjson-backed ones configured in
+settings/base/rest.py.
+
+Usage:
+    python benchmarks/rest_serialization.py --rows 1000 --repeat 20
+"""
+import argparse
+import datetime
+import decimal
+import io
+import os
+import sys
+import timeit
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project50.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework import parsers, renderers, serializers  # noqa: E402
+
+from django_structured import rest  # noqa: E402
+
+
+class RowSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    name = serializers.CharField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    created = serializers.DateTimeField()
+    tags = serializers.ListField(child=serializers.CharField())
+
+
+def make_rows(count):
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return [
+        {
+            "id": uuid.uuid4(),
+            "name": f"Item {i}",
+            "price": decimal.Decimal("9.99"),
+            "created": now,
+            "tags": ["a", "b", "c"],
+        }
+        for i in range(count)
+    ]
+
+
+def measure(label, fn, repeat, rows):
+    best = min(timeit.repeat(fn, number=1, repeat=repeat))
+    print(f"{label:<40} {best * 1000:>9.2f} ms  {rows / best:>12,.0f} rows/s")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    data = RowSerializer(rows, many=True).data
+    configs = [
+        ("stock", renderers.JSONRenderer(), parsers.JSONParser()),
+        ("orjson", rest.ORJSONRenderer(), rest.ORJSONParser()),
+    ]
+    if rest.orjson is None:
+        print("orjson is not installed, both configurations use the stdlib")
+
+    results = {}
+    for name, renderer, json_parser in configs:
+        rendered = renderer.render(data)
+        results[name] = (
+            measure(
+                f"{name}: serialize + render",
+                lambda: renderer.render(RowSerializer(rows, many=True).data),
+                args.repeat,
+                args.rows,
+            ),
+            measure(
+                f"{name}: render",
+                lambda: renderer.render(data),
+                args.repeat,
+                args.rows,
+            ),
+            measure(
+                f"{name}: parse",
+                lambda: json_parser.parse(io.BytesIO(rendered)),
+                args.repeat,
+                args.rows,
+            ),
+        )
+
+    stock, tuned = results["stock"], results["orjson"]
+    print()
+    for index, label in enumerate(["serialize + render", "render", "parse"]):
+        print(f"{label:<20} speedup: {stock[index] / tuned[index]:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Compare resolving paths with Django's resolver, which matches patterns one
+after the other, and with the indexed resolver of django_structured.routing.
+
+Routes are generated for the occasion: every resource gets a list, a detail,
+an edit and a slug route, and paths are picked evenly across them.
+
+Usage:
+    python benchmarks/routing.py --resources 100 1000 5000 --paths 200
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project50.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.http import HttpResponse  # noqa: E402
+from django.urls import path  # noqa: E402
+from django.urls.resolvers import RegexPattern, URLResolver  # noqa: E402
+
+from django_structured.routing import IndexedResolver  # noqa: E402
+
+
+def view(request, **kwargs):
+    return HttpResponse()
+
+
+def patterns(resources):
+    for index in range(resources):
+        yield path(f"resource{index}/", view)
+        yield path(f"resource{index}/<int:pk>/", view)
+        yield path(f"resource{index}/<int:pk>/edit/", view)
+        yield path(f"resource{index}/by-slug/<slug:slug>/", view)
+
+
+def sample_paths(resources, count):
+    templates = ["/resource{}/", "/resource{}/42/", "/resource{}/42/edit/"]
+    templates.append("/resource{}/by-slug/some-item/")
+    return [
+        random.choice(templates).format(random.randrange(resources))
+        for _ in range(count)
+    ]
+
+
+def measure(label, resolver, paths, repeat):
+    def resolve_all():
+        for path in paths:
+            resolver.resolve(path)
+
+    resolve_all()  # Compile patterns and build indexes
+    best = min(timeit.repeat(resolve_all, number=1, repeat=repeat))
+    print(f"{label:<32} {best / len(paths) * 1e6:>9.2f} µs/resolve")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--resources", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--paths", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(0)
+    for resources in args.resources:
+        urlpatterns = list(patterns(resources))
+        paths = sample_paths(resources, args.paths)
+        print(f"{len(urlpatterns)} patterns")
+        django_resolver = URLResolver(RegexPattern(r"^/"), urlpatterns)
+        indexed_resolver = IndexedResolver(RegexPattern(r"^/"), urlpatterns)
+        django_time = measure("django.urls", django_resolver, paths, args.repeat)
+        indexed_time = measure("indexed", indexed_resolver, paths, args.repeat)
+        print(f"speedup: {django_time / indexed_time:.1f}x\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""
+Celery application for project50 project, used by `manage.py runtasks` when
+the celery task backend is configured.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project50.settings")
+
+app = Celery("project50")
+app.config_from_object("django.conf:settings", namespace="CELERY")
@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for project50 project.
+
+Worker and thread counts are derived from the CPUs and memory available to the
+container. Override any value with the WEB_* environment variables documented
+in django_structured.server.ServerConfig.
+
+For more information on this file, see
+https://docs.gunicorn.org/en/stable/settings.html
+"""
+
+from django_structured.server import ServerConfig
+
+if interface == "asgi":
+    server = ServerConfig.from_environment("asgi")
+    wsgi_app = "project50.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    server = ServerConfig.from_environment("wsgi")
+    wsgi_app = "project50.wsgi:application"
+    worker_class = "gthread"
+    threads = server.threads
+
+bind = server.bind
+workers = server.workers
+preload_app = server.preload_app
+
+# Recycle workers periodically, staggered so they don't all restart at once
+max_requests = server.max_requests
+max_requests_jitter = server.max_requests_jitter
+
+timeout = server.timeout
+graceful_timeout = server.graceful_timeout
+keepalive = server.keepalive
+
+# Keep worker heartbeat files off of (possibly disk-backed) /tmp
+worker_tmp_dir = "/dev/shm"
+accesslog = "-"
@@ -0,0 +1,20 @@
+#!/usr/bin/env python
+"""
+In-process load test of project50 project, for when the structured CLI isn't
+installed. Takes the same options as `structured bench`, see --help.
+
+Usage:
+    python scripts/bench.py --path / --threads 8 --duration 10 --output bench.json
+    python scripts/bench.py --path / --compare bench.json
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project50.settings")
+
+from django_structured.bench import main  # noqa: E402
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+#!/usr/bin/env python
+"""
+Startup import analysis of project50 project, for when the structured CLI
+isn't installed. Takes the same options as `structured imports`, see --help.
+
+Usage:
+    python scripts/imports.py --threshold-ms 20 --output imports.json
+    python scripts/imports.py --budget-ms 800
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project50.settings")
+
+from django_structured.imports import main  # noqa: E402
+
+if __name__ == "__main__":
+    sys.exit(main())
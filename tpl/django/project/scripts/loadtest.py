@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Load-test smoke script for project50 project.
+
+Hammers a running server with concurrent requests for a fixed duration and
+reports throughput and latency percentiles. Exits with a non-zero status if any
+request fails or if the p95 latency exceeds --max-p95-ms, so it can be used as a
+smoke test after changing the server configuration.
+
+Usage:
+    python scripts/loadtest.py http://localhost:8000/ --concurrency 16 --duration 10
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+def worker(url, deadline, latencies, errors, lock):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                response.read()
+        except (urllib.error.URLError, OSError) as exc:
+            with lock:
+                errors.append(exc)
+            continue
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(int(round(pct / 100 * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("url")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+    parser.add_argument("--max-p95-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(
+            target=worker, args=(args.url, deadline, latencies, errors, lock)
+        )
+        for _ in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    total = len(latencies) + len(errors)
+    p95 = percentile(latencies, 95) * 1000
+    print(f"requests:   {total} ({len(errors)} errors)")
+    print(f"throughput: {len(latencies) / args.duration:.1f} req/s")
+    if latencies:
+        print(f"mean:       {statistics.mean(latencies) * 1000:.1f} ms")
+    for pct in (50, 95, 99):
+        print(f"p{pct}:        {percentile(latencies, pct) * 1000:.1f} ms")
+
+    if errors:
+        print(f"First error: {errors[0]!r}", file=sys.stderr)
+        return 1
+    if args.max_p95_ms is not None and p95 > args.max_p95_ms:
+        print(f"p95 {p95:.1f} ms exceeds {args.max_p95_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
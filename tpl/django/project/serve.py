@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Production server entry point for project50 project.
+
+Worker and thread counts are derived from the CPUs and memory available to the
+container. Override any value with the WEB_* environment variables documented
+in django_structured.server.ServerConfig.
+"""
+import os
+from pathlib import Path
+
+from django_structured.server import ServerConfig
+
+
+def main():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project50.settings")
+
+    if server == "gunicorn":
+        # Configured by gunicorn.conf.py, next to this file
+        config = Path(__file__).resolve().with_name("gunicorn.conf.py")
+        os.execvp("gunicorn", ["gunicorn", "--config", str(config)])
+
+    if server == "uvicorn":
+        import uvicorn
+
+        config = ServerConfig.from_environment("asgi")
+        host, _, port = config.bind.rpartition(":")
+        # Tells workers whether they have siblings, see
+        # django_structured.process.supervised
+        os.environ["WEB_CONCURRENCY"] = str(config.workers)
+        uvicorn.run(
+            "project50.asgi:application",
+            host=host,
+            port=int(port),
+            workers=config.workers,
+            # uvicorn has no jitter of its own
+            limit_max_requests=config.jittered_max_requests() or None,
+            timeout_keep_alive=config.keepalive,
+            timeout_graceful_shutdown=config.graceful_timeout,
+        )
+
+    if server == "granian":
+        from granian import Granian
+        from granian.http import HTTP1Settings
+
+        config = ServerConfig.from_environment(interface)
+        host, _, port = config.bind.rpartition(":")
+        os.environ["WEB_CONCURRENCY"] = str(config.workers)
+        Granian(
+            f"project50.{interface}:application",
+            address=host,
+            port=int(port),
+            interface=interface,
+            workers=config.workers,
+            blocking_threads=config.threads,
+            respawn_failed_workers=True,
+            respawn_interval=1.0,
+            # granian recycles workers by age, not by number of requests
+            workers_lifetime=config.max_lifetime or None,
+            workers_kill_timeout=config.graceful_timeout,
+            http1_settings=HTTP1Settings(
+                keep_alive=config.keepalive > 0,
+                # Idle keep-alive connections are closed after this
+                header_read_timeout=max(config.keepalive, 1) * 1000,
+            ),
+        ).serve()
+
+
+if __name__ == "__main__":
+    main()
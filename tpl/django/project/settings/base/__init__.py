@@ -0,0 +1,12 @@
+from .authentication import *
+from .cache import *
+from .core import *
+from .database import *
+from .logging import *
+from .rest import *
+from .security import *
+from .sentry import *
+from .static import *
+from .structure import *
+from .tasks import *
+from .templates import *
@@ -3,3 +3,27 @@ CACHES = {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
     }
 }
+
+if http_efficiency:
+    # Sessions read from the cache when it's shared by all workers (redis,
+    # memcached), from the database otherwise, following the CACHES of each
+    # environment
+    SESSION_ENGINE = "django_structured.sessions"
+
+# View and fragment caching with stampede protection: django_structured.cache
+# cache_view and cached decorators, and the {% cachefragment %} tag of the
+# structured_cache template library
+STRUCTURED_CACHE = {
+    "CACHE": "default",
+    # Eagerness of early recomputation before expiry, 0 to disable
+    "BETA": 1.0,
+    "LOCK_TIMEOUT": 10,
+}
+
+# Read-through cache of models with a django_structured.model_cache
+# CachedManager. Bump VERSION when changing the fields of cached models.
+STRUCTURED_MODEL_CACHE = {
+    "CACHE": "default",
+    "TIMEOUT": 300,
+    "VERSION": 1,
+}
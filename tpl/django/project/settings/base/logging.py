@@ -0,0 +1,44 @@
+# Logging
+# https://docs.djangoproject.com/en/5.0/topics/logging/
+
+# Records are handed to a background thread through a bounded queue, so
+# request threads never block on log I/O. When the queue is full, records are
+# dropped and the number dropped is logged. Each line is a JSON object,
+# formatted in the background thread.
+
+import os
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "json": {"()": "django_structured.logging.JSONFormatter"},
+        "text": {"format": "{asctime} {levelname} {name}: {message}", "style": "{"},
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "formatter": "json",
+        },
+        "queue": {
+            "()": "django_structured.logging.QueueHandler",
+            "handlers": ["console"],
+            "maxsize": 10000,
+        },
+    },
+    "root": {
+        "handlers": ["queue"],
+        "level": LOG_LEVEL,
+    },
+    "loggers": {
+        "django": {
+            "level": LOG_LEVEL,
+        },
+        # Logs every query at DEBUG level
+        "django.db.backends": {
+            "level": "INFO",
+        },
+    },
+}
@@ -0,0 +1,26 @@
+# Django REST framework
+# https://www.django-rest-framework.org/api-guide/settings/
+
+if drf:
+    REST_FRAMEWORK = {
+        # orjson-backed JSON only: the browsable API and form parsers are
+        # enabled in dev.py
+        "DEFAULT_RENDERER_CLASSES": ["django_structured.rest.ORJSONRenderer"],
+        "DEFAULT_PARSER_CLASSES": ["django_structured.rest.ORJSONParser"],
+        # Constant cost per page, with no COUNT(*) or OFFSET
+        "DEFAULT_PAGINATION_CLASS": "django_structured.rest.CursorPagination",
+        "PAGE_SIZE": 50,
+        "DEFAULT_THROTTLE_CLASSES": [
+            "django_structured.rest.AnonRateThrottle",
+            "django_structured.rest.UserRateThrottle",
+        ],
+        "DEFAULT_THROTTLE_RATES": {
+            "anon": "100/minute",
+            "user": "1000/minute",
+        },
+        "UNICODE_JSON": True,
+        "COMPACT_JSON": True,
+    }
+
+    # Throttling history must be shared by all workers
+    STRUCTURED_REST_THROTTLE_CACHE = "default"
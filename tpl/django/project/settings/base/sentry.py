@@ -0,0 +1,19 @@
+# Sentry error reporting and performance tracing
+# Initialized by django_structured when SENTRY_DSN is set. Without a DSN (or
+# with "ENABLED": False), sentry_sdk is never imported.
+
+import os
+
+if sentry:
+    STRUCTURED_SENTRY = {
+        "ENABLED": True,
+        "DSN": os.environ.get("SENTRY_DSN"),
+        "ENVIRONMENT": os.environ.get("SENTRY_ENVIRONMENT"),
+        "RELEASE": os.environ.get("SENTRY_RELEASE"),
+        # Per-environment rates are set in each environment's settings
+        "TRACES_SAMPLE_RATE": 0.0,
+        "PROFILES_SAMPLE_RATE": 0.0,
+        # Health checks, static and media files are never traced
+        "IGNORED_PATHS": ["/health", "/healthz", "/ready", "/favicon.ico"],
+        "CACHE_SPANS": True,
+    }
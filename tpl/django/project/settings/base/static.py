@@ -0,0 +1,32 @@
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.0/howto/static-files/
+
+from .core import BASE_DIR
+
+STATIC_URL = "static/"
+
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+if static_compression:
+    # collectstatic writes content-hashed files plus gzip and brotli variants,
+    # served by PrecompressedStaticFilesMiddleware (see structure.py)
+    if django == 3:
+        STATICFILES_STORAGE = (
+            "django_structured.staticfiles.CompressedManifestStaticFilesStorage"
+        )
+    else:
+        STORAGES = {
+            "default": {
+                "BACKEND": "django.core.files.storage.FileSystemStorage",
+            },
+            "staticfiles": {
+                "BACKEND": "django_structured.staticfiles.CompressedManifestStaticFilesStorage",
+            },
+        }
+
+    STRUCTURED_STATIC_COMPRESSION = {
+        "ENCODINGS": ["br", "gzip"],
+        "MIN_SIZE": 256,
+        # Defaults to the number of CPUs
+        "WORKERS": None,
+    }
@@ -7,8 +7,15 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django_structured",
 ]
 
+if drf:
+    INSTALLED_APPS.append("rest_framework")
+
+if tasks == "database":
+    INSTALLED_APPS.append("django_structured.tasks")
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -19,22 +26,30 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
-ROOT_URLCONF = "project50.urls"
+if static_compression:
+    MIDDLEWARE.insert(
+        1, "django_structured.staticfiles.PrecompressedStaticFilesMiddleware"
+    )
 
-TEMPLATES = [
-    {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
-        "DIRS": [],
-        "APP_DIRS": True,
-        "OPTIONS": {
-            "context_processors": [
-                "django.template.context_processors.debug",
-                "django.template.context_processors.request",
-                "django.contrib.auth.context_processors.auth",
-                "django.contrib.messages.context_processors.messages",
-            ],
-        },
-    },
-]
+if http_efficiency:
+    # Outermost first: compress responses, answer revalidations with 304 Not
+    # Modified, and add Cache-Control to responses without one. They wrap
+    # SessionMiddleware, to see the Vary: Cookie it adds.
+    index = MIDDLEWARE.index("django.contrib.sessions.middleware.SessionMiddleware")
+    MIDDLEWARE[index:index] = [
+        "django_structured.http.CompressionMiddleware",
+        "django.middleware.http.ConditionalGetMiddleware",
+        "django_structured.http.CacheControlMiddleware",
+    ]
+    STRUCTURED_HTTP = {
+        "ENCODINGS": ["br", "gzip"],
+        "MIN_SIZE": 512,
+        # Revalidated on every use by default, set cacheable views here by
+        # view name, or with django.views.decorators.cache.cache_control
+        "CACHE_CONTROL": {"private": True, "no_cache": True},
+        "VIEW_CACHE_CONTROL": {},
+    }
+
+ROOT_URLCONF = "project50.urls"
 
 WSGI_APPLICATION = "project50.wsgi.application"
@@ -0,0 +1,32 @@
+# Background tasks
+# Emails, exports, webhooks and other slow work is enqueued to the backend
+# below and run by `manage.py runtasks` workers. Tests run tasks eagerly with
+# the eager_tasks fixture.
+
+import os
+
+if tasks != "none":
+    STRUCTURED_TASKS = {
+        "BACKEND": "database",
+        "QUEUES": ["default"],
+        # Tasks run at once by each worker
+        "CONCURRENCY": int(os.environ.get("WORKER_CONCURRENCY", 4)),
+        # Failing tasks are retried with exponential backoff from RETRY_DELAY
+        # seconds
+        "RETRIES": 3,
+        "RETRY_DELAY": 10,
+        "BROKER_URL": os.environ.get("REDIS_URL", "redis://redis:6379/0"),
+    }
+
+if tasks == "celery":
+    STRUCTURED_TASKS["BACKEND"] = "celery"
+    STRUCTURED_TASKS["CELERY_APP"] = "project50.celery.app"
+
+    CELERY_BROKER_URL = STRUCTURED_TASKS["BROKER_URL"]
+    # Reserve one task at a time, so a long task doesn't hold others back
+    CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+    CELERY_TASK_ACKS_LATE = True
+    CELERY_TASK_IGNORE_RESULT = True
+
+if tasks == "rq":
+    STRUCTURED_TASKS["BACKEND"] = "rq"
@@ -0,0 +1,25 @@
+# Templates
+# https://docs.djangoproject.com/en/5.0/ref/settings/#templates
+
+# Loaders are listed explicitly (instead of APP_DIRS) so that each environment
+# decides whether compiled templates are cached. See production.py.
+TEMPLATE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [],
+        "OPTIONS": {
+            "loaders": TEMPLATE_LOADERS,
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+            ],
+        },
+    },
+]
@@ -0,0 +1,23 @@
+from .base import *
+
+# Readable log lines in the terminal
+LOGGING["handlers"]["console"]["formatter"] = "text"
+
+if profiling:
+    # Server-Timing headers and a log line for every request
+    MIDDLEWARE = ["django_structured.profiling.ProfilingMiddleware", *MIDDLEWARE]
+    STRUCTURED_PROFILING = {"SAMPLE_RATE": 1.0}
+
+if drf:
+    REST_FRAMEWORK = {
+        **REST_FRAMEWORK,
+        "DEFAULT_RENDERER_CLASSES": [
+            "django_structured.rest.ORJSONRenderer",
+            "rest_framework.renderers.BrowsableAPIRenderer",
+        ],
+        "DEFAULT_PARSER_CLASSES": [
+            "django_structured.rest.ORJSONParser",
+            "rest_framework.parsers.FormParser",
+            "rest_framework.parsers.MultiPartParser",
+        ],
+    }
@@ -0,0 +1,28 @@
+import os
+
+from .base import *
+
+# Keep compiled templates in memory for the life of the worker. Run
+# `manage.py compiletemplates` at image build or worker boot to catch syntax
+# errors early and warm the cache before the first request.
+TEMPLATES[0]["OPTIONS"]["loaders"] = [
+    ("django.template.loaders.cached.Loader", TEMPLATE_LOADERS),
+]
+
+if memory_watchdog:
+    # Recycle workers gracefully once they've grown past the limit, instead of
+    # waiting for max_requests, when the server replaces them (gunicorn, or
+    # several uvicorn or granian workers). Reports are written to REPORT_DIR.
+    MIDDLEWARE = ["django_structured.memory.MemoryWatchdogMiddleware", *MIDDLEWARE]
+    STRUCTURED_MEMORY = {
+        "SAMPLE_RATE": 0.05,
+        "MAX_GROWTH_MB": int(os.environ.get("WORKER_MAX_GROWTH_MB", 256)),
+    }
+
+if sentry:
+    # Keep tracing overhead low and predictable at production volume
+    STRUCTURED_SENTRY = {
+        **STRUCTURED_SENTRY,
+        "TRACES_SAMPLE_RATE": 0.05,
+        "PROFILES_SAMPLE_RATE": 0.01,
+    }
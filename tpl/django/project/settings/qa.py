@@ -0,0 +1,8 @@
+from .base import *
+
+if sentry:
+    STRUCTURED_SENTRY = {
+        **STRUCTURED_SENTRY,
+        "TRACES_SAMPLE_RATE": 1.0,
+        "PROFILES_SAMPLE_RATE": 0.0,
+    }
@@ -0,0 +1,18 @@
+from .base import *
+
+if profiling:
+    # Profile a sample of requests, cheap enough to leave on
+    MIDDLEWARE = ["django_structured.profiling.ProfilingMiddleware", *MIDDLEWARE]
+    STRUCTURED_PROFILING = {"SAMPLE_RATE": 0.05}
+
+if memory_watchdog:
+    # Trace allocations to report the lines of code holding on to memory
+    MIDDLEWARE = ["django_structured.memory.MemoryWatchdogMiddleware", *MIDDLEWARE]
+    STRUCTURED_MEMORY = {"SAMPLE_RATE": 0.2, "TRACEMALLOC": 1}
+
+if sentry:
+    STRUCTURED_SENTRY = {
+        **STRUCTURED_SENTRY,
+        "TRACES_SAMPLE_RATE": 0.5,
+        "PROFILES_SAMPLE_RATE": 0.1,
+    }
@@ -21,3 +21,10 @@ from django.urls import path
 urlpatterns = [
     path("admin/", admin.site.urls),
 ]
+
+if routing:
+    from django_structured.routing import Router
+
+    # Views declared with django_structured.routing.route in the views package
+    # of every installed app, resolved through an indexed resolver
+    urlpatterns.append(Router().discover().urls)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Compare image size and container cold-start time of Dockerfile targets.
+
+Builds each target, then starts a fresh container from it several times,
+timing an import of the given module (by default the project's WSGI module).
+The dev target is the "before" baseline: it writes no bytecode, so every
+container start compiles all modules in memory.
+
+Usage:
+    python scripts/measure_image.py --module project50.wsgi
+    python scripts/measure_image.py --targets dev production --runs 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+
+def build(target, tag, build_args):
+    command = ["docker", "build", "--target", target, "--tag", tag, "."]
+    for build_arg in build_args:
+        command += ["--build-arg", build_arg]
+    subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+
+
+def image_size(tag):
+    # Parse the JSON output rather than use --format, whose Go template braces
+    # would be taken for Jinja when this file is rendered
+    output = subprocess.run(
+        ["docker", "image", "inspect", tag],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return int(json.loads(output)[0]["Size"])
+
+
+def cold_start(tag, module, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            ["docker", "run", "--rm", tag, "python", "-c", f"import {module}"],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--targets", nargs="+", default=["dev", "production"])
+    parser.add_argument("--module", default="project50.wsgi")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--build-arg",
+        action="append",
+        default=[],
+        help="e.g. PYC_INVALIDATION=unchecked-hash",
+    )
+    args = parser.parse_args()
+
+    results = {}
+    for target in args.targets:
+        tag = f"measure-image:{target}"
+        print(f"Building {target}...", file=sys.stderr)
+        build(target, tag, args.build_arg)
+        timings = cold_start(tag, args.module, args.runs)
+        results[target] = (image_size(tag), timings)
+
+    print(f"{'target':<12} {'size (MB)':>10} {'median start (s)':>17} {'min (s)':>8}")
+    for target, (size, timings) in results.items():
+        print(
+            f"{target:<12} {size / 2**20:>10.1f} "
+            f"{statistics.median(timings):>17.3f} {min(timings):>8.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()